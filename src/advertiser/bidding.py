@@ -0,0 +1,138 @@
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, NamedTuple, Sequence
+
+import numpy as np
+
+from src.advertiser.budget import BudgetPacer, SpendLedger, spend_segment_name
+from src.advertiser.campaigns import Campaign, CampaignIndex, load_campaigns
+from src.advertiser.config import AdvertiserConfig
+from src.advertiser.scoring import CampaignScorer
+
+
+class BidDecision(NamedTuple):
+    """What the advertiser bids on one request."""
+    bid_price: float
+    ad_id: str
+    campaign_id: str | None
+
+
+def choose_bid_price(config: AdvertiserConfig, rng: random.Random | None = None) -> float:
+    """The advertiser's bid for a request: uniform in [min_bid, max_bid], rounded to cents."""
+    return round((rng or random).uniform(config.min_bid, config.max_bid), 2)
+
+
+class Bidder:
+    """
+    An advertiser's bid decisions.
+
+    With campaigns, the targeting index finds the eligible campaigns and the scorer prices
+    them all in one vectorized pass; the best price bids with one of its campaign's
+    creatives, and a request no campaign can bid on gets no bid. Without campaigns every
+    request gets a random price in [min_bid, max_bid] and a fresh ad ID.
+
+    Campaigns with a daily_budget are paced (src.advertiser.budget); their spend is shared
+    with the advertiser's other workers through a segment in `spend_dir`, or kept private
+    to this process without one.
+    """
+
+    def __init__(
+        self,
+        config: AdvertiserConfig,
+        campaigns: Sequence[Campaign] = (),
+        rng: random.Random | None = None,
+        spend_dir: str | Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.config = config
+        self.index = CampaignIndex(campaigns) if campaigns else None
+        self.scorer = CampaignScorer(self.index) if self.index is not None else None
+        self.pacer = self._create_pacer(spend_dir, clock) if self.index is not None else None
+        self._rng = rng or random.Random()
+
+    def _create_pacer(self, spend_dir: str | Path | None, clock: Callable[[], float]) -> BudgetPacer | None:
+        budgets = np.array([
+            np.inf if c.daily_budget is None else c.daily_budget for c in self.index.campaigns
+        ], dtype=np.float64)
+        if np.isinf(budgets).all():
+            return None
+        path = None
+        if spend_dir is not None:
+            ids = [c.campaign_id for c in self.index.campaigns]
+            path = Path(spend_dir) / spend_segment_name(self.config.advertiser_id, ids)
+        pacer = BudgetPacer(budgets, SpendLedger(len(budgets), path), clock)
+        self.scorer.remaining_budget = pacer.remaining_budget
+        self.scorer.bid_probability = pacer.bid_probability
+        return pacer
+
+    def bid(self, category: str, domain: str, bid_floor: float) -> BidDecision | None:
+        if self.index is None:
+            return self._random_bid()
+        draw = 0.0
+        if self.pacer is not None:
+            self.pacer.maybe_refresh()
+            draw = self._rng.random()
+        return self._award(self.index.match(category, domain, bid_floor), bid_floor, draw)
+
+    def bid_batch(self, requests: Sequence[tuple[str, str, float]]) -> list[BidDecision | None]:
+        """
+        Decisions for many (category, domain, bid_floor) requests, scored together in one pass.
+
+        The pass sees budgets as they were before the batch. Winners are therefore charged in
+        input order, and a request whose winner can no longer afford its bid is re-scored alone
+        against what is left.
+        """
+        if self.index is None:
+            return [self._random_bid() for _ in requests]
+        match = self.index.match
+        masks = [match(category, domain, floor) for category, domain, floor in requests]
+        floors = [floor for _, _, floor in requests]
+        draws = None
+        if self.pacer is not None:
+            self.pacer.maybe_refresh()
+            draws = [self._rng.random() for _ in requests]
+        positions, prices = self.scorer.score_batch(masks, floors, draws)
+
+        decisions = []
+        for i, (position, price) in enumerate(zip(positions.tolist(), prices.tolist())):
+            if position < 0:
+                decisions.append(None)
+            elif self.pacer is None or self.pacer.charge(position, price):
+                decisions.append(self._decision(position, price))
+            else:
+                decisions.append(self._award(masks[i], floors[i], draws[i]))
+        return decisions
+
+    def _random_bid(self) -> BidDecision:
+        return BidDecision(choose_bid_price(self.config, self._rng), str(uuid.uuid4()), None)
+
+    def _award(self, mask: int, bid_floor: float, draw: float) -> BidDecision | None:
+        """Score and charge the best campaign, passing over any whose budget turns out not to cover its bid."""
+        while True:
+            scored = self.scorer.score(mask, bid_floor, draw)
+            if scored is None:
+                return None
+            if self.pacer is None or self.pacer.charge(*scored):
+                return self._decision(*scored)
+
+    def _decision(self, position: int, price: float) -> BidDecision:
+        campaign = self.index.campaigns[position]
+        creative = campaign.creatives[0] if len(campaign.creatives) == 1 else self._rng.choice(campaign.creatives)
+        return BidDecision(price, creative.ad_id, campaign.campaign_id)
+
+
+def create_bidder(
+    config: AdvertiserConfig,
+    campaigns_file: str | None = None,
+    rng: random.Random | None = None,
+    spend_dir: str | Path | None = None,
+    clock: Callable[[], float] = time.time,
+) -> Bidder:
+    """Bidder for the config's inline campaigns plus those in `campaigns_file` (default: the config's)."""
+    campaigns = list(config.campaigns)
+    path = campaigns_file or config.campaigns_file
+    if path:
+        campaigns.extend(load_campaigns(path))
+    return Bidder(config, campaigns, rng, spend_dir, clock)
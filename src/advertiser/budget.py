@@ -0,0 +1,280 @@
+"""
+Daily campaign budgets with smooth pacing, shared by every worker of an advertiser.
+
+Spend lives in a file-backed shared-memory segment (under /dev/shm where available) that
+every uvicorn worker of the advertiser maps. Each worker claims one row of the segment and
+is the only process that ever writes it; readers sum every row stamped with today's UTC date.
+The row of a dead worker is reclaimed with its spend intact, and a restart on the same day
+picks up where the fleet left off.
+
+Workers never spend budget they have not reserved. A worker reserves a chunk of a campaign's
+budget (RESERVATION_SHARE of it, or the bid's cost if larger) under an flock on the segment,
+and only while the fleet's reservations stay within the budget. Its bids then draw on the
+chunk with a plain store to its own row, and the lock is taken again only when the chunk
+runs out. So the fleet as a whole can never spend more than the budget, however many
+workers there are. Budget that a live worker has reserved but not yet spent is unavailable
+to the others until the end of the day.
+
+Pacing throttles bid probability rather than price. Every PACING_INTERVAL_S each worker
+re-estimates each campaign's demand — the fleet's spend rate divided by the probability it
+was bidding at, smoothed over intervals — and sets the probability to the share of that
+demand which spreads the remaining budget evenly over the rest of the UTC day (moving at
+most MAX_PROBABILITY_STEP either way per interval). The bid path itself only compares one
+uniform draw with the probability inside the scoring pass.
+
+The advertiser gets no win notices, so every bid is counted as spend (price / 1000).
+Budgets can only be under-delivered when bids lose, never overspent.
+"""
+import fcntl
+import hashlib
+import mmap
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Sequence
+
+import numpy as np
+
+from src.metrics import pid_alive
+
+SECONDS_PER_DAY = 86_400
+LEDGER_SLOTS = 32  # worker rows per segment
+PACING_INTERVAL_S = 1.0
+MIN_BID_PROBABILITY = 0.001
+MAX_PROBABILITY_STEP = 2.0
+DEMAND_SMOOTHING = 0.2  # weight of the newest interval in the demand estimate
+RESERVATION_SHARE = 0.01  # share of a daily budget a worker reserves at a time
+
+_MAGIC = 0x32444E5053425452  # b"RTBSPND2"
+_HEADER_WORDS = 4  # magic, campaigns, slots, reserved
+
+
+def default_spend_dir() -> Path:
+    """Where shared spend segments live: /dev/shm if the OS has it, else the temp directory."""
+    shm = Path("/dev/shm")
+    return shm if shm.is_dir() else Path(tempfile.gettempdir())
+
+
+def spend_segment_name(advertiser_id: str, campaign_ids: Sequence[str]) -> str:
+    """Segment file name; the digest keeps a changed campaign list from reusing another layout."""
+    digest = hashlib.sha1("\n".join(campaign_ids).encode()).hexdigest()[:12]
+    return f"rtb-spend-{advertiser_id}-{digest}.bin"
+
+
+def utc_day(now: float) -> int:
+    """Days since the epoch, UTC."""
+    return int(now // SECONDS_PER_DAY)
+
+
+class SpendLedger:
+    """
+    Today's spend and reservations per campaign (USD), one row per worker, summed on read.
+
+    With `path` the ledger is the shared segment at that path (created on first open);
+    without it the ledger is private to this process.
+    """
+
+    def __init__(self, n_campaigns: int, path: str | Path | None = None, slots: int = LEDGER_SLOTS):
+        self.path = Path(path) if path is not None else None
+        size = 8 * (_HEADER_WORDS + 2 * slots + 2 * slots * n_campaigns)
+        self._fd: int | None = None
+        if self.path is None:
+            self._buffer = mmap.mmap(-1, size)
+            self._map_views(n_campaigns, slots)
+            self._write_header(n_campaigns, slots)
+            self.slot = self._claim_slot()
+            return
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            existing = os.fstat(self._fd).st_size
+            if existing == 0:
+                os.ftruncate(self._fd, size)
+            elif existing != size:
+                raise ValueError(f"Spend segment {self.path} has {existing} bytes, expected {size}")
+            self._buffer = mmap.mmap(self._fd, size)
+            self._map_views(n_campaigns, slots)
+            if existing == 0:
+                self._write_header(n_campaigns, slots)
+            elif tuple(self._header[:3]) != (_MAGIC, n_campaigns, slots):
+                raise ValueError(f"Spend segment {self.path} has an incompatible layout")
+            self.slot = self._claim_slot()
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive across every worker mapping the segment (a no-op for a private ledger)."""
+        if self._fd is None:
+            yield
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _map_views(self, n_campaigns: int, slots: int) -> None:
+        offset = 8 * _HEADER_WORDS
+        matrix = 8 * slots * n_campaigns
+        self._header = np.ndarray((_HEADER_WORDS,), np.int64, self._buffer, 0)
+        self._pids = np.ndarray((slots,), np.int64, self._buffer, offset)
+        self._days = np.ndarray((slots,), np.int64, self._buffer, offset + 8 * slots)
+        self._spend = np.ndarray((slots, n_campaigns), np.float64, self._buffer, offset + 16 * slots)
+        self._reserved = np.ndarray((slots, n_campaigns), np.float64, self._buffer, offset + 16 * slots + matrix)
+
+    def _write_header(self, n_campaigns: int, slots: int) -> None:
+        self._header[:3] = (_MAGIC, n_campaigns, slots)
+
+    def _claim_slot(self) -> int:
+        pid = os.getpid()
+        for slot, owner in enumerate(self._pids.tolist()):
+            if owner == pid:
+                return slot
+        for slot, owner in enumerate(self._pids.tolist()):
+            if owner == 0 or not pid_alive(owner):
+                self._pids[slot] = pid
+                return slot
+        raise RuntimeError(f"All {len(self._pids)} spend ledger slots are held by live workers")
+
+    def _start_day(self, day: int) -> None:
+        if self._days[self.slot] != day:
+            self._spend[self.slot] = 0.0
+            self._reserved[self.slot] = 0.0
+            self._days[self.slot] = day
+
+    def record(self, position: int, amount: float, day: int) -> None:
+        """Add `amount` USD to a campaign's spend for `day` in this worker's row."""
+        self._start_day(day)
+        self._spend[self.slot, position] += amount
+
+    def reserve(self, position: int, amount: float, budget: float, day: int) -> float:
+        """
+        Reserve up to `amount` USD of a campaign's `budget` for this worker, as far as the
+        fleet's reservations allow. Returns what is left unreserved fleet-wide afterwards.
+        """
+        with self._locked():
+            self._start_day(day)
+            free = budget - self._reserved[self._days == day, position].sum()
+            grant = min(amount, max(free, 0.0))
+            self._reserved[self.slot, position] += grant
+            return free - grant
+
+    def allowance(self, day: int) -> np.ndarray:
+        """Reserved but unspent budget per campaign in this worker's row."""
+        if self._days[self.slot] != day:
+            return np.zeros(self._spend.shape[1])
+        return self._reserved[self.slot] - self._spend[self.slot]
+
+    def spent(self, day: int) -> np.ndarray:
+        """Spend per campaign on `day`, summed over every worker."""
+        return self._spend[self._days == day].sum(axis=0)
+
+    def reserved(self, day: int) -> np.ndarray:
+        """Reservations per campaign on `day`, summed over every worker."""
+        return self._reserved[self._days == day].sum(axis=0)
+
+    def release(self) -> None:
+        """Give this worker's row back; its spend still counts for the day."""
+        if self._pids[self.slot] == os.getpid():
+            self._pids[self.slot] = 0
+
+
+class BudgetPacer:
+    """
+    Per-campaign daily budgets (USD; inf = unlimited) over a SpendLedger.
+
+    `remaining_budget` and `bid_probability` are the scorer's columns, refreshed from the
+    ledger every `interval_s`. `remaining_budget` is what this worker could still spend:
+    its unspent reservation plus the fleet's unreserved budget. It is also updated on
+    every charge.
+    """
+
+    def __init__(
+        self,
+        budgets: np.ndarray,
+        ledger: SpendLedger,
+        clock: Callable[[], float] = time.time,
+        interval_s: float = PACING_INTERVAL_S,
+    ):
+        self.budgets = budgets
+        self.ledger = ledger
+        self.clock = clock
+        self.interval_s = interval_s
+        self.remaining_budget = budgets.copy()
+        self.bid_probability = np.ones(len(budgets))
+        self._budgeted = np.isfinite(budgets)
+        self._demand = np.full(len(budgets), np.nan)  # USD/s the fleet would spend bidding on every match
+        self._next_refresh = float("-inf")
+        self._last: tuple[float, int, np.ndarray] | None = None  # (time, day, fleet spend) at the last refresh
+
+    def charge(self, position: int, bid_price: float) -> bool:
+        """
+        Charge one bid at `bid_price` CPM to a campaign, reserving more of its budget first if
+        this worker's reservation runs short. False (and nothing charged) if the budget cannot
+        cover it; `remaining_budget` then reflects that, so the scorer passes the campaign over.
+        """
+        if not self._budgeted[position]:
+            return True
+        cost = bid_price / 1000.0
+        day = utc_day(self.clock())
+        allowance = self.ledger.allowance(day)[position]
+        if allowance < cost:
+            budget = self.budgets[position]
+            unreserved = self.ledger.reserve(
+                position, max(cost - allowance, budget * RESERVATION_SHARE), budget, day
+            )
+            allowance = self.ledger.allowance(day)[position]
+            self.remaining_budget[position] = allowance + unreserved
+            if allowance < cost:
+                return False
+        self.ledger.record(position, cost, day)
+        self.remaining_budget[position] -= cost
+        return True
+
+    def maybe_refresh(self) -> None:
+        now = self.clock()
+        if now >= self._next_refresh:
+            self.refresh(now)
+
+    def refresh(self, now: float) -> None:
+        """Re-read fleet spend and move each bid probability toward the even-spend rate."""
+        day = utc_day(now)
+        spent = self.ledger.spent(day)
+        fleet_remaining = self.budgets - spent
+        unreserved = np.maximum(self.budgets - self.ledger.reserved(day), 0.0)
+        self.remaining_budget[:] = self.ledger.allowance(day) + unreserved
+
+        last = self._last
+        if last is None or last[1] != day:
+            self.bid_probability[:] = 1.0
+            self._demand[:] = np.nan
+        elif now > last[0]:
+            probability = self.bid_probability
+            demand = (spent - last[2]) / (now - last[0]) / probability
+            self._demand = np.where(
+                np.isnan(self._demand), demand, DEMAND_SMOOTHING * demand + (1 - DEMAND_SMOOTHING) * self._demand
+            )
+            target = np.maximum(fleet_remaining, 0.0) / ((day + 1) * SECONDS_PER_DAY - now)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                wanted = np.where(self._demand > 0, target / self._demand, 1.0)
+            paced = np.clip(
+                wanted, probability / MAX_PROBABILITY_STEP, probability * MAX_PROBABILITY_STEP
+            ).clip(MIN_BID_PROBABILITY, 1.0)
+            self.bid_probability[self._budgeted] = paced[self._budgeted]
+
+        self._last = (now, day, spent)
+        self._next_refresh = now + self.interval_s
+
+    def status(self, campaign_ids: Sequence[str]) -> list[dict]:
+        """Budget, fleet-wide spend and bid probability of every budgeted campaign."""
+        spent = self.ledger.spent(utc_day(self.clock()))
+        return [
+            {
+                "campaign_id": campaign_ids[position],
+                "daily_budget": float(self.budgets[position]),
+                "spent": round(float(spent[position]), 6),
+                "bid_probability": round(float(self.bid_probability[position]), 4),
+            }
+            for position in np.flatnonzero(self._budgeted).tolist()
+        ]
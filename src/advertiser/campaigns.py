@@ -0,0 +1,153 @@
+import json
+import tomllib
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+CAMPAIGN_FORMATS = (".toml", ".jsonl")
+
+
+@dataclass(frozen=True)
+class Creative:
+    """One ad a campaign can serve; `ad_id` is returned in the bid response."""
+    ad_id: str
+
+
+@dataclass(frozen=True)
+class Campaign:
+    """
+    A line item the advertiser bids for.
+
+    Empty allow-lists mean "everything"; block-lists always win. The campaign bids on
+    requests whose floor is at most `max_cpm`; see src.advertiser.scoring for how
+    `base_bid` and `floor_affinity` set the price and src.advertiser.budget for pacing.
+    """
+    campaign_id: str
+    max_cpm: float
+    creatives: tuple[Creative, ...]
+    allowed_categories: tuple[str, ...] = ()
+    blocked_categories: tuple[str, ...] = ()
+    allowed_domains: tuple[str, ...] = ()
+    blocked_domains: tuple[str, ...] = ()
+    base_bid: float | None = None  # price before floor adjustment; None = max_cpm
+    floor_affinity: float = 0.0  # bid at least floor * (1 + floor_affinity), capped at max_cpm
+    daily_budget: float | None = None  # USD per UTC day, paced across workers; None = unlimited
+
+    def __post_init__(self):
+        if self.max_cpm <= 0:
+            raise ValueError(f"Campaign {self.campaign_id}: max_cpm must be positive")
+        if self.base_bid is not None and self.base_bid <= 0:
+            raise ValueError(f"Campaign {self.campaign_id}: base_bid must be positive")
+        if self.floor_affinity < 0:
+            raise ValueError(f"Campaign {self.campaign_id}: floor_affinity must not be negative")
+        if self.daily_budget is not None and self.daily_budget <= 0:
+            raise ValueError(f"Campaign {self.campaign_id}: daily_budget must be positive")
+        if not self.creatives:
+            raise ValueError(f"Campaign {self.campaign_id}: at least one creative is required")
+
+
+def campaign_from_dict(row: dict) -> Campaign:
+    """Build a Campaign from a TOML table or JSON object; creatives may be ad IDs or {ad_id = ...} tables."""
+    try:
+        return Campaign(
+            campaign_id=str(row["campaign_id"]),
+            max_cpm=float(row["max_cpm"]),
+            creatives=tuple(
+                Creative(ad_id=str(c["ad_id"] if isinstance(c, dict) else c)) for c in row["creatives"]
+            ),
+            allowed_categories=tuple(row.get("allowed_categories", ())),
+            blocked_categories=tuple(row.get("blocked_categories", ())),
+            allowed_domains=tuple(row.get("allowed_domains", ())),
+            blocked_domains=tuple(row.get("blocked_domains", ())),
+            base_bid=float(row["base_bid"]) if row.get("base_bid") is not None else None,
+            floor_affinity=float(row.get("floor_affinity", 0.0)),
+            daily_budget=float(row["daily_budget"]) if row.get("daily_budget") is not None else None,
+        )
+    except KeyError as e:
+        raise ValueError(f"Campaign entry is missing field {e}: {row}") from None
+
+
+def load_campaigns(path: str | Path) -> list[Campaign]:
+    """Read campaigns from a .toml file (`[[campaigns]]` tables) or a .jsonl file (one object per line)."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".toml":
+        with path.open("rb") as f:
+            rows = tomllib.load(f).get("campaigns", [])
+    elif suffix == ".jsonl":
+        with path.open() as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        raise ValueError(f"Unknown campaign file format: '{suffix}'. Available: {list(CAMPAIGN_FORMATS)}")
+    return [campaign_from_dict(row) for row in rows]
+
+
+class CampaignIndex:
+    """
+    Inverted index from request attributes to the campaigns that may bid on them.
+
+    Campaigns are ordered by descending `max_cpm` and each owns one bit of that order.
+    Category and domain rules are folded into integer bitmasks at build time, and the
+    campaigns affordable at a floor are always a prefix of the order — so matching is a
+    few dict lookups, one bisect and a bitwise AND, and the best-paying match is the
+    lowest set bit. Nothing scans the campaign list per request.
+    """
+
+    def __init__(self, campaigns: Iterable[Campaign]):
+        self.campaigns: tuple[Campaign, ...] = tuple(sorted(campaigns, key=lambda c: -c.max_cpm))
+        ids = [campaign.campaign_id for campaign in self.campaigns]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Duplicate campaign_id in campaign list")
+        self._neg_max_cpms = [-campaign.max_cpm for campaign in self.campaigns]
+
+        self._category_open = 0
+        self._domain_open = 0
+        category_allowed: dict[str, int] = defaultdict(int)
+        category_blocked: dict[str, int] = defaultdict(int)
+        domain_allowed: dict[str, int] = defaultdict(int)
+        domain_blocked: dict[str, int] = defaultdict(int)
+
+        for position, campaign in enumerate(self.campaigns):
+            bit = 1 << position
+
+            if campaign.allowed_categories:
+                for category in campaign.allowed_categories:
+                    category_allowed[category.upper()] |= bit
+            else:
+                self._category_open |= bit
+            for category in campaign.blocked_categories:
+                category_blocked[category.upper()] |= bit
+
+            if campaign.allowed_domains:
+                for domain in campaign.allowed_domains:
+                    domain_allowed[domain.lower()] |= bit
+            else:
+                self._domain_open |= bit
+            for domain in campaign.blocked_domains:
+                domain_blocked[domain.lower()] |= bit
+
+        self._category_allowed = dict(category_allowed)
+        self._category_blocked = dict(category_blocked)
+        self._domain_allowed = dict(domain_allowed)
+        self._domain_blocked = dict(domain_blocked)
+
+    def __len__(self) -> int:
+        return len(self.campaigns)
+
+    def match(self, category: str, domain: str, bid_floor: float) -> int:
+        """Bitmask (over `campaigns` positions) of every campaign eligible for this request."""
+        category = category.upper()
+        domain = domain.lower()
+        mask = (self._category_open | self._category_allowed.get(category, 0)) & ~self._category_blocked.get(category, 0)
+        mask &= (self._domain_open | self._domain_allowed.get(domain, 0)) & ~self._domain_blocked.get(domain, 0)
+        affordable = bisect_right(self._neg_max_cpms, -bid_floor)  # campaigns with max_cpm >= floor
+        return mask & ((1 << affordable) - 1)
+
+    def best(self, category: str, domain: str, bid_floor: float) -> Campaign | None:
+        """The eligible campaign with the highest max_cpm (first listed on ties), or None."""
+        mask = self.match(category, domain, bid_floor)
+        if not mask:
+            return None
+        return self.campaigns[(mask & -mask).bit_length() - 1]
@@ -1,9 +1,12 @@
 import tomllib
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 
-_CONFIGS_DIR = Path(__file__).parent / "configs"
+from src.advertiser.campaigns import Campaign, campaign_from_dict
+from src.latency import Distribution
 
+_CONFIGS_DIR = Path(__file__).parent / "configs"
+FAULT_KINDS = ("error", "malformed", "drop", "stall")
 
 
 @dataclass(frozen=True)
@@ -16,14 +19,43 @@ class ServerConfig:
     reload: bool = False
 
 
+@dataclass(frozen=True)
+class FaultConfig:
+    """`[faults]` table: how slow and how unreliable the advertiser's bid endpoints are."""
+    latency: str | None = None  # src.latency.Distribution spec in ms; None = constant response_delay_ms
+    error_rate: float = 0.0
+    error_status: int = 503
+    malformed_rate: float = 0.0
+    drop_rate: float = 0.0
+    stall_rate: float = 0.0
+    stall_ms: float = 2000.0
+
+    def __post_init__(self):
+        rates = [getattr(self, f"{kind}_rate") for kind in FAULT_KINDS]
+        if any(not 0.0 <= rate <= 1.0 for rate in rates):
+            raise ValueError("Fault rates must be between 0 and 1")
+        if sum(rates) > 1.0:
+            raise ValueError(f"Fault rates add up to {sum(rates):g}, more than 1")
+        if not 500 <= self.error_status <= 599:
+            raise ValueError(f"error_status must be a 5xx status, got {self.error_status}")
+        if self.stall_ms < 0:
+            raise ValueError("stall_ms must not be negative")
+        if self.latency is not None:
+            Distribution(self.latency)
+
+
 @dataclass(frozen=True)
 class AdvertiserConfig:
     """Main Advertiser (DSP) configuration."""
     server: ServerConfig = field(default_factory=ServerConfig)
     advertiser_id: str = "adv-001"
-    response_delay_ms: int = 50
+    response_delay_ms: int = 50  # fixed delay per response, unless faults.latency models one
     min_bid: float = 0.5
     max_bid: float = 5.0
+    max_batch_size: int = 1000  # bid requests accepted per /bid/batch call
+    campaigns: tuple[Campaign, ...] = ()  # [[campaigns]] tables in the config file
+    campaigns_file: str | None = None  # .toml/.jsonl of further campaigns; none at all = random bids
+    faults: FaultConfig = field(default_factory=FaultConfig)  # [faults] table: latency model and injected faults
 
 
 def get_config(config_path: Path) -> AdvertiserConfig:
@@ -33,4 +65,30 @@ def get_config(config_path: Path) -> AdvertiserConfig:
     with open(config_path, "rb") as f:
         data = tomllib.load(f)
     server = ServerConfig(**data.get("server", {}))
-    return AdvertiserConfig(server=server, **data.get("advertiser", {}))
+    campaigns = tuple(campaign_from_dict(row) for row in data.get("campaigns", []))
+    faults = FaultConfig(**data.get("faults", {}))
+    return AdvertiserConfig(server=server, campaigns=campaigns, faults=faults, **data.get("advertiser", {}))
+
+
+def discover_configs(env: str = "dev", configs_dir: Path = _CONFIGS_DIR) -> list[Path]:
+    """All advertiser config files for an environment (`<name>_<env>.toml`), sorted by name."""
+    return sorted(configs_dir.glob(f"*_{env}.toml"))
+
+
+def fleet_configs(env: str, count: int, synthetic_port_base: int = 9000) -> list[AdvertiserConfig]:
+    """
+    `count` advertiser configs for simulations: the discovered ones first, then copies of
+    them cycled with unique IDs and ports (`synthetic_port_base + i`).
+    """
+    discovered = [get_config(path) for path in discover_configs(env)] or [AdvertiserConfig()]
+    configs = []
+    for i in range(count):
+        config = discovered[i % len(discovered)]
+        if i >= len(discovered):
+            config = replace(
+                config,
+                advertiser_id=f"{config.advertiser_id}-{i}",
+                server=replace(config.server, port=synthetic_port_base + i),
+            )
+        configs.append(config)
+    return configs
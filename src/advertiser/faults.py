@@ -0,0 +1,152 @@
+"""
+Latency model and fault injection for an advertiser's bid endpoints.
+
+Every /bid (and every /bid/batch, as a whole) waits a latency drawn from `FaultConfig.latency`
+— any src.latency.Distribution spec, e.g. a bimodal slow tail or an empirical histogram —
+or the fixed `response_delay_ms` without one. On top of that, one uniform draw per request
+picks at most one fault at the configured rates:
+
+    error       HTTP `error_status` (5xx) with an empty body
+    malformed   HTTP 200 with a truncated JSON body
+    drop        response headers and part of the body, then the connection is closed
+    stall       answers normally, but only after `stall_ms` — past any SSP tmax
+
+The settings can be changed at runtime (PATCH /admin/faults). With several workers, the
+change is written to a state file in RTB_FAULTS_DIR (default: the temp directory) that every
+worker re-reads within STATE_POLL_S; the file is named after the uvicorn master's PID, so a
+new run never picks up an old run's faults, and the master deletes it when it shuts down.
+"""
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from dataclasses import asdict, replace
+from pathlib import Path
+
+import numpy as np
+from fastapi import Response
+from starlette.types import Receive, Scope, Send
+
+from src.advertiser.config import FAULT_KINDS, FaultConfig
+from src.latency import Distribution
+
+STATE_POLL_S = 1.0
+MALFORMED_BODY = b'{"request_id": "'
+
+
+class ConnectionDropped(Exception):
+    """Raised by DroppedConnection once its partial response is out; the server then closes the connection."""
+
+
+class _DroppedConnectionFilter(logging.Filter):
+    """Drops the "Exception in ASGI application" record uvicorn logs when it closes a dropped connection."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not (record.exc_info and isinstance(record.exc_info[1], ConnectionDropped))
+
+
+_DROPPED_CONNECTION_FILTER = _DroppedConnectionFilter()
+
+
+def silence_dropped_connections() -> None:
+    """Keep uvicorn from logging a traceback per injected drop; faults_injected already counts them."""
+    logging.getLogger("uvicorn.error").addFilter(_DROPPED_CONNECTION_FILTER)
+
+
+class DroppedConnection(Response):
+    """Starts a response and hangs up before finishing it: the client sees the connection drop."""
+
+    def __init__(self):
+        super().__init__(status_code=200)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", b"256")],
+        })
+        await send({"type": "http.response.body", "body": MALFORMED_BODY, "more_body": True})
+        raise ConnectionDropped()
+
+
+class FaultInjector:
+    """Draws each response's latency and fault from a FaultConfig that can be replaced at runtime."""
+
+    def __init__(
+        self,
+        config: FaultConfig,
+        response_delay_ms: float,
+        rng: np.random.Generator | None = None,
+        state_path: Path | None = None,
+    ):
+        self.response_delay_ms = response_delay_ms
+        self.state_path = state_path
+        self._rng = rng or np.random.default_rng()
+        self._uniform = random.Random(int(self._rng.integers(2**63))).random
+        self._state_mtime: int | None = None
+        self._next_poll = 0.0
+        self._apply(config)
+
+    def _apply(self, config: FaultConfig) -> None:
+        self.config = config
+        self._latency = Distribution(config.latency, self._rng) if config.latency else None
+        self._thresholds = np.cumsum([getattr(config, f"{kind}_rate") for kind in FAULT_KINDS]).tolist()
+
+    def draw(self) -> tuple[str | None, float]:
+        """(fault to inject or None, delay in ms) for one response."""
+        if self.state_path is not None:
+            self._poll_state()
+        u = self._uniform()
+        fault = next((kind for kind, threshold in zip(FAULT_KINDS, self._thresholds) if u < threshold), None)
+        if fault == "stall":
+            return fault, self.config.stall_ms
+        return fault, self.response_delay_ms if self._latency is None else self._latency.sample()
+
+    def respond(self, fault: str) -> Response:
+        """The response that injects `fault`."""
+        if fault == "error":
+            return Response(status_code=self.config.error_status)
+        if fault == "malformed":
+            return Response(content=MALFORMED_BODY, media_type="application/json")
+        return DroppedConnection()
+
+    def update(self, **changes) -> FaultConfig:
+        """Replace some settings (raises ValueError if the result is invalid) and share them with other workers."""
+        config = replace(self.config, **changes)
+        self._apply(config)
+        if self.state_path is not None:
+            tmp = self.state_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(asdict(config)))
+            os.replace(tmp, self.state_path)
+            self._state_mtime = self.state_path.stat().st_mtime_ns
+        return config
+
+    def _poll_state(self) -> None:
+        now = time.monotonic()
+        if now < self._next_poll:
+            return
+        self._next_poll = now + STATE_POLL_S
+        try:
+            mtime = self.state_path.stat().st_mtime_ns
+            if mtime != self._state_mtime:
+                self._apply(FaultConfig(**json.loads(self.state_path.read_text())))
+                self._state_mtime = mtime
+        except (OSError, ValueError, TypeError):
+            return
+
+
+def state_dir() -> Path:
+    """Where fault state files live: RTB_FAULTS_DIR, else the temp directory."""
+    return Path(os.getenv("RTB_FAULTS_DIR") or tempfile.gettempdir())
+
+
+def shared_state_path(directory: str | Path, advertiser_id: str, master_pid: int | None = None) -> Path:
+    """Fault state file shared by the workers of a uvicorn master (by default: this worker's)."""
+    return Path(directory) / f"rtb-faults-{advertiser_id}-{master_pid or os.getppid()}.json"
+
+
+def remove_shared_state(advertiser_id: str, directory: str | Path | None = None) -> None:
+    """Master shutdown: delete the fault state file this master's workers shared."""
+    shared_state_path(directory or state_dir(), advertiser_id, master_pid=os.getpid()).unlink(missing_ok=True)
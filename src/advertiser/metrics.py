@@ -0,0 +1,15 @@
+from src.metrics import PRICE_BUCKETS, add_http_metrics, create_registry
+
+registry = create_registry("advertiser")
+
+http_requests, http_latency = add_http_metrics(registry)
+
+bids = registry.counter("advertiser_bids_total", "Bid responses returned")
+no_bids = registry.counter("advertiser_no_bids_total", "Requests no campaign matched (204 No Content)")
+bid_price = registry.histogram("advertiser_bid_price", "Submitted bid prices (USD CPM)", PRICE_BUCKETS)
+batch_size = registry.histogram(
+    "advertiser_batch_size", "Bid requests per /bid/batch call", (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+faults_injected = registry.counter(
+    "advertiser_faults_injected_total", "Injected faults (error, malformed, drop, stall), by kind", ("kind",)
+)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class BidResponse(BaseModel):
@@ -7,3 +7,17 @@ class BidResponse(BaseModel):
     advertiser_id: str = Field(..., description="Advertiser identifier")
     bid_price: float = Field(..., ge=0, description="Bid price in USD")
     ad_id: str = Field(..., description="ID of the ad to display")
+    campaign_id: str | None = Field(None, description="Campaign that bid, when campaigns are configured")
+
+
+class FaultSettings(BaseModel):
+    """Partial update of the advertiser's latency model and injected faults (see src.advertiser.faults)."""
+    model_config = ConfigDict(extra="forbid")
+
+    latency: str | None = Field(None, description="Latency distribution spec in ms; null = response_delay_ms")
+    error_rate: float | None = Field(None, ge=0, le=1, description="Share of responses that are HTTP 5xx")
+    error_status: int | None = Field(None, ge=500, le=599, description="Status code of injected errors")
+    malformed_rate: float | None = Field(None, ge=0, le=1, description="Share of responses with truncated JSON")
+    drop_rate: float | None = Field(None, ge=0, le=1, description="Share of connections dropped mid-response")
+    stall_rate: float | None = Field(None, ge=0, le=1, description="Share of responses held for stall_ms")
+    stall_ms: float | None = Field(None, ge=0, description="How long a stalled response is held")
@@ -0,0 +1,136 @@
+"""
+Vectorized campaign scoring.
+
+Campaign parameters live in columnar NumPy arrays, one element per campaign in
+`CampaignIndex` order, so every eligible campaign of a request — or of a whole micro-batch
+of requests — is priced in one pass instead of a Python loop over campaigns:
+
+    price = min(max_cpm, pacing * max(base_bid, floor * (1 + floor_affinity)))
+
+rounded to cents. A campaign is in the running when its targeting matches, its price
+still meets the floor, its remaining budget covers one impression at that price
+(price / 1000), and the request's uniform draw falls below its bid probability. The
+highest price wins; ties go to the campaign listed first in the index, i.e. the one with
+the higher max_cpm.
+
+Candidates are priced in widening windows down the index. Pacing never raises a price,
+so suffix maxima of the static terms bound what the rest of the index could still bid,
+and scoring stops once the best price so far reaches that bound.
+"""
+import numpy as np
+
+from src.advertiser.campaigns import CampaignIndex
+
+FIRST_WINDOW = 64  # candidates priced in the first pass; each further pass is WINDOW_GROWTH times wider
+WINDOW_GROWTH = 8
+
+
+class CampaignScorer:
+    """Columnar campaign parameters plus the single-request and batch scoring passes over them."""
+
+    def __init__(self, index: CampaignIndex):
+        campaigns = index.campaigns
+        self.size = len(campaigns)
+        self._nbytes = (self.size + 7) // 8
+        self.max_cpm = np.array([c.max_cpm for c in campaigns], dtype=np.float64)
+        self.base_bid = np.array([c.max_cpm if c.base_bid is None else c.base_bid for c in campaigns], dtype=np.float64)
+        self.floor_affinity = np.array([c.floor_affinity for c in campaigns], dtype=np.float64)
+        self._floor_factor = 1.0 + self.floor_affinity
+        self.pacing = np.ones(self.size, dtype=np.float64)  # in [0, 1]: 0 stops a campaign, 1 bids in full
+        self.remaining_budget = np.full(self.size, np.inf)  # USD; inf = unlimited
+        self.bid_probability = np.ones(self.size)  # share of requests a campaign bids on (budget pacing)
+
+        # Bounds on what any campaign from position i onwards can bid (pacing <= 1):
+        #   price <= max(min(max_cpm, base_bid), min(max_cpm, floor * floor_factor))
+        # max_cpm is already descending in index order; the other two need suffix maxima.
+        self._static_bound = np.maximum.accumulate(np.minimum(self.max_cpm, self.base_bid)[::-1])[::-1]
+        self._factor_bound = np.maximum.accumulate(self._floor_factor[::-1])[::-1]
+
+    def score(self, mask: int, floor: float, draw: float = 0.0) -> tuple[int, float] | None:
+        """
+        (position, price) of the best campaign among those in `mask`, or None if none can bid.
+
+        `draw` is the request's uniform [0, 1) draw against each campaign's bid probability.
+        """
+        if not mask:
+            return None
+        positions = np.flatnonzero(self._unpack([mask])[0])
+        best_position, best_price = -1, -np.inf
+        lo, width = 0, FIRST_WINDOW
+        while lo < positions.size:
+            if best_price >= self._bound(int(positions[lo]), floor):
+                break  # nothing further down the index can beat (or, on ties, displace) the best
+            window = positions[lo:lo + width]
+            prices = self._prices(window, floor, draw)
+            i = int(prices.argmax())
+            if prices[i] > best_price:
+                best_position, best_price = int(window[i]), float(prices[i])
+            lo, width = lo + width, width * WINDOW_GROWTH
+        return None if best_position < 0 else (best_position, best_price)
+
+    def score_batch(
+        self, masks: list[int], floors: list[float], draws: list[float] | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score many requests together, each window of columns in one pass over every request still open.
+
+        Returns:
+            positions: (n_requests,) winning campaign position, -1 where no campaign can bid
+            prices: (n_requests,) price bid, NaN where no campaign can bid
+        """
+        n_requests = len(masks)
+        winners = np.full(n_requests, -1)
+        best = np.full(n_requests, -np.inf)
+        if n_requests == 0 or self.size == 0:
+            return winners, np.full(n_requests, np.nan)
+        eligible_all = self._unpack(masks).astype(bool)
+        all_floors = np.asarray(floors, dtype=np.float64)
+        all_draws = np.zeros(n_requests) if draws is None else np.asarray(draws, dtype=np.float64)
+        rows = np.arange(n_requests)
+
+        start, width = 0, FIRST_WINDOW
+        while rows.size and start < self.size:
+            stop = min(start + width, self.size)
+            columns = slice(start, stop)
+            row_floors = all_floors[rows, None]
+            prices = np.round(np.minimum(
+                self.max_cpm[columns],
+                self.pacing[columns] * np.maximum(self.base_bid[columns], row_floors * self._floor_factor[columns]),
+            ), 2)
+            eligible = eligible_all[rows, columns] & (prices >= row_floors) & (prices > 0)
+            eligible &= self.remaining_budget[columns] >= prices / 1000.0
+            eligible &= all_draws[rows, None] < self.bid_probability[columns]
+            prices = np.where(eligible, prices, -np.inf)
+
+            top_columns = prices.argmax(axis=1)
+            top = prices[np.arange(rows.size), top_columns]
+            better = top > best[rows]  # strict: on ties the earlier (higher max_cpm) campaign keeps the win
+            best[rows[better]] = top[better]
+            winners[rows[better]] = start + top_columns[better]
+
+            start, width = stop, width * WINDOW_GROWTH
+            if start < self.size:
+                rows = rows[best[rows] < self._bound(start, all_floors[rows])]
+        return winners, np.where(winners >= 0, best, np.nan)
+
+    def _bound(self, position: int, floors: float | np.ndarray) -> float | np.ndarray:
+        """Highest price any campaign at `position` or later could bid at `floors`."""
+        return np.maximum(
+            self._static_bound[position], np.minimum(self.max_cpm[position], floors * self._factor_bound[position])
+        )
+
+    def _unpack(self, masks: list[int]) -> np.ndarray:
+        """(len(masks), size) 0/1 matrix of `CampaignIndex.match` masks."""
+        raw = np.frombuffer(b"".join(mask.to_bytes(self._nbytes, "little") for mask in masks), dtype=np.uint8)
+        return np.unpackbits(raw.reshape(len(masks), self._nbytes), axis=1, count=self.size, bitorder="little")
+
+    def _prices(self, positions: np.ndarray, floor: float, draw: float) -> np.ndarray:
+        """Cent-rounded price of each campaign in `positions`; -inf where it cannot bid."""
+        prices = np.minimum(
+            self.max_cpm[positions],
+            self.pacing[positions] * np.maximum(self.base_bid[positions], floor * self._floor_factor[positions]),
+        )
+        prices = np.round(prices, 2)
+        eligible = (prices >= floor) & (prices > 0) & (self.remaining_budget[positions] >= prices / 1000.0)
+        eligible &= draw < self.bid_probability[positions]
+        return np.where(eligible, prices, -np.inf)
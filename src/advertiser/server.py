@@ -1,78 +1,241 @@
 import asyncio
 import os
-import random
-import uuid
 from contextlib import asynccontextmanager
+from dataclasses import asdict, replace
 
 from pathlib import Path
 
-from fastapi import FastAPI
-
-from src.logging_config import get_logger
-from src.advertiser.config import get_config, _CONFIGS_DIR
-from src.advertiser.models import BidResponse
+import orjson
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+from src.logging_config import get_logger, get_request_logger
+from src.metrics import MetricsMiddleware
+from src.advertiser import metrics
+from src.advertiser.bidding import create_bidder
+from src.advertiser.budget import default_spend_dir
+from src.advertiser.config import AdvertiserConfig, FaultConfig, get_config, _CONFIGS_DIR
+from src.advertiser.faults import (
+    FaultInjector,
+    remove_shared_state,
+    shared_state_path,
+    silence_dropped_connections,
+    state_dir,
+)
+from src.advertiser.models import BidResponse, FaultSettings
+from src.ssp.batch import parse_batch
 from src.ssp.models import BidRequestIn
+from src.tracing import TracingMiddleware, create_tracer
 
 env = os.getenv("RTB_ENV", "dev")
 config_path = Path(os.getenv("RTB_CONFIG_PATH", str(_CONFIGS_DIR / f"adv001_{env}.toml")))
 config = get_config(config_path)
-
-logger = get_logger(f"Advertiser[{config.advertiser_id}]")
-
-
-@asynccontextmanager
-async def lifespan(_app: FastAPI):
-    logger.info(f"🚀 Advertiser starting | env={env} | id={config.advertiser_id}")
-    logger.info(f"⚙️  Config: host={config.server.host}, port={config.server.port}, "
-                f"delay={config.response_delay_ms}ms, bid_range=[{config.min_bid}, {config.max_bid}]")
-    yield
-    logger.info("🛑 Advertiser shutting down")
-
-
-app = FastAPI(title=f"RTB Advertiser (DSP) [{config.advertiser_id}]", version="0.1.0", lifespan=lifespan)
-
-
-@app.post("/bid", response_model=BidResponse)
-async def handle_bid_request(bid_request: BidRequestIn):
-    """Process incoming bid request and return a bid response."""
-    logger.info(
-        f"📥 Received bid request: ID={bid_request.id[:8]}... | "
-        f"domain={bid_request.domain} | floor={bid_request.bid_floor}$"
+if os.getenv("RTB_WORKERS"):
+    # The worker count uvicorn really runs (run_service sets it), which --workers may override.
+    config = replace(config, server=replace(config.server, workers=int(os.environ["RTB_WORKERS"])))
+
+
+def create_app(config: AdvertiserConfig) -> FastAPI:
+    """Build an advertiser app for `config`; several can run side by side in one process."""
+    logger = get_logger(f"Advertiser[{config.advertiser_id}]")
+    request_logger = get_request_logger(f"Advertiser[{config.advertiser_id}]")
+    tracer = create_tracer(config.advertiser_id)
+    spend_dir = os.getenv("RTB_SPEND_DIR") or default_spend_dir()
+    bidder = create_bidder(config, os.getenv("RTB_CAMPAIGNS"), spend_dir=spend_dir)
+    campaign_count = len(bidder.index) if bidder.index is not None else 0
+    silence_dropped_connections()
+    faults = FaultInjector(
+        config.faults,
+        config.response_delay_ms,
+        state_path=shared_state_path(state_dir(), config.advertiser_id) if config.server.workers > 1 else None,
     )
 
-    await asyncio.sleep(config.response_delay_ms / 1000.0)
-
-    bid_price = round(random.uniform(config.min_bid, config.max_bid), 2)
-
-    response = BidResponse(
-        request_id=bid_request.id,
-        advertiser_id=config.advertiser_id,
-        bid_price=bid_price,
-        ad_id=str(uuid.uuid4()),
-    )
-
-    logger.info(
-        f"📤 Sending bid response: ID={bid_request.id[:8]}... | "
-        f"price={bid_price}$ | ad={response.ad_id[:8]}..."
-    )
-
-    return response
-
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    return {"status": "ok", "env": env, "advertiser_id": config.advertiser_id}
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI):
+        logger.info(f"🚀 Advertiser starting | env={env} | id={config.advertiser_id}")
+        logger.info(f"⚙️  Config: host={config.server.host}, port={config.server.port}, "
+                    f"delay={config.response_delay_ms}ms, bid_range=[{config.min_bid}, {config.max_bid}], "
+                    f"campaigns={campaign_count}")
+        if config.faults != FaultConfig():
+            logger.info(f"💥 Latency model and faults: {config.faults}")
+        if bidder.pacer is not None:
+            logger.info(f"💰 Pacing daily budgets | spend segment={bidder.pacer.ledger.path} "
+                        f"slot={bidder.pacer.ledger.slot}")
+        metrics_flusher = asyncio.create_task(metrics.registry.flush_periodically())
+        yield
+        metrics_flusher.cancel()
+        metrics.registry.close()
+        if bidder.pacer is not None:
+            bidder.pacer.ledger.release()
+        logger.info("🛑 Advertiser shutting down")
+
+    app = FastAPI(title=f"RTB Advertiser (DSP) [{config.advertiser_id}]", version="0.1.0", lifespan=lifespan)
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+    app.add_middleware(MetricsMiddleware, requests=metrics.http_requests, latency=metrics.http_latency)
+
+    @app.post("/bid", response_model=BidResponse, responses={204: {"description": "No campaign matches the request"}})
+    async def handle_bid_request(bid_request: BidRequestIn):
+        """Process incoming bid request and return a bid response."""
+        tracer.record_since_request_start("parse")
+        request_logger.info(
+            "📥 Received bid request: ID=%.8s... | domain=%s | floor=%s$",
+            bid_request.id, bid_request.domain, bid_request.bid_floor,
+        )
+
+        fault, delay_ms = faults.draw()
+        with tracer.span("delay", delay_ms=delay_ms):
+            await asyncio.sleep(delay_ms / 1000.0)
+        if fault is not None:
+            metrics.faults_injected.inc(fault)
+            request_logger.info("💥 Injecting %s into response to %.8s...", fault, bid_request.id)
+            if fault != "stall":
+                return faults.respond(fault)
+
+        with tracer.span("bid_logic"):
+            decision = bidder.bid(bid_request.category, bid_request.domain, bid_request.bid_floor)
+
+        if decision is None:
+            metrics.no_bids.inc()
+            request_logger.info("📭 No campaign matches request %.8s...", bid_request.id)
+            return Response(status_code=204)
+
+        response = BidResponse(
+            request_id=bid_request.id,
+            advertiser_id=config.advertiser_id,
+            bid_price=decision.bid_price,
+            ad_id=decision.ad_id,
+            campaign_id=decision.campaign_id,
+        )
+        metrics.bids.inc()
+        metrics.bid_price.observe(decision.bid_price)
+        request_logger.info(
+            "📤 Sending bid response: ID=%.8s... | price=%s$ | ad=%.8s...",
+            bid_request.id, decision.bid_price, response.ad_id,
+        )
+
+        return response
+
+    @app.post("/bid/batch")
+    async def handle_bid_request_batch(request: Request):
+        """
+        Bid on many requests in one call — a JSON array or NDJSON (application/x-ndjson).
+
+        One response delay covers the whole batch and every valid item is scored in one pass.
+        Returns a JSON array in input order: a "bid" result with the bid response fields, a
+        "no_bid" result, or an inline "rejected" result for an invalid item.
+        """
+        try:
+            items = parse_batch(await request.body(), request.headers.get("content-type", ""), config.max_batch_size)
+        except ValueError as e:
+            logger.warning(f"🚫 Invalid bid request batch received: {e}")
+            return JSONResponse(
+                status_code=422,
+                content={"status": "rejected", "reason": "invalid_batch", "errors": [{"message": str(e)}]},
+            )
+        tracer.record_since_request_start("parse")
+        bid_requests = [item for item in items if isinstance(item, BidRequestIn)]
+        metrics.batch_size.observe(len(items))
+        request_logger.info("📥 Received bid request batch: size=%d | valid=%d", len(items), len(bid_requests))
+
+        fault, delay_ms = faults.draw()
+        with tracer.span("delay", delay_ms=delay_ms):
+            await asyncio.sleep(delay_ms / 1000.0)
+        if fault is not None:
+            metrics.faults_injected.inc(fault)
+            request_logger.info("💥 Injecting %s into batch response of %d items", fault, len(items))
+            if fault != "stall":
+                return faults.respond(fault)
+
+        with tracer.span("bid_logic", batch_size=len(bid_requests)):
+            decisions = iter(bidder.bid_batch([(r.category, r.domain, r.bid_floor) for r in bid_requests]))
+
+        results = []
+        for item in items:
+            if not isinstance(item, BidRequestIn):
+                results.append(item)
+                continue
+            decision = next(decisions)
+            if decision is None:
+                metrics.no_bids.inc()
+                results.append({"status": "no_bid", "request_id": item.id})
+                continue
+            metrics.bids.inc()
+            metrics.bid_price.observe(decision.bid_price)
+            results.append({
+                "status": "bid",
+                "request_id": item.id,
+                "advertiser_id": config.advertiser_id,
+                "bid_price": decision.bid_price,
+                "ad_id": decision.ad_id,
+                "campaign_id": decision.campaign_id,
+            })
+        request_logger.info(
+            "📤 Sending bid batch response: size=%d | bids=%d",
+            len(results), sum(result.get("status") == "bid" for result in results),
+        )
+        return Response(content=orjson.dumps(results), media_type="application/json")
+
+    @app.get("/metrics")
+    async def metrics_endpoint():
+        """Prometheus scrape endpoint (summed across workers when RTB_METRICS_DIR is set)."""
+        return metrics.registry.response()
+
+    @app.get("/debug/traces")
+    async def debug_traces(trace_id: str | None = None, limit: int = 100):
+        """Recently recorded spans, newest first — optionally for a single trace."""
+        return {"service": tracer.service, "spans": tracer.query(trace_id, limit)}
+
+    @app.get("/admin/faults")
+    async def get_faults():
+        """Current latency model and fault rates."""
+        return asdict(faults.config)
+
+    @app.patch("/admin/faults")
+    async def update_faults(settings: FaultSettings):
+        """Change some latency/fault settings at runtime; every worker picks them up within a second."""
+        changes = settings.model_dump(exclude_unset=True)
+        try:
+            if any(value is None for name, value in changes.items() if name != "latency"):
+                raise ValueError("Only latency may be set to null")
+            updated = faults.update(**changes)
+        except ValueError as e:
+            return JSONResponse(
+                status_code=422,
+                content={"status": "rejected", "reason": "invalid_faults", "errors": [{"message": str(e)}]},
+            )
+        logger.warning(f"💥 Fault settings changed: {updated}")
+        return asdict(updated)
+
+    @app.get("/debug/budget")
+    async def debug_budget():
+        """Daily budget, fleet-wide spend and bid probability of every budgeted campaign."""
+        if bidder.pacer is None:
+            return {"campaigns": []}
+        bidder.pacer.maybe_refresh()
+        return {"campaigns": bidder.pacer.status([c.campaign_id for c in bidder.index.campaigns])}
+
+    @app.get("/health")
+    async def health_check():
+        """Health check endpoint."""
+        return {"status": "ok", "env": env, "advertiser_id": config.advertiser_id, "campaigns": campaign_count}
+
+    return app
+
+
+app = create_app(config)
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(
-        "src.advertiser.server:app",
-        host=config.server.host,
-        port=config.server.port,
-        workers=config.server.workers,
-        log_level=config.server.log_level,
-        reload=config.server.reload,
-    )
+    try:
+        uvicorn.run(
+            "src.advertiser.server:app",
+            host=config.server.host,
+            port=config.server.port,
+            workers=config.server.workers,
+            log_level=config.server.log_level,
+            reload=config.server.reload,
+        )
+    finally:
+        remove_shared_state(config.advertiser_id)
@@ -0,0 +1,415 @@
+"""
+End-to-end benchmark of the whole RTB stack.
+
+Brings the stack up under the process supervisor, drives the publisher's open loop at each
+requested rate for a fixed duration, and tears everything down. Every service's /metrics is
+scraped before and after each run; the differences give achieved throughput, fill and
+timeout rates, and latency percentiles per hop (interpolated from histogram buckets). CPU
+and peak RSS are sampled per service process tree from /proc.
+
+The report is written as JSON (stable keys, one entry per target rate, tagged with the git
+commit) plus a text summary. Pass `--baseline` with an earlier JSON report to print the
+change in throughput and tail latency.
+
+    python -m src.benchmark --rates 100,500,1000 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from src.logging_config import get_logger, setup_logging
+from src.supervisor import ServiceSpec, Supervisor, build_services
+
+logger = get_logger("Benchmark")
+
+QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99, "p99.9": 0.999}
+
+# hop name -> (service, histogram, label filter)
+HOPS = {
+    "end_to_end": ("publisher", "publisher_scheduled_latency_ms", {}),
+    "publisher_send": ("publisher", "publisher_send_latency_ms", {}),
+    "ssp_request": ("ssp", "http_request_duration_ms", {"path": "/bid/request"}),
+    "ssp_to_bidder": ("ssp", "ssp_bidder_response_time_ms", {}),
+    "advertiser_bid": ("advertiser", "http_request_duration_ms", {"path": "/bid"}),
+}
+
+_SAMPLE_LINE = re.compile(r"^([a-zA-Z_:][\w:]*)(?:\{(.*)\})? (\S+)$")
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+Samples = dict[tuple[str, tuple[tuple[str, str], ...]], float]
+
+
+# ── Prometheus text parsing ──
+
+def parse_metrics(text: str) -> Samples:
+    """Parse Prometheus text exposition into {(name, sorted label pairs): value}."""
+    samples: Samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE_LINE.match(line)
+        if match is None:
+            continue
+        name, labels, value = match.groups()
+        pairs = tuple(sorted(_LABEL.findall(labels or "")))
+        samples[(name, pairs)] = float(value)
+    return samples
+
+
+def merge_samples(*scrapes: Samples) -> Samples:
+    """Sum samples from several scrapes (e.g. one per advertiser)."""
+    merged: Samples = {}
+    for samples in scrapes:
+        for key, value in samples.items():
+            merged[key] = merged.get(key, 0.0) + value
+    return merged
+
+
+def diff_samples(after: Samples, before: Samples) -> Samples:
+    return {key: value - before.get(key, 0.0) for key, value in after.items()}
+
+
+def counter_total(samples: Samples, name: str, **label_filter: str) -> float:
+    """Sum of a counter over every series matching `label_filter`."""
+    return sum(
+        value for (sample_name, pairs), value in samples.items()
+        if sample_name == name and all(dict(pairs).get(k) == v for k, v in label_filter.items())
+    )
+
+
+def histogram_quantiles(samples: Samples, name: str, label_filter: dict | None = None) -> dict:
+    """
+    Count and QUANTILES of a histogram, summed over every series matching `label_filter`.
+
+    Quantiles are linearly interpolated inside the bucket they fall in; values beyond the
+    largest finite bucket are reported as that bucket's bound.
+    """
+    label_filter = label_filter or {}
+    buckets: dict[float, float] = {}
+    for (sample_name, pairs), value in samples.items():
+        if sample_name != f"{name}_bucket":
+            continue
+        labels = dict(pairs)
+        if any(labels.get(k) != v for k, v in label_filter.items()):
+            continue
+        bound = float("inf") if labels["le"] == "+Inf" else float(labels["le"])
+        buckets[bound] = buckets.get(bound, 0.0) + value
+
+    bounds = sorted(buckets)
+    count = buckets.get(float("inf"), 0.0)
+    result: dict = {"count": int(count)}
+    for label, q in QUANTILES.items():
+        result[label] = _bucket_quantile(bounds, buckets, count, q)
+    return result
+
+
+def _bucket_quantile(bounds: list[float], cumulative: dict[float, float], count: float, q: float) -> float | None:
+    if count <= 0:
+        return None
+    rank = q * count
+    lower, below = 0.0, 0.0
+    for bound in bounds:
+        seen = cumulative[bound]
+        if seen >= rank:
+            if bound == float("inf"):
+                return lower
+            if seen == below:
+                return bound
+            return round(lower + (bound - lower) * (rank - below) / (seen - below), 3)
+        lower, below = bound, seen
+    return lower
+
+
+# ── Process sampling ──
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _read_stat(pid: int) -> list[str] | None:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Fields after the parenthesised command name, starting with field 3 (state).
+            return f.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+
+
+def process_tree(pid: int) -> list[int]:
+    """`pid` and all its descendants (Linux /proc only; just `pid` elsewhere)."""
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else ():
+        if entry.isdigit():
+            fields = _read_stat(int(entry))
+            if fields is not None:
+                children.setdefault(int(fields[1]), []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, ()))
+    return tree
+
+
+def tree_usage(pid: int) -> tuple[float, int]:
+    """(CPU seconds, RSS bytes) summed over a process tree; (0, 0) when /proc is unavailable."""
+    cpu_s, rss = 0.0, 0
+    for member in process_tree(pid):
+        fields = _read_stat(member)
+        if fields is None:
+            continue
+        cpu_s += (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS  # utime + stime
+        rss += int(fields[21]) * _PAGE_SIZE
+    return cpu_s, rss
+
+
+class ProcessSampler:
+    """Tracks CPU time and peak RSS of each service's process tree during a run."""
+
+    def __init__(self, pids: dict[str, int]):
+        self.pids = pids
+        self._start = time.monotonic()
+        self._cpu_start = {name: tree_usage(pid)[0] for name, pid in pids.items()}
+        self._peak_rss = {name: 0 for name in pids}
+
+    def sample(self) -> None:
+        for name, pid in self.pids.items():
+            self._peak_rss[name] = max(self._peak_rss[name], tree_usage(pid)[1])
+
+    def report(self) -> dict:
+        elapsed = time.monotonic() - self._start
+        return {
+            name: {
+                "cpu_percent": round((tree_usage(pid)[0] - self._cpu_start[name]) / elapsed * 100.0, 1),
+                "peak_rss_mb": round(self._peak_rss[name] / 2**20, 1),
+            }
+            for name, pid in self.pids.items()
+        }
+
+
+# ── Running ──
+
+class StackBenchmark:
+    """Drives a running stack through benchmark runs and collects one result per target rate."""
+
+    def __init__(self, supervisor: Supervisor, services: list[ServiceSpec], client: httpx.AsyncClient):
+        self.supervisor = supervisor
+        self.client = client
+        self.publisher = next(spec for spec in services if spec.name == "Publisher")
+        self.ssp = next(spec for spec in services if spec.name == "SSP")
+        self.advertisers = [spec for spec in services if spec.app.startswith("src.advertiser")]
+        self.services = services
+
+    async def scrape(self) -> dict[str, Samples]:
+        """Current metrics per service kind; advertisers are summed together."""
+        specs = [self.publisher, self.ssp, *self.advertisers]
+        responses = await asyncio.gather(*(self.client.get(f"{spec.base_url}/metrics") for spec in specs))
+        parsed = [parse_metrics(response.text) for response in responses]
+        return {"publisher": parsed[0], "ssp": parsed[1], "advertiser": merge_samples(*parsed[2:])}
+
+    async def run(self, rate_rps: float, duration_s: float, warmup_s: float, arrivals: str) -> dict:
+        """Offer `rate_rps` for `warmup_s + duration_s` and measure the last `duration_s` seconds."""
+        start = await self.client.post(
+            f"{self.publisher.base_url}/start", params={"mode": "open", "rate_rps": rate_rps, "arrivals": arrivals}
+        )
+        start.raise_for_status()
+        await asyncio.sleep(warmup_s)
+
+        before = await self.scrape()
+        sampler = ProcessSampler({spec.name: self.supervisor.pid(spec.name) for spec in self.services})
+        started = time.monotonic()
+        while (remaining := duration_s - (time.monotonic() - started)) > 0:
+            sampler.sample()
+            await asyncio.sleep(min(0.5, remaining))
+        after = await self.scrape()
+        elapsed = time.monotonic() - started
+        processes = sampler.report()
+
+        await self.client.post(f"{self.publisher.base_url}/stop")
+        await asyncio.sleep(1.0)  # let in-flight requests drain before the next run
+        return summarize_run(rate_rps, elapsed, before, after, processes)
+
+
+def summarize_run(
+    rate_rps: float, elapsed_s: float, before: dict[str, Samples], after: dict[str, Samples], processes: dict
+) -> dict:
+    """Turn two scrapes of every service into one benchmark result."""
+    delta = {service: diff_samples(after[service], before[service]) for service in after}
+    completed = counter_total(delta["publisher"], "publisher_requests_total")
+    bidder_calls = counter_total(delta["ssp"], "ssp_bidder_requests_total")
+    return {
+        "target_rps": rate_rps,
+        "duration_s": round(elapsed_s, 3),
+        "achieved_rps": round(completed / elapsed_s, 2) if elapsed_s else 0.0,
+        "requests": int(completed),
+        "fill_rate": _ratio(counter_total(delta["publisher"], "publisher_requests_total", result="bid_won"), completed),
+        "error_rate": _ratio(counter_total(delta["publisher"], "publisher_requests_total", result="failed"), completed),
+        "timeout_rate": _ratio(
+            counter_total(delta["ssp"], "ssp_bidder_requests_total", outcome="timeout"), bidder_calls
+        ),
+        "shed_requests": int(counter_total(delta["ssp"], "ssp_admission_rejected_total")),
+        "latency_ms": {
+            hop: histogram_quantiles(delta[service], name, label_filter)
+            for hop, (service, name, label_filter) in HOPS.items()
+        },
+        "processes": processes,
+    }
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return round(numerator / denominator, 4) if denominator else 0.0
+
+
+# ── Reporting ──
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_report(report: dict, baseline: dict | None = None) -> str:
+    """Human-readable summary of a report, optionally compared to a baseline report."""
+    meta = report["meta"]
+    lines = [
+        f"RTB benchmark | commit={meta['commit']} | {meta['timestamp']} | env={meta['env']} "
+        f"| workers={meta['workers']} | arrivals={meta['arrivals']} | duration={meta['duration_s']}s",
+        "",
+        f"{'target_rps':>10} {'achieved':>9} {'fill':>6} {'errors':>7} {'timeouts':>9} {'shed':>6} "
+        f"{'e2e_p50':>8} {'e2e_p99':>8} {'e2e_p99.9':>9}",
+    ]
+    for run in report["runs"]:
+        e2e = run["latency_ms"]["end_to_end"]
+        lines.append(
+            f"{run['target_rps']:>10g} {run['achieved_rps']:>9.1f} {run['fill_rate']:>6.1%} {run['error_rate']:>7.2%} "
+            f"{run['timeout_rate']:>9.2%} {run['shed_requests']:>6} "
+            f"{_ms(e2e['p50']):>8} {_ms(e2e['p99']):>8} {_ms(e2e['p99.9']):>9}"
+        )
+
+    for run in report["runs"]:
+        lines += ["", f"@ {run['target_rps']:g} rps — latency per hop (ms)"]
+        lines.append(f"  {'hop':<16} {'count':>8} " + " ".join(f"{q:>8}" for q in QUANTILES))
+        for hop, stats in run["latency_ms"].items():
+            lines.append(f"  {hop:<16} {stats['count']:>8} " + " ".join(f"{_ms(stats[q]):>8}" for q in QUANTILES))
+        lines.append(f"  {'process':<24} {'cpu%':>7} {'peak_rss_mb':>12}")
+        for name, usage in run["processes"].items():
+            lines.append(f"  {name:<24} {usage['cpu_percent']:>7.1f} {usage['peak_rss_mb']:>12.1f}")
+
+    if baseline is not None:
+        lines += ["", f"vs baseline commit={baseline['meta'].get('commit')}"]
+        previous = {run["target_rps"]: run for run in baseline["runs"]}
+        for run in report["runs"]:
+            old = previous.get(run["target_rps"])
+            if old is None:
+                continue
+            lines.append(
+                f"  {run['target_rps']:>8g} rps: achieved {_change(old['achieved_rps'], run['achieved_rps'])}, "
+                f"e2e p99 {_change(old['latency_ms']['end_to_end']['p99'], run['latency_ms']['end_to_end']['p99'])}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def _ms(value: float | None) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def _change(old: float | None, new: float | None) -> str:
+    if not old or new is None:
+        return f"{_ms(old)} -> {_ms(new)}"
+    return f"{_ms(old)} -> {_ms(new)} ({(new - old) / old:+.1%})"
+
+
+async def benchmark(args: argparse.Namespace) -> dict:
+    env = os.getenv("RTB_ENV", "dev")
+    metrics_root = Path(tempfile.mkdtemp(prefix="rtb-bench-metrics-"))
+    services = []
+    for spec in build_services(env, args.workers):
+        is_publisher = spec.name == "Publisher"
+        services.append(replace(
+            spec,
+            # One publisher process, so /start and /stop reach the generator that is running.
+            workers=1 if is_publisher else spec.workers,
+            log_level="warning",
+            access_log=False,
+            # Per-service metrics directories so multi-worker snapshots aggregate, but advertisers don't mix.
+            env={**spec.env, "RTB_METRICS_DIR": str(metrics_root / spec.name.replace(" ", "_"))},
+        ))
+
+    supervisor = Supervisor(services)
+    supervisor.start()
+    try:
+        if not await supervisor.wait_healthy(timeout=args.startup_timeout):
+            raise RuntimeError("not all services became healthy")
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            bench = StackBenchmark(supervisor, services, client)
+            runs = []
+            for rate in args.rates:
+                logger.info(f"⏱️ Running {rate:g} rps for {args.duration}s (+{args.warmup}s warmup)")
+                runs.append(await bench.run(rate, args.duration, args.warmup, args.arrivals))
+                logger.info(f"📊 {rate:g} rps -> achieved {runs[-1]['achieved_rps']} rps")
+    finally:
+        supervisor.shutdown()
+        shutil.rmtree(metrics_root, ignore_errors=True)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "env": env,
+            "workers": args.workers,
+            "arrivals": args.arrivals,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "advertisers": len(services) - 2,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "runs": runs,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the RTB stack end to end at fixed request rates.")
+    parser.add_argument("--rates", type=lambda s: [float(r) for r in s.split(",")], default=[100.0],
+                        help="comma-separated target rates in requests/s (default: 100)")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds per rate")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before each run")
+    parser.add_argument("--arrivals", choices=("poisson", "fixed"), default="poisson")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes per service (default: from config)")
+    parser.add_argument("--startup-timeout", type=float, default=20.0)
+    parser.add_argument("--output-dir", type=Path, default=Path("benchmark-results"))
+    parser.add_argument("--baseline", type=Path, default=None, help="earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    report = asyncio.run(benchmark(args))
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    summary = format_report(report, baseline)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"benchmark-{report['meta']['timestamp'].replace(':', '')}-{report['meta']['commit'] or 'unknown'}"
+    (args.output_dir / f"{stem}.json").write_text(json.dumps(report, indent=2) + "\n")
+    (args.output_dir / f"{stem}.txt").write_text(summary)
+    print(summary)
+    logger.info(f"📝 Report written to {args.output_dir / stem}.json / .txt")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,223 @@
+"""
+Whole-stack in-process mode: publisher, SSP and advertisers in one event loop, no sockets.
+
+Every advertiser is its own FastAPI app (`src.advertiser.server.create_app`). The SSP's
+outbound client gets an `ASGIRouter` transport that hands each bidder request straight to
+the advertiser app registered for that URL's host:port, and the publisher's sends reach the
+SSP app through an `ASGITransport`. No kernel networking, serialization to sockets or
+inter-process scheduling is involved, so the numbers are the application's own CPU cost
+and a reproducible upper bound on auctions per second per core.
+
+Advertiser response delays are zeroed by default (pass `--keep-delay` to keep them); with
+a delay the run measures concurrency, not CPU cost.
+
+    python -m src.inprocess --advertisers 8 --duration 10 --concurrency 64
+    python -m src.inprocess --advertisers 8 --duration 10 --rate 2000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import time
+from dataclasses import replace
+
+import httpx
+from fastapi import FastAPI
+
+from src.advertiser import server as advertiser_server
+from src.advertiser.config import AdvertiserConfig, fleet_configs
+from src.advertiser.faults import ConnectionDropped
+from src.benchmark import QUANTILES, Samples, parse_metrics, summarize_run
+from src.logging_config import get_logger, setup_logging
+from src.publisher import metrics as publisher_metrics
+from src.publisher import server as publisher_server
+from src.publisher.loadgen import OpenLoopGenerator
+from src.ssp import server as ssp_server
+from src.ssp.http_client import create_client
+
+logger = get_logger("InProcess")
+
+
+class ASGIRouter(httpx.AsyncBaseTransport):
+    """Transport that dispatches each request to the ASGI app registered for its host:port."""
+
+    def __init__(self, apps: dict[str, FastAPI]):
+        self._transports = {host: httpx.ASGITransport(app=app) for host, app in apps.items()}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = f"{request.url.host}:{request.url.port}"
+        transport = self._transports.get(host)
+        if transport is None:
+            raise httpx.ConnectError(f"No in-process app for {host}", request=request)
+        try:
+            return await transport.handle_async_request(request)
+        except ConnectionDropped:
+            # An advertiser's injected "drop" fault; over a socket the client would see:
+            raise httpx.RemoteProtocolError(
+                "Server disconnected without sending a complete response", request=request
+            ) from None
+
+
+def advertiser_configs(env: str, count: int, keep_delay: bool = False) -> list[AdvertiserConfig]:
+    """`count` advertiser configs (see `fleet_configs`), response delays zeroed unless `keep_delay` is set."""
+    configs = fleet_configs(env, count)
+    if keep_delay:
+        return configs
+    return [replace(config, response_delay_ms=0) for config in configs]
+
+
+def _bid_url(config: AdvertiserConfig) -> str:
+    return f"http://{config.server.host}:{config.server.port}/bid"
+
+
+class InProcessStack:
+    """The publisher, SSP and advertiser apps of this process, wired together in memory."""
+
+    def __init__(self, configs: list[AdvertiserConfig]):
+        self.bidder_urls = [_bid_url(config) for config in configs]
+        self.advertisers = {
+            f"{config.server.host}:{config.server.port}": advertiser_server.create_app(config) for config in configs
+        }
+        self._ssp_client: httpx.AsyncClient | None = None
+        self._publisher_client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "InProcessStack":
+        ssp_config = ssp_server.config
+        ssp_server.set_bidders(self.bidder_urls)
+        self._ssp_client = create_client(
+            ssp_config.http_client, ssp_config.max_bid_response_time_ms, transport=ASGIRouter(self.advertisers)
+        )
+        ssp_server.http_client = self._ssp_client
+        self._publisher_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=ssp_server.app), timeout=5.0)
+        logger.info(f"🧩 In-process stack: {len(self.advertisers)} advertisers behind one SSP")
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._publisher_client.aclose()
+        await self._ssp_client.aclose()
+        if ssp_server.http_client is self._ssp_client:
+            ssp_server.http_client = None
+
+    async def scrape(self) -> dict[str, Samples]:
+        """Current metrics per service kind; advertiser apps in one process share one registry."""
+        apps = {
+            "publisher": publisher_server.app,
+            "ssp": ssp_server.app,
+            "advertiser": next(iter(self.advertisers.values())),
+        }
+        scraped = {}
+        for service, app in apps.items():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://inprocess") as client:
+                scraped[service] = parse_metrics((await client.get("/metrics")).text)
+        return scraped
+
+    async def drive_closed_loop(self, duration_s: float, concurrency: int) -> None:
+        """`concurrency` senders, each sending its next request as soon as the previous one is answered."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration_s
+
+        async def sender():
+            while loop.time() < deadline:
+                # No schedule to fall behind: the scheduled send time is the actual one.
+                start = loop.time()
+                await publisher_server.send_generated_request(self._publisher_client)
+                publisher_metrics.scheduled_latency.observe((loop.time() - start) * 1000.0)
+
+        await asyncio.gather(*(sender() for _ in range(concurrency)))
+
+    async def drive_open_loop(self, duration_s: float, rate_rps: float, max_in_flight: int, arrivals: str) -> dict:
+        """Offer `rate_rps` on the publisher's open-loop schedule for `duration_s` seconds."""
+        generator = OpenLoopGenerator(
+            rate_rps=rate_rps,
+            arrivals=arrivals,
+            max_in_flight=max_in_flight,
+            on_latency=publisher_metrics.scheduled_latency.observe,
+        )
+        task = asyncio.create_task(generator.run(lambda: publisher_server.send_generated_request(self._publisher_client)))
+        await asyncio.sleep(duration_s)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return generator.to_dict()
+
+    async def run(self, duration_s: float, concurrency: int, rate_rps: float | None = None,
+                  arrivals: str = "poisson") -> dict:
+        """One measured run, closed-loop at `concurrency` or open-loop at `rate_rps`."""
+        before = await self.scrape()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if rate_rps is None:
+            await self.drive_closed_loop(duration_s, concurrency)
+        else:
+            await self.drive_open_loop(duration_s, rate_rps, concurrency, arrivals)
+        cpu_s = time.process_time() - cpu_start
+        elapsed = time.perf_counter() - wall_start
+        after = await self.scrape()
+
+        usage = {
+            "cpu_percent": round(cpu_s / elapsed * 100.0, 1) if elapsed else 0.0,
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }
+        result = summarize_run(rate_rps, elapsed, before, after, {"inprocess": usage})
+        result["mode"] = "closed" if rate_rps is None else "open"
+        result["concurrency"] = concurrency
+        result["cpu_s"] = round(cpu_s, 3)
+        result["auctions_per_cpu_s"] = round(result["requests"] / cpu_s, 1) if cpu_s else 0.0
+        return result
+
+
+def format_result(result: dict, advertisers: int) -> str:
+    """Human-readable summary of one in-process run."""
+    offered = "closed loop" if result["target_rps"] is None else f"{result['target_rps']:g} rps offered"
+    lines = [
+        f"In-process RTB stack | {advertisers} advertisers | {offered} | concurrency={result['concurrency']} "
+        f"| {result['duration_s']}s",
+        f"  auctions:          {result['requests']} ({result['achieved_rps']:.1f}/s)",
+        f"  cpu:               {result['cpu_s']:.2f}s ({result['processes']['inprocess']['cpu_percent']:.1f}%)",
+        f"  auctions/cpu-sec:  {result['auctions_per_cpu_s']:.1f}",
+        f"  fill / errors:     {result['fill_rate']:.1%} / {result['error_rate']:.2%}",
+        f"  {'hop':<16} {'count':>8} " + " ".join(f"{q:>8}" for q in QUANTILES),
+    ]
+    for hop, stats in result["latency_ms"].items():
+        lines.append(f"  {hop:<16} {stats['count']:>8} " + " ".join(
+            "       -" if stats[q] is None else f"{stats[q]:>8.2f}" for q in QUANTILES
+        ))
+    return "\n".join(lines) + "\n"
+
+
+async def run_inprocess(args: argparse.Namespace) -> dict:
+    env = os.getenv("RTB_ENV", "dev")
+    configs = advertiser_configs(env, args.advertisers, args.keep_delay)
+    async with InProcessStack(configs) as stack:
+        if args.warmup > 0:
+            await stack.run(args.warmup, args.concurrency, args.rate, args.arrivals)
+        return await stack.run(args.duration, args.concurrency, args.rate, args.arrivals)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run publisher, SSP and advertisers in one process, without sockets.")
+    parser.add_argument("--advertisers", type=int, default=2, help="number of advertiser apps (default: 2)")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before the run")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="closed-loop senders, or max in flight with --rate (default: 32)")
+    parser.add_argument("--rate", type=float, default=None, help="open-loop target rate in requests/s")
+    parser.add_argument("--arrivals", choices=("poisson", "fixed"), default="poisson")
+    parser.add_argument("--keep-delay", action="store_true", help="keep the advertisers' configured response delay")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+    if args.advertisers < 1 or args.concurrency < 1:
+        parser.error("--advertisers and --concurrency must be at least 1")
+
+    # Per-request log lines would dominate the CPU profile being measured.
+    setup_logging(level=logging.WARNING)
+    result = asyncio.run(run_inprocess(args))
+    print(json.dumps(result, indent=2) if args.json else format_result(result, args.advertisers))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
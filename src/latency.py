@@ -0,0 +1,125 @@
+"""
+Latency distributions in milliseconds, shared by the simulator and the advertiser's latency model.
+
+A distribution is parsed from `kind:param,...`; see `Distribution` for the kinds. Samples are
+drawn from NumPy `SAMPLE_BLOCK` at a time, so handing one out costs a list index.
+
+An empirical histogram file has one `upper_bound_ms count` pair per line (whitespace or a
+comma between them, `#` starts a comment), bounds ascending. Each bucket spans from the
+previous bound (0 for the first) to its own; samples are uniform within a bucket:
+
+    # bidder latency, ms
+    10   120
+    20   540
+    50   300
+    250  40
+"""
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_BLOCK = 4096  # distribution samples drawn per NumPy call
+
+
+class Distribution:
+    """
+    A latency distribution in milliseconds, parsed from `kind:param,...`:
+
+        constant:5                     always 5
+        uniform:10,50                  uniform in [10, 50]
+        exponential:20                 exponential with mean 20
+        lognormal:30,0.5               log-normal with median 30 and shape (sigma) 0.5
+        normal:30,5                    normal with mean 30 and std 5, clipped at 0
+        bimodal:30,0.3,400,0.5,0.05    lognormal:30,0.3, except 5% of samples from lognormal:400,0.5
+        empirical:latency.txt          the histogram in that file (see module docstring)
+
+    Samples are drawn `SAMPLE_BLOCK` at a time and handed out one by one.
+    """
+
+    KINDS = {
+        "constant": 1, "uniform": 2, "exponential": 1, "lognormal": 2, "normal": 2, "bimodal": 5, "empirical": 1,
+    }
+
+    def __init__(self, spec: str, rng: np.random.Generator | None = None):
+        kind, _, raw = spec.partition(":")
+        kind = kind.strip().lower()
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown distribution: '{kind}'. Available: {list(self.KINDS)}")
+        self.spec = spec
+        self.kind = kind
+        self._rng = rng or np.random.default_rng()
+        self._block: list[float] = []
+        self._pos = 0
+
+        if kind == "empirical":
+            if not raw.strip():
+                raise ValueError(f"'empirical' takes a histogram file path, got '{spec}'")
+            self.params = ()
+            self._lower, self._upper, self._cumulative = load_histogram(raw.strip())
+            return
+
+        try:
+            params = tuple(float(p) for p in raw.split(",")) if raw else ()
+        except ValueError:
+            raise ValueError(f"Invalid distribution parameters: '{spec}'") from None
+        if len(params) != self.KINDS[kind]:
+            raise ValueError(f"'{kind}' takes {self.KINDS[kind]} parameter(s), got '{spec}'")
+        if any(p < 0 for p in params):
+            raise ValueError(f"Distribution parameters must not be negative: '{spec}'")
+        if kind == "bimodal" and params[4] > 1:
+            raise ValueError(f"Bimodal slow share must be at most 1: '{spec}'")
+        self.params = params
+
+    def sample(self) -> float:
+        if self._pos >= len(self._block):
+            self._block = self.sample_block(SAMPLE_BLOCK).tolist()
+            self._pos = 0
+        value = self._block[self._pos]
+        self._pos += 1
+        return value
+
+    def sample_block(self, size: int) -> np.ndarray:
+        rng, p = self._rng, self.params
+        if self.kind == "constant":
+            return np.full(size, p[0])
+        if self.kind == "uniform":
+            return rng.uniform(p[0], p[1], size)
+        if self.kind == "exponential":
+            return rng.exponential(p[0], size)
+        if self.kind == "lognormal":
+            return p[0] * np.exp(rng.normal(0.0, p[1], size))
+        if self.kind == "bimodal":
+            slow = rng.random(size) < p[4]
+            return np.where(slow, p[2], p[0]) * np.exp(rng.normal(0.0, 1.0, size) * np.where(slow, p[3], p[1]))
+        if self.kind == "empirical":
+            buckets = np.searchsorted(self._cumulative, rng.random(size), side="right")
+            return rng.uniform(self._lower[buckets], self._upper[buckets])
+        return np.maximum(rng.normal(p[0], p[1], size), 0.0)
+
+
+def load_histogram(path: str | Path) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(lower bounds, upper bounds, cumulative probabilities) of a latency histogram file."""
+    path = Path(path)
+    if not path.exists():
+        raise ValueError(f"Latency histogram not found: {path}")
+    bounds, counts = [], []
+    for number, line in enumerate(path.read_text().splitlines(), 1):
+        line = line.split("#", 1)[0].replace(",", " ").strip()
+        if not line:
+            continue
+        try:
+            bound, count = (float(field) for field in line.split())
+        except ValueError:
+            raise ValueError(f"{path}:{number}: expected 'upper_bound_ms count', got '{line}'") from None
+        if bound < 0 or count < 0 or (bounds and bound <= bounds[-1]):
+            raise ValueError(f"{path}:{number}: bounds must ascend and nothing may be negative")
+        bounds.append(bound)
+        counts.append(count)
+    total = sum(counts)
+    if total <= 0:
+        raise ValueError(f"Latency histogram {path} has no samples")
+    upper = np.array(bounds)
+    lower = np.concatenate(([0.0], upper[:-1]))
+    cumulative = np.cumsum(counts) / total
+    cumulative[-1] = 1.0
+    return lower, upper, cumulative
@@ -1,22 +1,149 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
 
-def setup_logging(level=logging.INFO, format_string=None):
+_queue_handler: logging.handlers.QueueHandler | None = None
+_queue_listener: logging.handlers.QueueListener | None = None
+
+
+class LogSampler:
+    """
+    Decides whether a per-request log line is emitted.
+
+    `rate` keeps each line with that probability; `max_per_second` additionally caps
+    the number of lines let through in any one-second window. Both apply together.
+    """
+
+    def __init__(self, rate: float = 1.0, max_per_second: int | None = None, clock=time.monotonic):
+        self._clock = clock
+        self._window = -1
+        self._count = 0
+        self.configure(rate, max_per_second)
+
+    def configure(self, rate: float = 1.0, max_per_second: int | None = None) -> None:
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Sample rate must be within [0, 1], got {rate}")
+        self.rate = rate
+        self.max_per_second = max_per_second
+
+    def sample(self) -> bool:
+        if self.rate < 1.0 and random.random() >= self.rate:
+            return False
+        if self.max_per_second is not None:
+            window = int(self._clock())
+            if window != self._window:
+                self._window = window
+                self._count = 0
+            if self._count >= self.max_per_second:
+                return False
+            self._count += 1
+        return True
+
+
+class SampledLogger(logging.LoggerAdapter):
+    """
+    Logger for per-request lines. Records below WARNING are sampled *before* a LogRecord
+    is built, so with %-style arguments a dropped line costs one sampler check.
+    """
+
+    def __init__(self, logger: logging.Logger, sampler: LogSampler):
+        super().__init__(logger, {})
+        self.sampler = sampler
+
+    def isEnabledFor(self, level):
+        if not self.logger.isEnabledFor(level):
+            return False
+        return level >= logging.WARNING or self.sampler.sample()
+
+
+class _DeferredFormatQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread."""
+
+    def prepare(self, record):
+        return record
+
+
+request_sampler = LogSampler()
+
+
+def _start_queue_listener(handler: logging.Handler) -> None:
+    global _queue_listener
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _queue_listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _queue_listener.start()
+
+
+def _stop_queue_listener() -> None:
+    if _queue_listener is not None and _queue_listener._thread is not None:
+        _queue_listener.stop()
+
+
+def _restart_queue_listener_after_fork() -> None:
+    # The listener thread does not survive fork(); give the child its own queue and thread.
+    if _queue_listener is not None:
+        _start_queue_listener(_queue_listener.handlers[0])
+
+
+def setup_logging(
+    level=logging.INFO,
+    format_string=None,
+    use_queue=False,
+    sample_rate=1.0,
+    max_per_second=None,
+):
     """
     Central logging configuration for the entire application.
 
     Args:
         level: Logging level (default: INFO)
         format_string: Custom log format (default: standard format)
+        use_queue: Hand records to a background thread that does formatting and stream I/O,
+            so the event loop never blocks on stdout (default: False)
+        sample_rate: Probability of keeping a per-request log line (default: 1.0)
+        max_per_second: Cap on per-request log lines per second (default: no cap)
     """
+    global _queue_handler
     if format_string is None:
         format_string = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
 
+    request_sampler.configure(sample_rate, max_per_second)
+
+    if not use_queue:
+        logging.basicConfig(
+            level=level,
+            format=format_string
+        )
+        return
+
+    if _queue_listener is None:
+        atexit.register(_stop_queue_listener)
+        os.register_at_fork(after_in_child=_restart_queue_listener_after_fork)
+    else:
+        _stop_queue_listener()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(format_string))
+    _queue_handler = _DeferredFormatQueueHandler(queue.SimpleQueue())
+    _start_queue_listener(stream_handler)
+
+    # force: any handler already on the root (an earlier setup_logging, a library's basicConfig)
+    # would otherwise keep receiving the records and the queue listener none of them.
     logging.basicConfig(
         level=level,
-        format=format_string
+        format=format_string,
+        handlers=[_queue_handler],
+        force=True,
     )
 
 def get_logger(name):
     """Get a logger instance with the given name."""
     return logging.getLogger(name)
 
+def get_request_logger(name):
+    """Get a sampled logger for per-request lines (see setup_logging's sample_rate/max_per_second)."""
+    return SampledLogger(logging.getLogger(name), request_sampler)
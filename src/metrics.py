@@ -0,0 +1,313 @@
+"""
+Minimal Prometheus-style metrics shared by the SSP, advertiser and publisher.
+
+Recording is a dict lookup plus a list/float update — no locks are needed because every
+service records from its single asyncio event loop. Histograms use fixed bucket arrays.
+
+Across uvicorn workers: when RTB_METRICS_DIR is set (run_simulation and the benchmark set it
+for multi-worker services), each worker writes a JSON snapshot of its own values to
+`<service>-<pid>.json` in that directory (periodically and on every scrape). /metrics on any
+worker sums all snapshots for the service, so counters and histograms add up over the whole
+pool regardless of which worker answers the scrape.
+A worker removes its snapshot on shutdown, and snapshots left by processes that are no
+longer alive (crashed workers, earlier runs) are deleted instead of summed.
+"""
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable
+
+from fastapi import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500, 1000, 2500, 5000)
+PRICE_BUCKETS = (0.1, 0.25, 0.5, 1, 1.5, 2, 3, 4, 5, 7.5, 10, 15, 20, 50)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values."""
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def snapshot(self) -> list:
+        return [[list(labels), value] for labels, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """Point-in-time value; snapshots from several workers are summed."""
+    type = "gauge"
+    _function: Callable[[], float] | None = None
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Take the (unlabelled) value from `fn` at every snapshot, so each worker's flush carries a fresh one."""
+        self._function = fn
+
+    def snapshot(self) -> list:
+        if self._function is not None:
+            self._values[()] = float(self._function())
+        return super().snapshot()
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._values[labelvalues] = value
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram:
+    """Fixed-bucket histogram. Buckets are stored non-cumulatively and cumulated on render."""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...], labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        counts = self._counts.get(labelvalues)
+        if counts is None:
+            counts = self._counts[labelvalues] = [0] * (len(self.buckets) + 1)
+            self._sums[labelvalues] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[labelvalues] += value
+
+    def count(self, *labelvalues: str) -> int:
+        return sum(self._counts.get(labelvalues, ()))
+
+    def snapshot(self) -> list:
+        return [
+            [list(labels), {"counts": counts, "sum": self._sums[labels]}]
+            for labels, counts in self._counts.items()
+        ]
+
+
+class MetricsRegistry:
+    """Holds one service's metrics and renders them in Prometheus text format."""
+
+    def __init__(self, service: str, directory: str | None = None):
+        self.service = service
+        self.directory = Path(directory) if directory else None
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._ratios: list[tuple[str, str, Callable[[dict], float]]] = []
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, buckets: tuple[float, ...] = LATENCY_BUCKETS_MS, labelnames: tuple[str, ...] = ()
+    ) -> Histogram:
+        return self._register(Histogram(name, help, buckets, labelnames))
+
+    def ratio(self, name: str, help: str, numerator: Counter, denominator: Counter, **label_filter: str) -> None:
+        """Derived gauge computed at scrape time from the merged numerator/denominator counters."""
+
+        def compute(merged: dict) -> float:
+            top = _sum_series(merged[numerator.name], numerator.labelnames, label_filter)
+            bottom = _sum_series(merged[denominator.name], denominator.labelnames, {})
+            return top / bottom if bottom else 0.0
+
+        self._ratios.append((name, help, compute))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    # ── Multi-worker aggregation ──
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def flush(self) -> None:
+        """Write this worker's snapshot to the shared directory (atomic replace)."""
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._snapshot_path()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp, path)
+
+    def close(self) -> None:
+        """Shutdown: remove this worker's snapshot so the pool stops counting a worker that is gone."""
+        if self.directory is not None:
+            self._snapshot_path().unlink(missing_ok=True)
+
+    def _snapshot_path(self) -> Path:
+        return self.directory / f"{self.service}-{os.getpid()}.json"
+
+    async def flush_periodically(self, interval_s: float = 1.0) -> None:
+        while True:
+            await asyncio.sleep(interval_s)
+            self.flush()
+
+    def collect(self) -> dict:
+        """Merged values across every worker of this service (or just this process)."""
+        if self.directory is None:
+            return self.snapshot()
+        self.flush()
+        merged: dict[str, list] = {name: [] for name in self._metrics}
+        for path in self.directory.glob(f"{self.service}-*.json"):
+            pid = path.stem.rpartition("-")[2]
+            if not pid.isdigit():
+                continue
+            if not pid_alive(int(pid)):
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                worker = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, series in worker.items():
+                if name in merged:
+                    merged[name].extend(series)
+        return {name: _merge_series(series) for name, series in merged.items()}
+
+    # ── Rendering ──
+
+    def render(self) -> str:
+        merged = self.collect()
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for labels, value in merged[name]:
+                label_pairs = list(zip(metric.labelnames, labels))
+                if metric.type == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets + (float("inf"),), value["counts"]):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else _format_number(bound)
+                        lines.append(f"{name}_bucket{_format_labels(label_pairs + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(label_pairs)} {_format_number(value['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(label_pairs)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_format_labels(label_pairs)} {_format_number(value)}")
+        for name, help, compute in self._ratios:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_number(compute(merged))}")
+        return "\n".join(lines) + "\n"
+
+    def response(self) -> Response:
+        return Response(content=self.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this PID exists (it may belong to another user)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def create_registry(service: str) -> MetricsRegistry:
+    """Registry for a service, aggregating across workers when RTB_METRICS_DIR is set."""
+    return MetricsRegistry(service, os.getenv("RTB_METRICS_DIR"))
+
+
+def add_http_metrics(registry: MetricsRegistry) -> tuple[Counter, Histogram]:
+    """Register the request count and end-to-end latency metrics every service exposes."""
+    requests = registry.counter("http_requests_total", "HTTP requests handled", ("path", "status"))
+    latency = registry.histogram("http_request_duration_ms", "End-to-end HTTP request latency", labelnames=("path",))
+    return requests, latency
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request counts and latency per route path."""
+
+    def __init__(self, app: ASGIApp, requests: Counter, latency: Histogram):
+        self.app = app
+        self.requests = requests
+        self.latency = latency
+        self._paths: set[str] | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = "500"
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if self._paths is None:
+                # Label only known routes so random URLs cannot blow up label cardinality.
+                self._paths = {getattr(route, "path", "") for route in scope["app"].routes}
+            path = scope["path"] if scope["path"] in self._paths else "other"
+            self.requests.inc(path, status)
+            self.latency.observe((time.perf_counter() - start) * 1000.0, path)
+
+
+def _merge_series(series: list) -> list:
+    merged: dict[tuple, object] = {}
+    for labels, value in series:
+        key = tuple(labels)
+        current = merged.get(key)
+        if current is None:
+            merged[key] = {"counts": list(value["counts"]), "sum": value["sum"]} if isinstance(value, dict) else value
+        elif isinstance(value, dict):
+            current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+            current["sum"] += value["sum"]
+        else:
+            merged[key] = current + value
+    return [[list(labels), value] for labels, value in merged.items()]
+
+
+def _sum_series(series: list, labelnames: tuple[str, ...], label_filter: dict) -> float:
+    total = 0.0
+    for labels, value in series:
+        by_name = dict(zip(labelnames, labels))
+        if all(by_name.get(k) == v for k, v in label_filter.items()):
+            total += value
+    return total
+
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
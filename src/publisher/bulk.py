@@ -0,0 +1,92 @@
+"""
+Block-wise bid request generation for high target rates.
+
+Instead of building one BidRequest dataclass per send (uuid4, random.uniform, asdict, then
+JSON encoding inside httpx), requests are produced N at a time: IDs are cut from one bulk
+read of random bytes, sites and floors are drawn with NumPy, and each payload is rendered
+straight to JSON bytes from per-site pre-escaped fragments. Consumers pop ready requests
+from a ring buffer that is refilled one block at a time, so the per-request cost is an
+index increment.
+"""
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from src.publisher.sites import SiteCatalogue
+
+
+class EncodedBidRequest(NamedTuple):
+    """A generated bid request with its JSON body already encoded."""
+    id: str
+    domain: str
+    bid_floor: float
+    payload: bytes
+
+
+def bulk_uuid4(count: int) -> list[str]:
+    """`count` random (version 4) UUID strings from a single os.urandom call."""
+    raw = np.frombuffer(os.urandom(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    hex_ids = raw.tobytes().hex()
+    return [
+        f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
+        for h in (hex_ids[i:i + 32] for i in range(0, 32 * count, 32))
+    ]
+
+
+class BidRequestRing:
+    """Ring buffer of pre-encoded bid requests for a site catalogue, refilled `block_size` at a time."""
+
+    def __init__(self, catalogue: SiteCatalogue, block_size: int = 1024, rng: np.random.Generator | None = None):
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self.catalogue = catalogue
+        self.block_size = block_size
+        self.blocks_generated = 0
+        self._rng = rng or np.random.default_rng()
+        self._min_floors = np.array([site.min_floor for site in catalogue.sites])
+        self._floor_spans = np.array([site.max_floor - site.min_floor for site in catalogue.sites])
+        # Site fields never change, so their JSON is escaped once: ,"domain":"a.com","category":"IAB1","bid_floor":
+        self._site_fragments = [
+            ',"domain":%s,"category":%s,"bid_floor":' % (json.dumps(site.domain), json.dumps(site.category))
+            for site in catalogue.sites
+        ]
+        self._ring: list[EncodedBidRequest] = []
+        self._pos = 0
+
+    def next(self) -> EncodedBidRequest:
+        """Pop the next request, generating a new block when the ring is exhausted."""
+        if self._pos >= len(self._ring):
+            self._ring = self.generate_block(self.block_size)
+            self._pos = 0
+        request = self._ring[self._pos]
+        self._pos += 1
+        return request
+
+    def draw(self, count: int) -> tuple[np.ndarray, list[float]]:
+        """Site indices and bid floors for `count` requests, without IDs or payloads."""
+        site_indices = self.catalogue.choose_batch(count, self._rng)
+        floors = np.round(
+            self._min_floors[site_indices] + self._rng.random(count) * self._floor_spans[site_indices], 2
+        ).tolist()
+        return site_indices, floors
+
+    def generate_block(self, count: int) -> list[EncodedBidRequest]:
+        """Generate `count` requests in one vectorized pass."""
+        site_indices, floors = self.draw(count)
+        ids = bulk_uuid4(count)
+        sites = self.catalogue.sites
+        fragments = self._site_fragments
+        self.blocks_generated += 1
+        return [
+            EncodedBidRequest(
+                request_id,
+                sites[site].domain,
+                floor,
+                f'{{"id":"{request_id}"{fragments[site]}{floor!r}}}'.encode(),
+            )
+            for request_id, site, floor in zip(ids, site_indices.tolist(), floors)
+        ]
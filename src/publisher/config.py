@@ -11,10 +11,22 @@ class ServerConfig:
     reload: bool = False
 
 
+@dataclass(frozen=True)
+class LoadGenConfig:
+    """Traffic generation: closed loop (one request at a time) or open loop at a target rate."""
+    mode: str = "closed"  # "closed" or "open"
+    rate_rps: float = 100.0  # open loop only
+    arrivals: str = "poisson"  # "poisson" or "fixed"
+    max_in_flight: int = 256
+    block_size: int = 1024  # bid requests generated per vectorized block
+    client_shards: int = 8  # open loop: HTTP clients used round-robin, keeping each connection pool small
+
+
 @dataclass(frozen=True)
 class PublisherConfig:
     """Main Publisher configuration."""
     server: ServerConfig = field(default_factory=ServerConfig)
+    load: LoadGenConfig = field(default_factory=LoadGenConfig)
     publisher_id: str = "pub-001"
     name: str = "Default Publisher"
     domain: str = "example.com"
@@ -23,6 +35,7 @@ class PublisherConfig:
     max_floor: float = 2.0
     ssp_url: str = "http://127.0.0.1:8000/bid/request"
     request_interval_ms: int = 1000
+    site_catalogue: str | None = None  # .toml/.csv/.jsonl of sites; replaces domain/category/floors above
 
 
 DEVELOPMENT = PublisherConfig(
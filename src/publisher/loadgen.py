@@ -0,0 +1,110 @@
+"""
+Open-loop load generation for the publisher.
+
+The closed loop in server.py waits for each SSP answer before sending the next request, so
+it can never offer more than ~1/latency requests per second and a slow SSP quietly lowers
+the offered load. The open loop fires sends on a fixed schedule (Poisson or evenly spaced
+arrivals at a target rate) regardless of how fast answers come back.
+
+Latency is measured from each request's *scheduled* send time. When `max_in_flight` sends are
+outstanding the schedule keeps advancing and the next sends go out late; that lateness is
+part of the recorded latency, so queueing in the SSP shows up instead of being omitted.
+"""
+import asyncio
+import random
+from typing import Awaitable, Callable
+
+ARRIVAL_PROCESSES = ("poisson", "fixed")
+
+
+class OpenLoopGenerator:
+    """Calls `send()` at `rate_rps` on a Poisson or fixed arrival schedule, with bounded concurrency."""
+
+    def __init__(
+        self,
+        rate_rps: float,
+        arrivals: str = "poisson",
+        max_in_flight: int = 256,
+        on_latency: Callable[[float], None] | None = None,
+        rng: random.Random | None = None,
+    ):
+        self.in_flight = 0
+        self.sent = 0
+        self.completed = 0
+        self.late = 0  # sends delayed past their slot because max_in_flight was reached
+        self._on_latency = on_latency
+        self._rng = rng or random.Random()
+        self._slot_freed = asyncio.Event()
+        self.configure(rate_rps, arrivals, max_in_flight)
+
+    def configure(
+        self, rate_rps: float | None = None, arrivals: str | None = None, max_in_flight: int | None = None
+    ) -> None:
+        """Change the offered load while running; unset arguments keep their current value."""
+        if rate_rps is not None:
+            if rate_rps <= 0:
+                raise ValueError("rate_rps must be positive")
+            self.rate_rps = rate_rps
+        if arrivals is not None:
+            if arrivals not in ARRIVAL_PROCESSES:
+                raise ValueError(f"Unknown arrival process: '{arrivals}'. Available: {list(ARRIVAL_PROCESSES)}")
+            self.arrivals = arrivals
+        if max_in_flight is not None:
+            if max_in_flight < 1:
+                raise ValueError("max_in_flight must be at least 1")
+            self.max_in_flight = max_in_flight
+            self._slot_freed.set()
+
+    def next_gap(self) -> float:
+        """Seconds until the next scheduled send."""
+        if self.arrivals == "poisson":
+            return self._rng.expovariate(self.rate_rps)
+        return 1.0 / self.rate_rps
+
+    async def run(self, send: Callable[[], Awaitable[object]]) -> None:
+        """Drive `send` on schedule until cancelled; outstanding sends are cancelled on exit."""
+        loop = asyncio.get_running_loop()
+        pending: set[asyncio.Task] = set()
+        scheduled = loop.time()
+        try:
+            while True:
+                scheduled += self.next_gap()
+                delay = scheduled - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                if self.in_flight >= self.max_in_flight:
+                    self.late += 1
+                    while self.in_flight >= self.max_in_flight:
+                        self._slot_freed.clear()
+                        await self._slot_freed.wait()
+
+                self.in_flight += 1
+                self.sent += 1
+                task = asyncio.create_task(self._send(send, scheduled))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _send(self, send: Callable[[], Awaitable[object]], scheduled: float) -> None:
+        try:
+            await send()
+            self.completed += 1
+            if self._on_latency is not None:
+                self._on_latency((asyncio.get_running_loop().time() - scheduled) * 1000.0)
+        finally:
+            self.in_flight -= 1
+            self._slot_freed.set()
+
+    def to_dict(self) -> dict:
+        return {
+            "rate_rps": self.rate_rps,
+            "arrivals": self.arrivals,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "completed": self.completed,
+            "late": self.late,
+        }
@@ -0,0 +1,15 @@
+from src.metrics import add_http_metrics, create_registry
+
+registry = create_registry("publisher")
+
+http_requests, http_latency = add_http_metrics(registry)
+
+requests_sent = registry.counter(
+    "publisher_requests_total", "Bid requests sent to the SSP, by result (bid_won, no_bid, failed)", ("result",)
+)
+send_latency = registry.histogram("publisher_send_latency_ms", "Round-trip time of a bid request to the SSP")
+scheduled_latency = registry.histogram(
+    "publisher_scheduled_latency_ms", "Open-loop latency measured from the scheduled send time"
+)
+in_flight = registry.gauge("publisher_in_flight", "Open-loop bid requests awaiting an SSP answer")
+registry.ratio("publisher_win_rate", "Share of sent bid requests that were filled", requests_sent, requests_sent, result="bid_won")
@@ -1,23 +1,46 @@
 import asyncio
+import itertools
+import json
 import os
 import random
+import time
 import uuid
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Literal
 
 import httpx
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
 
-from src.logging_config import get_logger
+from src.logging_config import get_logger, get_request_logger
+from src.metrics import MetricsMiddleware
+from src.publisher import metrics
+from src.publisher.bulk import BidRequestRing
 from src.publisher.config import get_config
+from src.publisher.loadgen import OpenLoopGenerator
 from src.publisher.models import BidRequest
+from src.publisher.sites import Site, SiteCatalogue, load_catalogue
+from src.tracing import TRACE_HEADER, TracingMiddleware, create_tracer, current_trace_id
 
 env = os.getenv("RTB_ENV", "dev")
 config = get_config(env)
 
 logger = get_logger("Publisher")
+request_logger = get_request_logger("Publisher")
+tracer = create_tracer("publisher")
+
+JSON_HEADERS = {"content-type": "application/json"}
+
+catalogue_path = os.getenv("RTB_SITE_CATALOGUE", config.site_catalogue)
+site_catalogue: SiteCatalogue | None = load_catalogue(catalogue_path) if catalogue_path else None
+request_ring = BidRequestRing(
+    site_catalogue or SiteCatalogue([Site(config.domain, config.category, config.min_floor, config.max_floor)]),
+    block_size=config.load.block_size,
+)
 
 is_generating = False
 generation_task: asyncio.Task | None = None
+load_generator: OpenLoopGenerator | None = None
+metrics.in_flight.set_function(lambda: load_generator.in_flight if load_generator is not None else 0)
 
 
 @asynccontextmanager
@@ -25,19 +48,34 @@ async def lifespan(_app: FastAPI):
     logger.info(f"🚀 Publisher starting | env={env} | id={config.publisher_id}")
     logger.info(f"⚙️  Config: host={config.server.host}, port={config.server.port}, "
                 f"domain={config.domain}, floor=[{config.min_floor}, {config.max_floor}]")
+    if site_catalogue is not None:
+        logger.info(f"🗺️ Site catalogue: {len(site_catalogue)} sites from {catalogue_path}")
+    metrics_flusher = asyncio.create_task(metrics.registry.flush_periodically())
     yield
     global is_generating, generation_task
     is_generating = False
     if generation_task:
         generation_task.cancel()
+    metrics_flusher.cancel()
+    metrics.registry.close()
     logger.info("🛑 Publisher shutting down")
 
 
 app = FastAPI(title="RTB Publisher", version="0.1.0", lifespan=lifespan)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+app.add_middleware(MetricsMiddleware, requests=metrics.http_requests, latency=metrics.http_latency)
 
 
 def generate_bid_request() -> BidRequest:
-    """Creates a random, valid BidRequest object."""
+    """Creates a random, valid BidRequest object — for a weighted-random site when a catalogue is loaded."""
+    if site_catalogue is not None:
+        site = site_catalogue.choose()
+        return BidRequest(
+            id=str(uuid.uuid4()),
+            domain=site.domain,
+            category=site.category,
+            bid_floor=round(random.uniform(site.min_floor, site.max_floor), 2)
+        )
     return BidRequest(
         id=str(uuid.uuid4()),
         domain=config.domain,
@@ -48,50 +86,115 @@ def generate_bid_request() -> BidRequest:
 
 async def send_bid_request_to_ssp(client: httpx.AsyncClient, bid_request: BidRequest) -> dict | None:
     """Send bid request to SSP and return response."""
+    return await send_payload_to_ssp(client, bid_request.id, json.dumps(bid_request.to_dict()).encode())
+
+
+async def send_payload_to_ssp(client: httpx.AsyncClient, request_id: str, payload: bytes) -> dict | None:
+    """Send an already JSON-encoded bid request to SSP and return response."""
+    trace_id = current_trace_id() or tracer.new_trace_id()
+    headers = {**JSON_HEADERS, TRACE_HEADER: trace_id} if trace_id else JSON_HEADERS
+    start = time.perf_counter()
     try:
-        response = await client.post(config.ssp_url, json=bid_request.to_dict())
+        response = await client.post(config.ssp_url, content=payload, headers=headers)
+        end = time.perf_counter()
+        metrics.send_latency.observe((end - start) * 1000.0)
+        if trace_id:
+            tracer.record(trace_id, "send", start, end, request_id=request_id, status=response.status_code)
         if response.status_code == 200:
-            return response.json()
+            result = response.json()
+            metrics.requests_sent.inc(result.get("status", "unknown"))
+            return result
         else:
             logger.warning(f"⚠️ SSP returned status {response.status_code}")
     except httpx.RequestError as e:
         logger.warning(f"⚠️ Failed to reach SSP at {config.ssp_url}: {e}")
+    metrics.requests_sent.inc("failed")
     return None
 
 
+async def send_generated_request(client: httpx.AsyncClient) -> None:
+    """Take the next pre-generated bid request, send it to the SSP and log the outcome."""
+    bid_request = request_ring.next()
+    request_logger.info(
+        "📤 Sending BidRequest: ID=%.8s... | domain=%s | floor=%s$",
+        bid_request.id, bid_request.domain, bid_request.bid_floor,
+    )
+
+    result = await send_payload_to_ssp(client, bid_request.id, bid_request.payload)
+    if result:
+        status = result.get("status", "unknown")
+        if status == "bid_won":
+            winning_bid = result.get("winning_bid", {})
+            request_logger.info(
+                "🏆 Bid won! advertiser=%s | price=%s$",
+                winning_bid.get("advertiser_id"), winning_bid.get("bid_price"),
+            )
+        else:
+            request_logger.info("📭 No winning bid for request %.8s...", bid_request.id)
+
+
 async def generate_requests_loop():
-    """Background loop that continuously generates and sends bid requests."""
+    """Closed loop: send a bid request, wait for the answer, sleep `request_interval_ms`, repeat."""
     global is_generating
     async with httpx.AsyncClient(timeout=5.0) as client:
         while is_generating:
-            bid_request = generate_bid_request()
-            logger.info(
-                f"📤 Sending BidRequest: ID={bid_request.id[:8]}... | "
-                f"domain={bid_request.domain} | floor={bid_request.bid_floor}$"
-            )
+            await send_generated_request(client)
+            await asyncio.sleep(config.request_interval_ms / 1000.0)
 
-            result = await send_bid_request_to_ssp(client, bid_request)
-            if result:
-                status = result.get("status", "unknown")
-                if status == "bid_won":
-                    winning_bid = result.get("winning_bid", {})
-                    logger.info(
-                        f"🏆 Bid won! advertiser={winning_bid.get('advertiser_id')} | "
-                        f"price={winning_bid.get('bid_price')}$"
-                    )
-                else:
-                    logger.info(f"📭 No winning bid for request {bid_request.id[:8]}...")
 
-            await asyncio.sleep(config.request_interval_ms / 1000.0)
+async def generate_requests_open_loop(generator: OpenLoopGenerator):
+    """
+    Open loop: send bid requests on the generator's schedule, regardless of SSP latency.
+
+    Requests are spread round-robin over `client_shards` clients: httpcore scans its whole
+    pool on every request, so one pool holding hundreds of connections costs more CPU per
+    request the busier it gets, and the generator then falls behind its own schedule.
+    """
+    shards = config.load.client_shards
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=-(-generator.max_in_flight // shards))
+    async with AsyncExitStack() as stack:
+        clients = [
+            await stack.enter_async_context(httpx.AsyncClient(timeout=5.0, limits=limits)) for _ in range(shards)
+        ]
+        next_client = itertools.cycle(clients).__next__
+        await generator.run(lambda: send_generated_request(next_client()))
 
 
 @app.post("/start")
-async def start_generating():
-    """Start generating bid requests."""
-    global is_generating, generation_task
+async def start_generating(
+    mode: Literal["closed", "open"] | None = None,
+    rate_rps: float | None = Query(None, gt=0),
+    arrivals: Literal["poisson", "fixed"] | None = None,
+    max_in_flight: int | None = Query(None, ge=1),
+):
+    """
+    Start generating bid requests.
+
+    `mode=open` sends at `rate_rps` with Poisson or fixed `arrivals` and at most `max_in_flight`
+    outstanding requests. Calling /start again while an open loop runs retunes it in place.
+    """
+    global is_generating, generation_task, load_generator
     if is_generating:
+        if load_generator is not None and mode != "closed" and (rate_rps or arrivals or max_in_flight):
+            load_generator.configure(rate_rps, arrivals, max_in_flight)
+            logger.info(f"🎚️ Open-loop load updated: {load_generator.to_dict()}")
+            return {"status": "updated", "publisher_id": config.publisher_id, "load": load_generator.to_dict()}
         return {"status": "already_running", "publisher_id": config.publisher_id}
 
+    load = config.load
+    if (mode or load.mode) == "open":
+        load_generator = OpenLoopGenerator(
+            rate_rps=rate_rps or load.rate_rps,
+            arrivals=arrivals or load.arrivals,
+            max_in_flight=max_in_flight or load.max_in_flight,
+            on_latency=metrics.scheduled_latency.observe,
+        )
+        is_generating = True
+        generation_task = asyncio.create_task(generate_requests_open_loop(load_generator))
+        logger.info(f"▶️ Started open-loop bid requests: {load_generator.to_dict()}")
+        return {"status": "started", "publisher_id": config.publisher_id, "load": load_generator.to_dict()}
+
+    load_generator = None
     is_generating = True
     generation_task = asyncio.create_task(generate_requests_loop())
     logger.info("▶️ Started generating bid requests")
@@ -117,9 +220,9 @@ async def stop_generating():
 async def send_single_request():
     """Send a single bid request to SSP (manual trigger)."""
     bid_request = generate_bid_request()
-    logger.info(
-        f"📤 Sending single BidRequest: ID={bid_request.id[:8]}... | "
-        f"domain={bid_request.domain} | floor={bid_request.bid_floor}$"
+    request_logger.info(
+        "📤 Sending single BidRequest: ID=%.8s... | domain=%s | floor=%s$",
+        bid_request.id, bid_request.domain, bid_request.bid_floor,
     )
 
     async with httpx.AsyncClient(timeout=5.0) as client:
@@ -139,10 +242,25 @@ async def get_status():
         "domain": config.domain,
         "category": config.category,
         "floor_range": [config.min_floor, config.max_floor],
+        "sites": len(site_catalogue) if site_catalogue is not None else 1,
         "request_interval_ms": config.request_interval_ms,
+        "mode": "open" if load_generator is not None else "closed",
+        "load": load_generator.to_dict() if load_generator is not None else None,
     }
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus scrape endpoint (summed across workers when RTB_METRICS_DIR is set)."""
+    return metrics.registry.response()
+
+
+@app.get("/debug/traces")
+async def debug_traces(trace_id: str | None = None, limit: int = 100):
+    """Recently recorded spans, newest first — optionally for a single trace."""
+    return {"service": tracer.service, "spans": tracer.query(trace_id, limit)}
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
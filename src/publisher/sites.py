@@ -0,0 +1,131 @@
+"""
+Site catalogues for multi-site traffic from a single publisher process.
+
+A catalogue lists sites with their own domain, category, floor range and traffic weight, read
+from TOML (`[[sites]]` tables), CSV (header row) or JSONL (one object per line). Sites are
+picked with Vose's alias method, so choosing one costs O(1) no matter how large the catalogue.
+"""
+import csv
+import json
+import random
+import tomllib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+CATALOGUE_FORMATS = (".toml", ".csv", ".jsonl")
+
+
+@dataclass(frozen=True, slots=True)
+class Site:
+    """One simulated site and the traffic it generates."""
+    domain: str
+    category: str
+    min_floor: float
+    max_floor: float
+    weight: float = 1.0
+
+    def __post_init__(self):
+        if self.min_floor < 0 or self.max_floor < self.min_floor:
+            raise ValueError(f"Invalid floor range for {self.domain}: [{self.min_floor}, {self.max_floor}]")
+        if self.weight < 0:
+            raise ValueError(f"Negative traffic weight for {self.domain}")
+
+
+class AliasSampler:
+    """O(1) sampling of indices 0..n-1 proportionally to `weights` (Vose's alias method)."""
+
+    def __init__(self, weights: Sequence[float], rng: random.Random | None = None):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("AliasSampler needs at least one positive weight")
+        self._rng = rng or random.Random()
+        self._prob = [0.0] * n
+        self._alias = list(range(n))
+        self._prob_array: np.ndarray | None = None
+        self._alias_array: np.ndarray | None = None
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to rounding error.
+        for i in large + small:
+            self._prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self._prob)
+
+    def sample(self) -> int:
+        column = int(self._rng.random() * len(self._prob))
+        return column if self._rng.random() < self._prob[column] else self._alias[column]
+
+    def sample_batch(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """`size` samples at once, drawn with NumPy."""
+        if self._prob_array is None:
+            self._prob_array = np.asarray(self._prob)
+            self._alias_array = np.asarray(self._alias)
+        columns = rng.integers(0, len(self._prob), size)
+        keep = rng.random(size) < self._prob_array[columns]
+        return np.where(keep, columns, self._alias_array[columns])
+
+
+class SiteCatalogue:
+    """Sites plus an alias table over their weights."""
+
+    def __init__(self, sites: Sequence[Site], rng: random.Random | None = None):
+        self.sites = list(sites)
+        self._sampler = AliasSampler([site.weight for site in self.sites], rng)
+
+    def __len__(self) -> int:
+        return len(self.sites)
+
+    def choose(self) -> Site:
+        return self.sites[self._sampler.sample()]
+
+    def choose_batch(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """Indices into `sites` for `size` weighted-random picks."""
+        return self._sampler.sample_batch(size, rng)
+
+
+def _site_from_row(row: dict) -> Site:
+    weight = row.get("weight")
+    try:
+        return Site(
+            domain=str(row["domain"]),
+            category=str(row["category"]),
+            min_floor=float(row["min_floor"]),
+            max_floor=float(row["max_floor"]),
+            weight=1.0 if weight is None or weight == "" else float(weight),
+        )
+    except KeyError as e:
+        raise ValueError(f"Site entry is missing field {e}: {row}") from None
+
+
+def load_catalogue(path: str | Path, rng: random.Random | None = None) -> SiteCatalogue:
+    """Read a site catalogue from a .toml, .csv or .jsonl file."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".toml":
+        with path.open("rb") as f:
+            rows = tomllib.load(f).get("sites", [])
+    elif suffix == ".csv":
+        with path.open(newline="") as f:
+            rows = list(csv.DictReader(f))
+    elif suffix == ".jsonl":
+        with path.open() as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        raise ValueError(f"Unknown site catalogue format: '{suffix}'. Available: {list(CATALOGUE_FORMATS)}")
+
+    if not rows:
+        raise ValueError(f"Site catalogue {path} contains no sites")
+    return SiteCatalogue([_site_from_row(row) for row in rows], rng)
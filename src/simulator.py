@@ -0,0 +1,414 @@
+"""
+Discrete-event simulation of the RTB stack on a virtual clock.
+
+The live stack spends real time waiting: `response_delay_ms` in every advertiser,
+`request_interval_ms` between publisher sends, the SSP's tmax deadline. Here time is a
+number that jumps straight to the next scheduled event, so a simulated day of traffic runs
+in as long as the decisions take to compute.
+
+The decisions are the real ones: requests are drawn from the publisher's site catalogue
+(`BidRequestRing.draw`) on its open-loop arrival schedule (`OpenLoopGenerator.next_gap`),
+advertisers decide with their own `Bidder` (campaigns, or random prices without any),
+and the SSP filters bidders with its targeting index and circuit breakers (on the
+virtual clock) and clears with the configured auction strategy. Only the waiting is modelled, as sampled distributions:
+
+    network     one-way latency of every hop (publisher->SSP, SSP->advertiser and back)
+    bidder      an advertiser's processing time, per advertiser
+    ssp         the SSP's own processing time (parsing, clearing, response)
+
+A bidder whose round trip exceeds the auction deadline is a timeout, exactly as in the live
+SSP. Everything is recorded into the services' own metric registries, so `--metrics-dir`
+gets the same Prometheus text the live /metrics endpoints serve.
+
+    python -m src.simulator --duration 86400 --rate 50 --strategy second_price
+    python -m src.simulator --advertisers 10 --bidder-latency adv-002=lognormal:120,0.6
+"""
+import argparse
+import heapq
+import itertools
+import json
+import os
+import random
+import resource
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+from src.advertiser import metrics as advertiser_metrics
+from src.advertiser.bidding import create_bidder
+from src.advertiser.config import AdvertiserConfig, discover_configs, fleet_configs
+from src.benchmark import QUANTILES, parse_metrics, summarize_run
+from src.latency import SAMPLE_BLOCK, Distribution
+from src.logging_config import get_logger, setup_logging
+from src.publisher import metrics as publisher_metrics
+from src.publisher.bulk import BidRequestRing
+from src.publisher.config import PublisherConfig, get_config as get_publisher_config
+from src.publisher.loadgen import OpenLoopGenerator
+from src.publisher.sites import Site, SiteCatalogue, load_catalogue
+from src.ssp import metrics as ssp_metrics
+from src.ssp.auction import create_strategy
+from src.ssp.circuit_breaker import CircuitBreaker
+from src.ssp.config import SSPConfig, get_config as get_ssp_config
+from src.ssp.models import Bid
+from src.ssp.targeting import build_index
+
+logger = get_logger("Simulator")
+
+
+class EventLoop:
+    """Virtual clock plus a min-heap of scheduled callbacks; ties run in scheduling order."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.processed = 0
+        self._queue: list[tuple[float, int, Callable[[Any], None], Any]] = []
+        self._seq = itertools.count()
+
+    def time(self) -> float:
+        """The virtual time in seconds — usable wherever a `clock` callable is expected."""
+        return self.now
+
+    def schedule(self, at: float, callback: Callable[[Any], None], arg: Any = None) -> None:
+        heapq.heappush(self._queue, (at, next(self._seq), callback, arg))
+
+    def run(self) -> None:
+        """Process events in time order until none are left."""
+        queue = self._queue
+        pop = heapq.heappop
+        while queue:
+            at, _, callback, arg = pop(queue)
+            self.now = at
+            callback(arg)
+            self.processed += 1
+
+
+@dataclass(frozen=True)
+class SimulatedBidder:
+    """One advertiser: its config (bid logic), processing-time distribution and error rate."""
+    url: str
+    config: AdvertiserConfig
+    latency: Distribution
+    error_rate: float = 0.0
+
+
+class Simulator:
+    """Runs publisher -> SSP -> advertisers auctions on an `EventLoop`, recording the live metrics."""
+
+    def __init__(
+        self,
+        ssp_config: SSPConfig,
+        publisher_config: PublisherConfig,
+        bidders: list[SimulatedBidder],
+        network: Distribution,
+        ssp_latency: Distribution,
+        catalogue: SiteCatalogue | None = None,
+        seed: int | None = None,
+    ):
+        self.loop = EventLoop()
+        self.ssp_config = ssp_config
+        self.publisher_config = publisher_config
+        self.bidders = {bidder.url: bidder for bidder in bidders}
+        self.network = network
+        self.ssp_latency = ssp_latency
+        self._rng = random.Random(seed)
+        self._decisions = {
+            bidder.url: create_bidder(bidder.config, rng=self._rng, clock=self.loop.time).bid for bidder in bidders
+        }
+        self._ring = BidRequestRing(
+            catalogue or SiteCatalogue([Site(
+                publisher_config.domain, publisher_config.category, publisher_config.min_floor, publisher_config.max_floor
+            )]),
+            rng=np.random.default_rng(seed),
+        )
+        self._requests: list[tuple[int, float]] = []
+        self._request_pos = 0
+        self._request_ids = itertools.count()
+
+        self.targeting_index = build_index(self.bidders, ssp_config.bidder_targeting)
+        self.circuit_breakers = {
+            url: CircuitBreaker(url, ssp_config.circuit_breaker, clock=self.loop.time) for url in self.bidders
+        }
+        self.auction_strategy = create_strategy(ssp_config.auction)
+        self._budget_s = (ssp_config.max_bid_response_time_ms - ssp_config.auction_margin_ms) / 1000.0
+
+        self.auctions = 0
+        self._stop_at = 0.0
+        self._generator: OpenLoopGenerator | None = None
+
+    def run(self, duration_s: float, rate_rps: float | None = None, arrivals: str = "poisson") -> None:
+        """
+        Simulate `duration_s` virtual seconds of publisher traffic, then let in-flight auctions finish.
+
+        With `rate_rps` the publisher runs open-loop at that rate; without it, it runs its
+        closed loop: one request at a time, `request_interval_ms` after each answer.
+        """
+        self._stop_at = self.loop.now + duration_s
+        if rate_rps is None:
+            self._generator = None
+            self.loop.schedule(self.loop.now, self._send_closed_loop)
+        else:
+            self._generator = OpenLoopGenerator(rate_rps, arrivals, rng=self._rng)
+            self.loop.schedule(self.loop.now + self._generator.next_gap(), self._send_open_loop)
+        self.loop.run()
+
+    # ── Publisher ──
+
+    def _send_open_loop(self, _arg) -> None:
+        now = self.loop.now
+        self._send(now)
+        next_at = now + self._generator.next_gap()
+        if next_at < self._stop_at:
+            self.loop.schedule(next_at, self._send_open_loop)
+
+    def _send_closed_loop(self, _arg) -> None:
+        if self.loop.now < self._stop_at:
+            self._send(self.loop.now)
+
+    def _next_request(self) -> tuple[int, float]:
+        if self._request_pos >= len(self._requests):
+            site_indices, floors = self._ring.draw(SAMPLE_BLOCK)
+            self._requests = list(zip(site_indices.tolist(), floors))
+            self._request_pos = 0
+        request = self._requests[self._request_pos]
+        self._request_pos += 1
+        return request
+
+    def _send(self, sent_at: float) -> None:
+        site_index, floor = self._next_request()
+        self.loop.schedule(sent_at + self.network.sample() / 1000.0, self._ssp_receive, (sent_at, site_index, floor))
+
+    def _publisher_receive(self, arg: tuple[float, str]) -> None:
+        sent_at, status = arg
+        latency_ms = (self.loop.now - sent_at) * 1000.0
+        publisher_metrics.send_latency.observe(latency_ms)
+        publisher_metrics.scheduled_latency.observe(latency_ms)  # no send ever waits for a free slot here
+        publisher_metrics.requests_sent.inc(status)
+        if self._generator is None:
+            self.loop.schedule(self.loop.now + self.publisher_config.request_interval_ms / 1000.0, self._send_closed_loop)
+
+    # ── SSP ──
+
+    def _ssp_receive(self, arg: tuple[float, int, float]) -> None:
+        sent_at, site_index, floor = arg
+        received = self.loop.now
+        site = self._ring.catalogue.sites[site_index]
+        request_id = str(next(self._request_ids))
+        self.auctions += 1
+
+        eligible_urls = self.targeting_index.eligible(site.category, site.domain, floor)
+        bidder_urls = [url for url in eligible_urls if self.circuit_breakers[url].allow_request()]
+
+        received_bids: list[tuple[Bid, str]] = []
+        waited_s = 0.0
+        for url in bidder_urls:
+            bid, response_s = self._call_bidder(self.bidders[url], request_id, received, site, floor)
+            waited_s = max(waited_s, response_s)
+            if bid is not None:
+                received_bids.append((bid, url))
+
+        result = self.auction_strategy.clear([bid for bid, _ in received_bids], floor)
+        if result is None:
+            status = "no_bid"
+        else:
+            status = "bid_won"
+            ssp_metrics.bidder_wins.inc(received_bids[result.winner][1])
+            ssp_metrics.clearing_price.observe(result.price)
+        ssp_metrics.auctions.inc(status)
+
+        answered = received + waited_s + self.ssp_latency.sample() / 1000.0
+        ssp_metrics.http_requests.inc("/bid/request", "200")
+        ssp_metrics.http_latency.observe((answered - received) * 1000.0, "/bid/request")
+        self.loop.schedule(answered + self.network.sample() / 1000.0, self._publisher_receive, (sent_at, status))
+
+    def _call_bidder(
+        self, bidder: SimulatedBidder, request_id: str, sent_at: float, site: Site, floor: float
+    ) -> tuple[Bid | None, float]:
+        """One SSP -> advertiser call: returns the bid (None if there is none) and how long the SSP waited for it."""
+        processing_ms = bidder.latency.sample()
+        failed = bidder.error_rate > 0 and self._rng.random() < bidder.error_rate
+        bid = None
+        if failed:
+            outcome = "error"
+            advertiser_metrics.http_requests.inc("/bid", "500")
+        else:
+            decision = self._decisions[bidder.url](site.category, site.domain, floor)
+            if decision is None:
+                outcome = "no_bid"
+                advertiser_metrics.http_requests.inc("/bid", "204")
+                advertiser_metrics.no_bids.inc()
+            else:
+                outcome = "bid"
+                bid = Bid(request_id, bidder.config.advertiser_id, decision.bid_price, decision.ad_id)
+                advertiser_metrics.http_requests.inc("/bid", "200")
+                advertiser_metrics.bids.inc()
+                advertiser_metrics.bid_price.observe(decision.bid_price)
+        advertiser_metrics.http_latency.observe(processing_ms, "/bid")
+
+        round_trip_s = (self.network.sample() + processing_ms + self.network.sample()) / 1000.0
+        if round_trip_s > self._budget_s:
+            outcome, waited_s, bid = "timeout", self._budget_s, None
+        else:
+            waited_s = round_trip_s
+        ssp_metrics.bidder_requests.inc(bidder.url, outcome)
+        ssp_metrics.bidder_response_time.observe(waited_s * 1000.0, bidder.url)
+        # The breaker learns the outcome when the SSP does, not when the auction starts.
+        self.loop.schedule(sent_at + waited_s, self._record_outcome, (bidder.url, outcome in ("bid", "no_bid")))
+        return bid, waited_s
+
+    def _record_outcome(self, arg: tuple[str, bool]) -> None:
+        url, succeeded = arg
+        if succeeded:
+            self.circuit_breakers[url].record_success()
+        else:
+            self.circuit_breakers[url].record_failure()
+
+
+# ── CLI ──
+
+def build_bidders(
+    configs: list[AdvertiserConfig],
+    default_latency: str | None,
+    overrides: dict[str, str],
+    error_rate: float,
+    rng: np.random.Generator,
+) -> list[SimulatedBidder]:
+    """
+    One SimulatedBidder per advertiser config. Processing time comes from `overrides[advertiser_id]`,
+    else `default_latency`, else the advertiser's own latency model (`[faults] latency`), else a
+    log-normal around its configured `response_delay_ms`. Without `error_rate`, each advertiser
+    fails at its configured fault rates (every injected fault but a stall is an error to the SSP).
+    """
+    bidders = []
+    for config in configs:
+        spec = (
+            overrides.get(config.advertiser_id) or default_latency or config.faults.latency
+            or f"lognormal:{config.response_delay_ms},0.25"
+        )
+        faults = config.faults
+        bidders.append(SimulatedBidder(
+            url=f"http://{config.server.host}:{config.server.port}/bid",
+            config=config,
+            latency=Distribution(spec, rng),
+            error_rate=error_rate or faults.error_rate + faults.malformed_rate + faults.drop_rate,
+        ))
+    return bidders
+
+
+def _parse_latency_overrides(values: list[str]) -> tuple[str | None, dict[str, str]]:
+    default, overrides = None, {}
+    for value in values:
+        advertiser_id, sep, spec = value.partition("=")
+        if sep:
+            overrides[advertiser_id] = spec
+        else:
+            default = value
+    return default, overrides
+
+
+def collect_metrics() -> dict[str, str]:
+    """Prometheus text of every service's registry, as the live /metrics endpoints would serve it."""
+    return {
+        "publisher": publisher_metrics.registry.render(),
+        "ssp": ssp_metrics.registry.render(),
+        "advertiser": advertiser_metrics.registry.render(),
+    }
+
+
+def format_summary(result: dict) -> str:
+    """Human-readable summary of a simulation run."""
+    lines = [
+        f"Simulated {result['duration_s']:g}s of traffic in {result['wall_s']:.1f}s "
+        f"({result['speedup']:.0f}x real time) | seed={result['seed']}",
+        f"  auctions:          {result['requests']} ({result['achieved_rps']:.1f}/s virtual, "
+        f"{result['auctions_per_wall_s']:.0f}/s wall)",
+        f"  fill / timeouts:   {result['fill_rate']:.1%} / {result['timeout_rate']:.2%}",
+        f"  {'hop':<16} {'count':>10} " + " ".join(f"{q:>8}" for q in QUANTILES),
+    ]
+    for hop, stats in result["latency_ms"].items():
+        lines.append(f"  {hop:<16} {stats['count']:>10} " + " ".join(
+            "       -" if stats[q] is None else f"{stats[q]:>8.1f}" for q in QUANTILES
+        ))
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate the RTB stack on a virtual clock, faster than real time.")
+    parser.add_argument("--duration", type=float, default=3600.0, help="virtual seconds of traffic (default: 3600)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="open-loop rate in requests/s (default: the publisher's closed loop)")
+    parser.add_argument("--arrivals", choices=("poisson", "fixed"), default="poisson")
+    parser.add_argument("--advertisers", type=int, default=None, help="number of advertisers (default: discovered)")
+    parser.add_argument("--strategy", choices=("first_price", "second_price", "soft_floor"), default=None,
+                        help="auction strategy (default: from SSP config)")
+    parser.add_argument("--network", default="lognormal:0.5,0.5", help="one-way network latency distribution (ms)")
+    parser.add_argument("--ssp-latency", default="lognormal:0.3,0.5", help="SSP processing time distribution (ms)")
+    parser.add_argument("--bidder-latency", action="append", default=[], metavar="[ADVERTISER_ID=]SPEC",
+                        help="advertiser processing time distribution (ms); repeatable, ID= targets one advertiser")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of bidder calls that fail")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--metrics-dir", type=Path, default=None, help="write each service's Prometheus text here")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    env = os.getenv("RTB_ENV", "dev")
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    rng = np.random.default_rng(seed)
+
+    ssp_config = get_ssp_config(env)
+    if args.strategy:
+        ssp_config = replace(ssp_config, auction=replace(ssp_config.auction, strategy=args.strategy))
+    publisher_config = get_publisher_config(env)
+    catalogue_path = os.getenv("RTB_SITE_CATALOGUE", publisher_config.site_catalogue)
+    configs = fleet_configs(env, args.advertisers or len(discover_configs(env)) or 1)
+
+    default_latency, overrides = _parse_latency_overrides(args.bidder_latency)
+    try:
+        simulator = Simulator(
+            ssp_config,
+            publisher_config,
+            build_bidders(configs, default_latency, overrides, args.error_rate, rng),
+            network=Distribution(args.network, rng),
+            ssp_latency=Distribution(args.ssp_latency, rng),
+            catalogue=load_catalogue(catalogue_path) if catalogue_path else None,
+            seed=seed,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    logger.info(f"🎲 Simulating {args.duration:g}s with {len(configs)} advertisers (seed={seed})")
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    simulator.run(args.duration, args.rate, args.arrivals)
+    wall_s = time.perf_counter() - wall_start
+    cpu_s = time.process_time() - cpu_start
+
+    exported = collect_metrics()
+    after = {service: parse_metrics(text) for service, text in exported.items()}
+    usage = {
+        "cpu_percent": round(cpu_s / wall_s * 100.0, 1) if wall_s else 0.0,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    result = summarize_run(args.rate, args.duration, {service: {} for service in after}, after, {"simulator": usage})
+    result.update(
+        seed=seed,
+        wall_s=round(wall_s, 3),
+        speedup=round(args.duration / wall_s, 1) if wall_s else 0.0,
+        auctions_per_wall_s=round(result["requests"] / wall_s, 1) if wall_s else 0.0,
+        events=simulator.loop.processed,
+    )
+
+    if args.metrics_dir is not None:
+        args.metrics_dir.mkdir(parents=True, exist_ok=True)
+        for service, text in exported.items():
+            (args.metrics_dir / f"{service}.prom").write_text(text)
+        logger.info(f"📝 Metrics written to {args.metrics_dir}")
+    print(json.dumps(result, indent=2) if args.json else format_summary(result))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+from src.ssp.config import AdmissionConfig
+
+
+class AdmissionRejected(Exception):
+    """Raised when an auction cannot start in time; mapped to HTTP 503 with Retry-After."""
+
+    def __init__(self, retry_after_s: int):
+        super().__init__("SSP overloaded")
+        self.retry_after_s = retry_after_s
+
+
+class AdmissionController:
+    """
+    Caps concurrent auctions and keeps a bounded FIFO of requests waiting for a slot.
+
+    A request is rejected immediately when the wait queue is full, or once it has waited
+    for its allowed share of tmax. Finished auctions hand their slot straight to the oldest
+    waiter, so admitted requests keep arrival order.
+    """
+
+    def __init__(self, config: AdmissionConfig):
+        self.config = config
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self, timeout: float) -> None:
+        """Take an auction slot, waiting at most `timeout` seconds; raises AdmissionRejected."""
+        if self.active < self.config.max_concurrent_auctions and not self.queued:
+            self.active += 1
+            return
+
+        if self.queued >= self.config.max_queue or timeout <= 0:
+            self._reject()
+
+        while self._waiters and self._waiters[0].done():
+            self._waiters.popleft()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self._reject()
+        except BaseException:
+            # Caller went away; if a slot was already handed over, pass it on.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            self.queued -= 1
+
+    def release(self) -> None:
+        """Return a slot — directly to the oldest live waiter if there is one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, timeout: float):
+        await self.acquire(timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _reject(self):
+        self.rejected += 1
+        raise AdmissionRejected(self.config.retry_after_s)
+
+    def to_dict(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "max_concurrent_auctions": self.config.max_concurrent_auctions,
+            "max_queue": self.config.max_queue,
+        }
@@ -0,0 +1,192 @@
+from abc import ABC, abstractmethod
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from src.ssp.config import AuctionConfig
+from src.ssp.models import Bid
+
+
+class ClearingResult(NamedTuple):
+    """Index of the winning bid in the input sequence and the price it pays."""
+    winner: int
+    price: float
+
+
+class AuctionStrategy(ABC):
+    """
+    Base class for clearing rules.
+
+    A bid is eligible when it meets both the request floor and its bidder's reserve price.
+    Subclasses only decide the price paid, via `_price` (single auction, plain floats) and
+    `_price_batch` (NumPy arrays, one row per auction), and which AuctionConfig fields they
+    take, via `from_config`.
+    """
+
+    def __init__(self, reserve_prices: dict[str, float] | None = None):
+        self.reserve_prices = dict(reserve_prices or {})
+
+    @classmethod
+    def from_config(cls, config: AuctionConfig) -> "AuctionStrategy":
+        return cls(reserve_prices=config.reserve_prices)
+
+    def clear(self, bids: Sequence[Bid], floor: float) -> ClearingResult | None:
+        """Clear one auction; returns None when no bid is eligible."""
+        winner = -1
+        top = second = float("-inf")
+        winner_floor = floor
+        for index, bid in enumerate(bids):
+            effective_floor = max(floor, self.reserve_prices.get(bid.advertiser_id, 0.0))
+            price = bid.bid_price
+            if price < effective_floor:
+                continue
+            if price > top:
+                second = top
+                top = price
+                winner = index
+                winner_floor = effective_floor
+            elif price > second:
+                second = price
+        if winner < 0:
+            return None
+        return ClearingResult(winner, round(self._price(top, second, winner_floor), 4))
+
+    def clear_batch(
+        self,
+        bids: np.ndarray,
+        floors: np.ndarray,
+        reserves: np.ndarray | None = None,
+        bidders: Sequence[str] | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Clear many auctions at once for offline simulation.
+
+        Args:
+            bids: (n_auctions, n_bidders) bid prices, NaN where a bidder did not bid
+            floors: (n_auctions,) request floors
+            reserves: (n_bidders,) per-bidder reserve prices
+            bidders: (n_bidders,) advertiser ID of each column; reserves then come from `reserve_prices`
+
+        Without `reserves` or `bidders` there are no reserves, which is only allowed when the
+        strategy has no `reserve_prices` (raises ValueError otherwise).
+
+        Returns:
+            winners: (n_auctions,) winning bidder column, -1 when nobody won
+            prices: (n_auctions,) price paid, NaN when nobody won
+        """
+        bids = np.asarray(bids, dtype=np.float64)
+        n_auctions, n_bidders = bids.shape
+        if reserves is None:
+            if bidders is not None:
+                reserves = np.array([self.reserve_prices.get(bidder, 0.0) for bidder in bidders], dtype=np.float64)
+            elif self.reserve_prices:
+                raise ValueError("Strategy has reserve_prices: pass reserves or the bidder of each column")
+            else:
+                reserves = np.zeros(n_bidders)
+        if n_bidders == 0:
+            return np.full(n_auctions, -1), np.full(n_auctions, np.nan)
+        effective_floors = np.maximum(np.asarray(floors, dtype=np.float64)[:, None], reserves[None, :])
+
+        with np.errstate(invalid="ignore"):
+            eligible = bids >= effective_floors
+        masked = np.where(eligible, bids, -np.inf)
+
+        winners = masked.argmax(axis=1)
+        rows = np.arange(n_auctions)
+        top = masked[rows, winners]
+        if n_bidders > 1:
+            second = np.partition(masked, -2, axis=1)[:, -2]
+        else:
+            second = np.full(n_auctions, -np.inf)
+        has_winner = np.isfinite(top)
+
+        prices = np.round(self._price_batch(top, second, effective_floors[rows, winners]), 4)
+        return np.where(has_winner, winners, -1), np.where(has_winner, prices, np.nan)
+
+    @abstractmethod
+    def _price(self, top: float, second: float, floor: float) -> float:
+        ...
+
+    @abstractmethod
+    def _price_batch(self, top: np.ndarray, second: np.ndarray, floor: np.ndarray) -> np.ndarray:
+        ...
+
+
+class FirstPriceAuction(AuctionStrategy):
+    """The winner pays its own bid."""
+
+    def _price(self, top, second, floor):
+        return top
+
+    def _price_batch(self, top, second, floor):
+        return top
+
+
+class SecondPriceAuction(AuctionStrategy):
+    """The winner pays the runner-up bid (or the floor) plus an increment, never more than it bid."""
+
+    def __init__(self, increment: float = 0.01, reserve_prices: dict[str, float] | None = None):
+        super().__init__(reserve_prices)
+        self.increment = increment
+
+    @classmethod
+    def from_config(cls, config: AuctionConfig) -> "SecondPriceAuction":
+        return cls(increment=config.increment, reserve_prices=config.reserve_prices)
+
+    def _price(self, top, second, floor):
+        return min(top, max(second, floor) + self.increment)
+
+    def _price_batch(self, top, second, floor):
+        return np.minimum(top, np.maximum(second, floor) + self.increment)
+
+
+class SoftFloorAuction(AuctionStrategy):
+    """
+    Hard floor = the request floor, soft floor = request floor * `soft_floor_multiplier`.
+    Winners at or above the soft floor pay second price (with the soft floor as reserve);
+    winners between the two floors pay their own bid.
+    """
+
+    def __init__(
+        self,
+        soft_floor_multiplier: float = 1.5,
+        increment: float = 0.01,
+        reserve_prices: dict[str, float] | None = None,
+    ):
+        super().__init__(reserve_prices)
+        self.soft_floor_multiplier = soft_floor_multiplier
+        self.increment = increment
+
+    @classmethod
+    def from_config(cls, config: AuctionConfig) -> "SoftFloorAuction":
+        return cls(
+            soft_floor_multiplier=config.soft_floor_multiplier,
+            increment=config.increment,
+            reserve_prices=config.reserve_prices,
+        )
+
+    def _price(self, top, second, floor):
+        soft_floor = floor * self.soft_floor_multiplier
+        if top < soft_floor:
+            return top
+        return min(top, max(second, soft_floor) + self.increment)
+
+    def _price_batch(self, top, second, floor):
+        soft_floor = floor * self.soft_floor_multiplier
+        second_price = np.minimum(top, np.maximum(second, soft_floor) + self.increment)
+        return np.where(top < soft_floor, top, second_price)
+
+
+STRATEGIES = {
+    "first_price": FirstPriceAuction,
+    "second_price": SecondPriceAuction,
+    "soft_floor": SoftFloorAuction,
+}
+
+
+def create_strategy(config: AuctionConfig) -> AuctionStrategy:
+    """Build the clearing strategy selected in SSPConfig.auction."""
+    strategy = STRATEGIES.get(config.strategy)
+    if strategy is None:
+        raise ValueError(f"Unknown auction strategy: '{config.strategy}'. Available: {list(STRATEGIES.keys())}")
+    return strategy.from_config(config)
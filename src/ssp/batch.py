@@ -0,0 +1,49 @@
+import orjson
+from pydantic import ValidationError
+
+from src.ssp.exception_handlers import format_validation_errors
+from src.ssp.models import BidRequestIn
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def _rejected(reason: str, errors: list[dict]) -> dict:
+    return {"status": "rejected", "reason": reason, "errors": errors}
+
+
+def _validate_item(item) -> BidRequestIn | dict:
+    try:
+        return BidRequestIn.model_validate(item)
+    except ValidationError as e:
+        return _rejected("validation_error", format_validation_errors(e.errors()))
+
+
+def parse_batch(body: bytes, content_type: str, max_items: int) -> list[BidRequestIn | dict]:
+    """
+    Split a batch body into validated BidRequestIn items.
+
+    Items that fail validation (or NDJSON lines that are not JSON) are returned in place as
+    "rejected" result dicts so the caller can report them inline. Raises ValueError only when
+    the batch as a whole is unusable.
+    """
+    if content_type.split(";")[0].strip().lower() in NDJSON_CONTENT_TYPES:
+        lines = [line for line in body.splitlines() if line.strip()]
+        if len(lines) > max_items:
+            raise ValueError(f"batch of {len(lines)} items exceeds limit of {max_items}")
+        items = []
+        for line in lines:
+            try:
+                items.append(_validate_item(orjson.loads(line)))
+            except orjson.JSONDecodeError as e:
+                items.append(_rejected("invalid_json", [{"field": "", "message": str(e), "type": "json_invalid"}]))
+        return items
+
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"body is not valid JSON: {e}") from e
+    if not isinstance(payload, list):
+        raise ValueError("body must be a JSON array of bid requests")
+    if len(payload) > max_items:
+        raise ValueError(f"batch of {len(payload)} items exceeds limit of {max_items}")
+    return [_validate_item(item) for item in payload]
@@ -0,0 +1,98 @@
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable
+
+from src.logging_config import get_logger
+from src.ssp.config import CircuitBreakerConfig
+
+logger = get_logger("SSP-Server")
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-advertiser circuit breaker.
+
+    CLOSED: traffic flows; errors/timeouts are counted over a rolling window.
+    OPEN: the advertiser is skipped until `open_duration_s` has passed.
+    HALF_OPEN: a limited number of probe requests decide whether to close or re-open.
+    """
+
+    def __init__(self, name: str, config: CircuitBreakerConfig, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.config = config
+        self._clock = clock
+        self.state = BreakerState.CLOSED
+        self._failures: deque[float] = deque()
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        """Return True if the advertiser should be included in the current fan-out."""
+        if self.state is BreakerState.CLOSED:
+            return True
+
+        if self.state is BreakerState.OPEN:
+            if self._clock() - self._opened_at < self.config.open_duration_s:
+                return False
+            self._transition(BreakerState.HALF_OPEN)
+            self._probes_in_flight = 0
+
+        if self._probes_in_flight < self.config.half_open_max_probes:
+            self._probes_in_flight += 1
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state is BreakerState.HALF_OPEN:
+            self._failures.clear()
+            self._transition(BreakerState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Record an error or timeout; may trip the breaker."""
+        now = self._clock()
+        if self.state is BreakerState.HALF_OPEN:
+            self._trip(now)
+            return
+        if self.state is BreakerState.OPEN:
+            return
+
+        self._failures.append(now)
+        self._prune(now)
+        if len(self._failures) >= self.config.failure_threshold:
+            self._trip(now)
+
+    def recent_failures(self) -> int:
+        self._prune(self._clock())
+        return len(self._failures)
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.config.window_s
+        while self._failures and self._failures[0] < cutoff:
+            self._failures.popleft()
+
+    def _trip(self, now: float) -> None:
+        self._opened_at = now
+        self._failures.clear()
+        self.times_opened += 1
+        self._transition(BreakerState.OPEN)
+
+    def _transition(self, new_state: BreakerState) -> None:
+        if new_state is self.state:
+            return
+        logger.warning(f"🔌 Circuit breaker for {self.name}: {self.state.value} -> {new_state.value}")
+        self.state = new_state
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state.value,
+            "recent_failures": self.recent_failures(),
+            "times_opened": self.times_opened,
+        }
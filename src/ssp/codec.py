@@ -0,0 +1,28 @@
+import orjson
+
+from src.logging_config import get_logger
+from src.ssp.models import Bid, BidRequestIn
+
+logger = get_logger("SSP-Server")
+
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+def encode_bid_request(bid_request: BidRequestIn) -> bytes:
+    """Encode a BidRequest once per auction; the bytes are reused for every advertiser."""
+    return bid_request.model_dump_json().encode()
+
+
+def decode_bid(content: bytes) -> Bid | None:
+    """Decode an advertiser response into a Bid, or None if it is malformed."""
+    try:
+        data = orjson.loads(content)
+        return Bid(
+            request_id=data["request_id"],
+            advertiser_id=data["advertiser_id"],
+            bid_price=float(data["bid_price"]),
+            ad_id=data["ad_id"],
+        )
+    except (orjson.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        logger.warning(f"⚠️ Malformed bid response: {e!r}")
+        return None
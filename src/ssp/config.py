@@ -11,14 +11,80 @@ class ServerConfig:
     reload: bool = False  # True only for development
 
 
+@dataclass(frozen=True)
+class HttpClientConfig:
+    """Connection pool settings for the outbound client used to reach advertisers."""
+    max_connections: int = 200
+    max_keepalive_connections: int = 100
+    keepalive_expiry_s: float = 30.0
+
+
+@dataclass(frozen=True)
+class CircuitBreakerConfig:
+    """Per-advertiser circuit breaker thresholds."""
+    failure_threshold: int = 5  # errors/timeouts within the window that trip the breaker
+    window_s: float = 10.0
+    open_duration_s: float = 5.0  # how long an open breaker waits before probing
+    half_open_max_probes: int = 1
+
+
+@dataclass(frozen=True)
+class AdmissionConfig:
+    """Load shedding: concurrent auction cap and bounded wait queue."""
+    max_concurrent_auctions: int = 1000
+    max_queue: int = 2000
+    max_queue_wait_fraction: float = 0.25  # share of tmax a request may spend waiting for a slot
+    retry_after_s: int = 1
+
+
+@dataclass(frozen=True)
+class DedupConfig:
+    """Request-ID deduplication of publisher retries."""
+    ttl_s: float = 30.0
+    max_entries: int = 1_000_000  # memory cap; oldest entries are evicted first
+
+
+@dataclass(frozen=True)
+class AuctionConfig:
+    """How the SSP clears auctions (see src.ssp.auction)."""
+    strategy: str = "first_price"  # first_price | second_price | soft_floor
+    increment: float = 0.01  # added to the runner-up price in second-price clearing
+    soft_floor_multiplier: float = 1.5  # soft floor = request floor * multiplier
+    reserve_prices: dict[str, float] = field(default_factory=dict)  # advertiser_id -> reserve
+
+
+@dataclass(frozen=True)
+class BidderTargeting:
+    """
+    Targeting rules declared by one advertiser endpoint.
+
+    Empty allow-lists mean "everything"; block-lists always win. `max_floor` is the highest
+    bid floor the advertiser is willing to pay — requests above it are not sent.
+    """
+    url: str
+    allowed_categories: tuple[str, ...] = ()
+    blocked_categories: tuple[str, ...] = ()
+    allowed_domains: tuple[str, ...] = ()
+    blocked_domains: tuple[str, ...] = ()
+    max_floor: float | None = None
+
+
 @dataclass(frozen=True)
 class SSPConfig:
     """Main SSP configuration."""
     server: ServerConfig = field(default_factory=ServerConfig)
+    http_client: HttpClientConfig = field(default_factory=HttpClientConfig)
+    circuit_breaker: CircuitBreakerConfig = field(default_factory=CircuitBreakerConfig)
+    auction: AuctionConfig = field(default_factory=AuctionConfig)
+    dedup: DedupConfig = field(default_factory=DedupConfig)
+    admission: AdmissionConfig = field(default_factory=AdmissionConfig)
     max_bid_response_time_ms: int = 100  # RTB timeout for bid response
+    auction_margin_ms: int = 5  # part of tmax reserved for clearing and writing the response
     currency: str = "USD"
     seat_id: str = "ssp-001"
+    max_batch_size: int = 1000  # bid requests accepted per /bid/request/batch call
     advertiser_urls: tuple[str, ...] = field(default_factory=tuple)
+    bidder_targeting: tuple[BidderTargeting, ...] = field(default_factory=tuple)  # urls without rules get all traffic
 
 # --- Environment presets ---
 
@@ -31,7 +97,7 @@ DEVELOPMENT = SSPConfig(
         reload=True,
     ),
     max_bid_response_time_ms=500,  # more lenient in dev
-    advertiser_urls=("http://127.0.0.1:8001/bid", "http://127.0.0.1:8002/bid"),
+    advertiser_urls=("http://127.0.0.1:8001/bid", "http://127.0.0.1:8003/bid"),
 )
 
 STAGING = SSPConfig(
@@ -43,7 +109,12 @@ STAGING = SSPConfig(
         reload=False,
     ),
     max_bid_response_time_ms=150,
-    advertiser_urls=("http://127.0.0.1:8001/bid", "http://127.0.0.1:8002/bid"),
+    http_client=HttpClientConfig(
+        max_connections=400,
+        max_keepalive_connections=200,
+        keepalive_expiry_s=60.0,
+    ),
+    advertiser_urls=("http://127.0.0.1:8001/bid", "http://127.0.0.1:8003/bid"),
 )
 
 PRODUCTION = SSPConfig(
@@ -55,7 +126,12 @@ PRODUCTION = SSPConfig(
         reload=False,
     ),
     max_bid_response_time_ms=100,
-    advertiser_urls=("http://127.0.0.1:8001/bid", "http://127.0.0.1:8002/bid"),
+    http_client=HttpClientConfig(
+        max_connections=1000,
+        max_keepalive_connections=500,
+        keepalive_expiry_s=120.0,
+    ),
+    advertiser_urls=("http://127.0.0.1:8001/bid", "http://127.0.0.1:8003/bid"),
 )
 
 ENVIRONMENTS = {
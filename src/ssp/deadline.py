@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, Coroutine
+
+from fastapi import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class ArrivalTimeMiddleware:
+    """Pure ASGI middleware that stamps every HTTP request with its arrival time on the loop clock."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["received_at"] = asyncio.get_running_loop().time()
+        await self.app(scope, receive, send)
+
+
+def auction_deadline(request: Request, budget_ms: float) -> float:
+    """Loop-clock deadline for an auction, measured from when the request hit the server."""
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is None:
+        received_at = asyncio.get_running_loop().time()
+    return received_at + budget_ms / 1000.0
+
+
+async def gather_until_deadline(coros: list[Coroutine[Any, Any, Any]], deadline: float) -> list[Any]:
+    """
+    Run coroutines concurrently and collect their results until `deadline` (loop time).
+
+    Returns as soon as every coroutine finishes. Anything still pending at the deadline
+    is cancelled and reported as None; the result list keeps the input order.
+    """
+    if not coros:
+        return []
+
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    timeout = max(deadline - asyncio.get_running_loop().time(), 0.0)
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+    for task in pending:
+        task.cancel()
+
+    return [
+        task.result() if task in done and task.exception() is None else None
+        for task in tasks
+    ]
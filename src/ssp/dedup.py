@@ -0,0 +1,84 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from src.ssp.config import DedupConfig
+
+
+class DedupCache:
+    """
+    Bounded, TTL-evicting cache of auction outcomes keyed by BidRequest ID.
+
+    Each entry holds a Future: a duplicate that arrives while the first auction is still
+    running awaits the same Future (and runs the auction itself if the first caller is
+    cancelled); one that arrives later gets the cached result. Entries
+    live in insertion order, so expiry and the size cap both evict from the front — every
+    operation is O(1) regardless of how many IDs are cached.
+    """
+
+    def __init__(self, config: DedupConfig, clock: Callable[[], float] = time.monotonic):
+        self.config = config
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, asyncio.Future]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.in_flight_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_run(self, request_id: str, run: Callable[[], Awaitable[dict]]) -> dict:
+        """Return the outcome for `request_id`, running the auction only for the first caller."""
+        self._evict_expired()
+
+        entry = self._entries.get(request_id)
+        if entry is not None:
+            future = entry[1]
+            self.hits += 1
+            if not future.done():
+                self.in_flight_hits += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise  # this caller was cancelled itself
+                # Only the first caller's auction was cancelled; this request still needs an outcome.
+                return await self.get_or_run(request_id, run)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._entries[request_id] = (self._clock() + self.config.ttl_s, future)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+
+        try:
+            result = await run()
+        except BaseException as e:
+            # Don't cache failures — let waiting duplicates see the error and future retries run again.
+            self._entries.pop(request_id, None)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # mark retrieved so an un-awaited failure is not logged
+            raise
+        future.set_result(result)
+        return result
+
+    def _evict_expired(self) -> None:
+        now = self._clock()
+        while self._entries:
+            expires_at, _ = next(iter(self._entries.values()))
+            if expires_at > now:
+                break
+            self._entries.popitem(last=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.config.max_entries,
+            "hits": self.hits,
+            "in_flight_hits": self.in_flight_hits,
+            "misses": self.misses,
+        }
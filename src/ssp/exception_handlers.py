@@ -3,20 +3,27 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
 from src.logging_config import get_logger
+from src.ssp.admission import AdmissionRejected
 
 logger = get_logger("SSP-Server")
 
 
-async def validation_exception_handler(_request: Request, exc: RequestValidationError):
-    """Custom handler for request validation errors — returns clear RTB-style error messages."""
+def format_validation_errors(raw_errors) -> list[dict]:
+    """Flatten pydantic/FastAPI error dicts into RTB-style {field, message, type} entries."""
     errors = []
-    for error in exc.errors():
+    for error in raw_errors:
         field = " -> ".join(str(loc) for loc in error["loc"] if loc != "body")
         errors.append({
             "field": field,
             "message": error["msg"],
             "type": error["type"],
         })
+    return errors
+
+
+async def validation_exception_handler(_request: Request, exc: RequestValidationError):
+    """Custom handler for request validation errors — returns clear RTB-style error messages."""
+    errors = format_validation_errors(exc.errors())
 
     logger.warning(f"🚫 Invalid BidRequest received: {errors}")
     return JSONResponse(
@@ -28,3 +35,11 @@ async def validation_exception_handler(_request: Request, exc: RequestValidation
         },
     )
 
+
+async def admission_rejected_handler(_request: Request, exc: AdmissionRejected):
+    """Fast 503 for auctions shed under overload, telling the publisher when to retry."""
+    return JSONResponse(
+        status_code=503,
+        content={"status": "rejected", "reason": "overloaded"},
+        headers={"Retry-After": str(exc.retry_after_s)},
+    )
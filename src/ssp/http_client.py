@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+
+import httpx
+
+from src.ssp.config import HttpClientConfig
+
+
+@dataclass
+class ConnectionStats:
+    """Counters showing how often outbound requests reuse a pooled keep-alive connection."""
+    requests: int = 0
+    connections_opened: int = 0
+
+    @property
+    def connections_reused(self) -> int:
+        return max(self.requests - self.connections_opened, 0)
+
+    async def trace(self, event_name: str, _info: dict) -> None:
+        """httpcore `trace` extension hook — counts every freshly established TCP connection."""
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+        }
+
+
+def create_client(
+    config: HttpClientConfig,
+    timeout_ms: int,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """Build the long-lived AsyncClient shared by all auctions in this worker."""
+    limits = httpx.Limits(
+        max_connections=config.max_connections,
+        max_keepalive_connections=config.max_keepalive_connections,
+        keepalive_expiry=config.keepalive_expiry_s,
+    )
+    return httpx.AsyncClient(timeout=timeout_ms / 1000.0, limits=limits, transport=transport)
@@ -0,0 +1,23 @@
+from src.metrics import PRICE_BUCKETS, add_http_metrics, create_registry
+
+registry = create_registry("ssp")
+
+http_requests, http_latency = add_http_metrics(registry)
+
+auctions = registry.counter("ssp_auctions_total", "Auctions run, by result", ("result",))
+clearing_price = registry.histogram("ssp_clearing_price", "Price paid by auction winners (USD CPM)", PRICE_BUCKETS)
+registry.ratio("ssp_fill_rate", "Share of auctions that produced a winner", auctions, auctions, result="bid_won")
+
+bidder_requests = registry.counter(
+    "ssp_bidder_requests_total",
+    "Outbound bid requests per bidder, by outcome (bid, no_bid, timeout, error)",
+    ("bidder", "outcome"),
+)
+bidder_response_time = registry.histogram(
+    "ssp_bidder_response_time_ms", "Time until a bidder answered (or failed)", labelnames=("bidder",)
+)
+bidder_wins = registry.counter("ssp_bidder_wins_total", "Auctions won per bidder", ("bidder",))
+
+admission_active = registry.gauge("ssp_admission_active", "Auctions currently running")
+admission_queue_depth = registry.gauge("ssp_admission_queue_depth", "Requests waiting for an auction slot")
+admission_rejected = registry.counter("ssp_admission_rejected_total", "Requests shed by admission control")
@@ -1,3 +1,4 @@
+from typing import NamedTuple
 from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator
@@ -37,3 +38,20 @@ class BidRequestIn(BaseModel):
         """Normalize category to uppercase (IAB convention)."""
         return v.strip().upper()
 
+
+class BidderRegistration(BaseModel):
+    """Targeting rules an advertiser declares when registering with the SSP."""
+    url: str = Field(..., min_length=1, description="Advertiser bid endpoint URL")
+    allowed_categories: list[str] = Field(default_factory=list, description="Only these categories (empty = all)")
+    blocked_categories: list[str] = Field(default_factory=list, description="Never these categories")
+    allowed_domains: list[str] = Field(default_factory=list, description="Only these domains (empty = all)")
+    blocked_domains: list[str] = Field(default_factory=list, description="Never these domains")
+    max_floor: float | None = Field(None, ge=0, description="Highest bid floor the advertiser will pay")
+
+
+class Bid(NamedTuple):
+    """Compact, immutable view of an advertiser's bid response used during auction clearing."""
+    request_id: str
+    advertiser_id: str
+    bid_price: float
+    ad_id: str
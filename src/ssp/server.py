@@ -1,88 +1,324 @@
 import asyncio
 import os
+import time
 from contextlib import asynccontextmanager
+from dataclasses import replace
+from functools import partial
+from typing import Iterable
 
 import httpx
-from fastapi import FastAPI
+import orjson
+from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 
-from src.logging_config import get_logger
-from src.ssp.config import get_config
-from src.ssp.exception_handlers import validation_exception_handler
-from src.ssp.models import BidRequestIn
+from src.logging_config import get_logger, get_request_logger
+from src.metrics import MetricsMiddleware
+from src.ssp import metrics
+from src.ssp.admission import AdmissionController, AdmissionRejected
+from src.ssp.auction import create_strategy
+from src.ssp.batch import parse_batch
+from src.ssp.circuit_breaker import CircuitBreaker
+from src.ssp.codec import JSON_HEADERS, decode_bid, encode_bid_request
+from src.ssp.config import BidderTargeting, get_config
+from src.ssp.deadline import ArrivalTimeMiddleware, auction_deadline, gather_until_deadline
+from src.ssp.dedup import DedupCache
+from src.ssp.exception_handlers import admission_rejected_handler, validation_exception_handler
+from src.ssp.http_client import ConnectionStats, create_client
+from src.ssp.models import Bid, BidderRegistration, BidRequestIn
+from src.ssp.targeting import build_index
+from src.tracing import TRACE_HEADER, TracingMiddleware, create_tracer, current_trace_id
 
 env = os.getenv("RTB_ENV", "dev")
 config = get_config(env)
+if os.getenv("RTB_ADVERTISER_URLS"):
+    # Set by the simulation supervisor from the advertiser configs it discovered.
+    config = replace(config, advertiser_urls=tuple(os.environ["RTB_ADVERTISER_URLS"].split(",")))
 
 logger = get_logger("SSP-Server")
+request_logger = get_request_logger("SSP-Server")
+tracer = create_tracer("ssp")
+
+http_client: httpx.AsyncClient | None = None
+connection_stats = ConnectionStats()
+targeting_index = build_index(config.advertiser_urls, config.bidder_targeting)
+circuit_breakers = {url: CircuitBreaker(url, config.circuit_breaker) for url in targeting_index.urls}
+auction_strategy = create_strategy(config.auction)
+dedup_cache = DedupCache(config.dedup)
+admission = AdmissionController(config.admission)
+metrics.admission_active.set_function(lambda: admission.active)
+metrics.admission_queue_depth.set_function(lambda: admission.queued)
+
+
+def set_bidders(advertiser_urls: Iterable[str]) -> None:
+    """Replace the configured bidder set (targeting rules from config still apply)."""
+    global targeting_index, circuit_breakers
+    targeting_index = build_index(advertiser_urls, config.bidder_targeting)
+    circuit_breakers = {url: CircuitBreaker(url, config.circuit_breaker) for url in targeting_index.urls}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the worker-wide pooled client, creating it if lifespan has not run (e.g. ASGI tests)."""
+    global http_client
+    if http_client is None:
+        http_client = create_client(config.http_client, config.max_bid_response_time_ms)
+    return http_client
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
+    global http_client
     logger.info(f"🚀 SSP Server starting | env={env} | seat={config.seat_id}")
     logger.info(f"⚙️  Config: host={config.server.host}, port={config.server.port}, "
-                f"workers={config.server.workers}, timeout={config.max_bid_response_time_ms}ms")
+                f"workers={config.server.workers}, timeout={config.max_bid_response_time_ms}ms, "
+                f"pool={config.http_client.max_connections}/{config.http_client.max_keepalive_connections}")
+    get_http_client()
+    metrics_flusher = asyncio.create_task(metrics.registry.flush_periodically())
     yield
+    metrics_flusher.cancel()
+    metrics.registry.close()
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
     logger.info("🛑 SSP Server shutting down")
 
 
-app = FastAPI(title="RTB SSP Receiver", version="0.1.0", lifespan=lifespan)
+app = FastAPI(
+    title="RTB SSP Receiver",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
+app.add_exception_handler(AdmissionRejected, admission_rejected_handler)
+app.add_middleware(ArrivalTimeMiddleware)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+app.add_middleware(MetricsMiddleware, requests=metrics.http_requests, latency=metrics.http_latency)
+
 
+def _record_bidder_outcome(url: str, outcome: str, start: float) -> None:
+    end = time.perf_counter()
+    metrics.bidder_requests.inc(url, outcome)
+    metrics.bidder_response_time.observe((end - start) * 1000.0, url)
+    trace_id = current_trace_id()
+    if trace_id is not None:
+        tracer.record(trace_id, "bidder", start, end, bidder=url, outcome=outcome)
 
-async def fetch_bid_from_advertiser(client: httpx.AsyncClient, url: str, bid_data: dict) -> dict | None:
-    """Send bid request to a single advertiser and return response."""
+
+async def fetch_bid_from_advertiser(client: httpx.AsyncClient, url: str, payload: bytes) -> Bid | None:
+    """Send a pre-encoded bid request to a single advertiser and return its bid."""
+    breaker = circuit_breakers[url]
+    connection_stats.requests += 1
+    trace_id = current_trace_id()
+    headers = JSON_HEADERS if trace_id is None else {**JSON_HEADERS, TRACE_HEADER: trace_id}
+    start = time.perf_counter()
     try:
-        response = await client.post(url, json=bid_data)
-        if response.status_code == 200:
-            return response.json()
+        response = await client.post(
+            url, content=payload, headers=headers, extensions={"trace": connection_stats.trace}
+        )
+    except httpx.TimeoutException as e:
+        logger.warning(f"⚠️ Advertiser {url} timed out: {e!r}")
+        _record_bidder_outcome(url, "timeout", start)
+        breaker.record_failure()
+        return None
     except httpx.RequestError as e:
         logger.warning(f"⚠️ Failed to reach advertiser {url}: {e}")
-    return None
+        _record_bidder_outcome(url, "error", start)
+        breaker.record_failure()
+        return None
+    except asyncio.CancelledError:
+        # Cancelled by the auction deadline — the advertiser was too slow.
+        _record_bidder_outcome(url, "timeout", start)
+        breaker.record_failure()
+        raise
 
+    if response.status_code >= 500:
+        logger.warning(f"⚠️ Advertiser {url} returned status {response.status_code}")
+        _record_bidder_outcome(url, "error", start)
+        breaker.record_failure()
+        return None
 
-@app.post("/bid/request")
-async def receive_bid_request(bid_request: BidRequestIn):
-    """Receive and validate a BidRequest from a publisher, forward to advertisers."""
-    logger.info(
-        f"📥 Received BidRequest: ID={bid_request.id[:8]}... | "
-        f"domain={bid_request.domain} | category={bid_request.category} | "
-        f"floor={bid_request.bid_floor}$"
-    )
+    if response.status_code != 200:
+        _record_bidder_outcome(url, "no_bid", start)
+        breaker.record_success()
+        return None
+
+    bid = decode_bid(response.content)
+    if bid is None:
+        _record_bidder_outcome(url, "error", start)
+        breaker.record_failure()
+    else:
+        _record_bidder_outcome(url, "bid", start)
+        breaker.record_success()
+    return bid
 
-    bid_data = bid_request.model_dump()
-    timeout_sec = config.max_bid_response_time_ms / 1000.0
 
-    async with httpx.AsyncClient(timeout=timeout_sec) as client:
-        tasks = [
-            fetch_bid_from_advertiser(client, url, bid_data)
-            for url in config.advertiser_urls
-        ]
-        responses = await asyncio.gather(*tasks)
+async def run_auction(bid_request: BidRequestIn, deadline: float) -> dict:
+    """Fan a validated BidRequest out to eligible advertisers and clear the auction by `deadline`."""
+    payload = encode_bid_request(bid_request)
+    client = get_http_client()
 
-    valid_bids = [r for r in responses if r is not None and r.get("bid_price", 0) >= bid_request.bid_floor]
+    eligible_urls = targeting_index.eligible(bid_request.category, bid_request.domain, bid_request.bid_floor)
+    bidder_urls = [url for url in eligible_urls if circuit_breakers[url].allow_request()]
+    with tracer.span("fanout", bidders=len(bidder_urls)):
+        responses = await gather_until_deadline(
+            [fetch_bid_from_advertiser(client, url, payload) for url in bidder_urls], deadline
+        )
 
-    if not valid_bids:
-        logger.info(f"📭 No valid bids for request {bid_request.id[:8]}...")
+    with tracer.span("clearing"):
+        received = [(bid, url) for bid, url in zip(responses, bidder_urls) if bid is not None]
+        result = auction_strategy.clear([bid for bid, _ in received], bid_request.bid_floor)
+
+    if result is None:
+        request_logger.info("📭 No valid bids for request %.8s...", bid_request.id)
+        metrics.auctions.inc("no_bid")
         return {"status": "no_bid", "id": bid_request.id}
 
-    winning_bid = max(valid_bids, key=lambda x: x["bid_price"])
-    logger.info(
-        f"🏆 Winning bid: advertiser={winning_bid['advertiser_id']} | "
-        f"price={winning_bid['bid_price']}$ | ad={winning_bid['ad_id'][:8]}..."
+    winning_bid, winning_url = received[result.winner]
+    metrics.auctions.inc("bid_won")
+    metrics.bidder_wins.inc(winning_url)
+    metrics.clearing_price.observe(result.price)
+    request_logger.info(
+        "🏆 Winning bid: advertiser=%s | bid=%s$ | pays=%s$ | ad=%.8s...",
+        winning_bid.advertiser_id, winning_bid.bid_price, result.price, winning_bid.ad_id,
     )
 
     return {
         "status": "bid_won",
         "id": bid_request.id,
-        "winning_bid": winning_bid,
+        "winning_bid": winning_bid._asdict(),
+        "clearing_price": result.price,
     }
 
 
+async def run_admitted_auction(bid_request: BidRequestIn, deadline: float, admit_by: float) -> dict:
+    """Run the auction once admission control grants a slot; raises AdmissionRejected after `admit_by`."""
+    try:
+        async with admission.slot(admit_by - asyncio.get_running_loop().time()):
+            return await run_auction(bid_request, deadline)
+    except AdmissionRejected:
+        metrics.admission_rejected.inc()
+        request_logger.warning("🚦 Shedding BidRequest %.8s... — SSP overloaded", bid_request.id)
+        raise
+
+
+def _auction_deadlines(request: Request) -> tuple[float, float]:
+    """(auction deadline, latest time the auction may start) for a request, both from its arrival."""
+    tmax_ms = config.max_bid_response_time_ms
+    return (
+        auction_deadline(request, tmax_ms - config.auction_margin_ms),
+        auction_deadline(request, tmax_ms * config.admission.max_queue_wait_fraction),
+    )
+
+
+@app.post("/bid/request")
+async def receive_bid_request(bid_request: BidRequestIn, request: Request):
+    """Receive and validate a BidRequest from a publisher, forward to advertisers."""
+    tracer.record_since_request_start("parse")
+    request_logger.info(
+        "📥 Received BidRequest: ID=%.8s... | domain=%s | category=%s | floor=%s$",
+        bid_request.id, bid_request.domain, bid_request.category, bid_request.bid_floor,
+    )
+
+    deadline, admit_by = _auction_deadlines(request)
+    return await dedup_cache.get_or_run(
+        bid_request.id, partial(run_admitted_auction, bid_request, deadline, admit_by)
+    )
+
+
+async def _run_batch_item(bid_request: BidRequestIn, deadline: float, admit_by: float) -> dict:
+    try:
+        return await dedup_cache.get_or_run(
+            bid_request.id, partial(run_admitted_auction, bid_request, deadline, admit_by)
+        )
+    except AdmissionRejected:
+        return {"status": "rejected", "reason": "overloaded", "id": bid_request.id}
+    except Exception:
+        # The 200 and earlier items are already streamed; fail this item only, not the rest of the batch.
+        logger.exception(f"❌ Auction failed for batch item {bid_request.id}")
+        return {"status": "error", "reason": "internal_error", "id": bid_request.id}
+
+
+@app.post("/bid/request/batch")
+async def receive_bid_request_batch(request: Request):
+    """
+    Receive many BidRequests in one call — a JSON array or NDJSON (application/x-ndjson).
+
+    All auctions run concurrently under one shared deadline. Results are streamed back as
+    NDJSON in input order; invalid items get an inline "rejected" result and items whose auction
+    fails an inline "error" result, instead of failing the batch.
+    """
+    deadline, admit_by = _auction_deadlines(request)
+    try:
+        items = parse_batch(
+            await request.body(), request.headers.get("content-type", ""), config.max_batch_size
+        )
+    except ValueError as e:
+        logger.warning(f"🚫 Invalid BidRequest batch received: {e}")
+        return JSONResponse(
+            status_code=422,
+            content={"status": "rejected", "reason": "invalid_batch", "errors": [{"message": str(e)}]},
+        )
+
+    request_logger.info("📥 Received BidRequest batch: size=%d", len(items))
+    tasks = [
+        asyncio.ensure_future(_run_batch_item(item, deadline, admit_by)) if isinstance(item, BidRequestIn) else item
+        for item in items
+    ]
+
+    async def stream_results():
+        try:
+            for index, task in enumerate(tasks):
+                result = await task if isinstance(task, asyncio.Future) else task
+                yield orjson.dumps({"index": index, **result}) + b"\n"
+        finally:
+            for task in tasks:
+                if isinstance(task, asyncio.Future):
+                    task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@app.post("/bidders/register")
+async def register_bidder(registration: BidderRegistration):
+    """Register an advertiser endpoint (or replace its targeting) and rebuild the targeting index."""
+    targeting_index.register(BidderTargeting(
+        url=registration.url,
+        allowed_categories=tuple(registration.allowed_categories),
+        blocked_categories=tuple(registration.blocked_categories),
+        allowed_domains=tuple(registration.allowed_domains),
+        blocked_domains=tuple(registration.blocked_domains),
+        max_floor=registration.max_floor,
+    ))
+    circuit_breakers.setdefault(registration.url, CircuitBreaker(registration.url, config.circuit_breaker))
+    logger.info(f"📝 Registered bidder {registration.url} | total={len(targeting_index.urls)}")
+    return {"status": "registered", "url": registration.url, "bidders": len(targeting_index.urls)}
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus scrape endpoint (summed across workers when RTB_METRICS_DIR is set)."""
+    return metrics.registry.response()
+
+
+@app.get("/debug/traces")
+async def debug_traces(trace_id: str | None = None, limit: int = 100):
+    """Recently recorded spans, newest first — optionally for a single trace."""
+    return {"service": tracer.service, "spans": tracer.query(trace_id, limit)}
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for GCP load balancer / readiness probe."""
-    return {"status": "ok", "env": env, "seat_id": config.seat_id}
+    return {
+        "status": "ok",
+        "env": env,
+        "seat_id": config.seat_id,
+        "connections": connection_stats.to_dict(),
+        "circuit_breakers": {url: breaker.to_dict() for url, breaker in circuit_breakers.items()},
+        "dedup": dedup_cache.to_dict(),
+        "admission": admission.to_dict(),
+    }
 
 
 if __name__ == "__main__":
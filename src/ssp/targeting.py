@@ -0,0 +1,111 @@
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable
+
+from src.ssp.config import BidderTargeting
+
+_MASK_CACHE_LIMIT = 4096
+
+
+class TargetingIndex:
+    """
+    Inverted index from request attributes to the advertisers eligible to bid on them.
+
+    Every registered bidder owns one bit. Category, domain and floor rules are folded into
+    integer bitmasks at build time, so matching a request is a few dict lookups, one bisect
+    and a bitwise AND — independent of how many rules each bidder declares.
+    """
+
+    def __init__(self, bidders: Iterable[BidderTargeting] = ()):
+        self._rules: dict[str, BidderTargeting] = {}
+        for targeting in bidders:
+            self._rules[targeting.url] = targeting
+        self._rebuild()
+
+    def register(self, targeting: BidderTargeting) -> None:
+        """Add or replace a bidder's targeting rules and rebuild the index."""
+        self._rules[targeting.url] = targeting
+        self._rebuild()
+
+    @property
+    def urls(self) -> tuple[str, ...]:
+        return self._urls
+
+    def rules(self, url: str) -> BidderTargeting:
+        return self._rules[url]
+
+    def eligible(self, category: str, domain: str, bid_floor: float) -> tuple[str, ...]:
+        """Return the bidder URLs whose targeting accepts this request, in registration order."""
+        category = category.upper()
+        domain = domain.lower()
+        mask = (self._category_open | self._category_allowed.get(category, 0)) & ~self._category_blocked.get(category, 0)
+        mask &= (self._domain_open | self._domain_allowed.get(domain, 0)) & ~self._domain_blocked.get(domain, 0)
+        mask &= self._floor_masks[bisect_left(self._floor_thresholds, bid_floor)]
+        return self._urls_for_mask(mask)
+
+    def _rebuild(self) -> None:
+        self._urls = tuple(self._rules)
+        self._mask_cache: dict[int, tuple[str, ...]] = {}
+
+        self._category_open = 0
+        self._domain_open = 0
+        category_allowed: dict[str, int] = defaultdict(int)
+        category_blocked: dict[str, int] = defaultdict(int)
+        domain_allowed: dict[str, int] = defaultdict(int)
+        domain_blocked: dict[str, int] = defaultdict(int)
+        unlimited_floor = 0
+        floor_limits: list[tuple[float, int]] = []
+
+        for position, targeting in enumerate(self._rules.values()):
+            bit = 1 << position
+
+            if targeting.allowed_categories:
+                for category in targeting.allowed_categories:
+                    category_allowed[category.upper()] |= bit
+            else:
+                self._category_open |= bit
+            for category in targeting.blocked_categories:
+                category_blocked[category.upper()] |= bit
+
+            if targeting.allowed_domains:
+                for domain in targeting.allowed_domains:
+                    domain_allowed[domain.lower()] |= bit
+            else:
+                self._domain_open |= bit
+            for domain in targeting.blocked_domains:
+                domain_blocked[domain.lower()] |= bit
+
+            if targeting.max_floor is None:
+                unlimited_floor |= bit
+            else:
+                floor_limits.append((targeting.max_floor, bit))
+
+        self._category_allowed = dict(category_allowed)
+        self._category_blocked = dict(category_blocked)
+        self._domain_allowed = dict(domain_allowed)
+        self._domain_blocked = dict(domain_blocked)
+
+        # _floor_masks[i] holds every bidder whose max_floor >= _floor_thresholds[i],
+        # plus bidders without a limit; the extra trailing entry covers floors above all limits.
+        floor_limits.sort()
+        self._floor_thresholds = [limit for limit, _ in floor_limits]
+        self._floor_masks = [unlimited_floor] * (len(floor_limits) + 1)
+        for i in range(len(floor_limits) - 1, -1, -1):
+            self._floor_masks[i] = self._floor_masks[i + 1] | floor_limits[i][1]
+
+    def _urls_for_mask(self, mask: int) -> tuple[str, ...]:
+        urls = self._mask_cache.get(mask)
+        if urls is None:
+            urls = tuple(url for position, url in enumerate(self._urls) if mask >> position & 1)
+            if len(self._mask_cache) >= _MASK_CACHE_LIMIT:
+                self._mask_cache.clear()
+            self._mask_cache[mask] = urls
+        return urls
+
+
+def build_index(advertiser_urls: Iterable[str], bidder_targeting: Iterable[BidderTargeting]) -> TargetingIndex:
+    """Build the index from config; advertisers without explicit rules receive all traffic."""
+    declared = {targeting.url: targeting for targeting in bidder_targeting}
+    bidders = [declared.pop(url, BidderTargeting(url=url)) for url in advertiser_urls]
+    bidders.extend(declared.values())
+    return TargetingIndex(bidders)
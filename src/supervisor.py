@@ -0,0 +1,264 @@
+"""
+Process supervisor for running the whole RTB stack locally.
+
+Every service runs as its own OS process (spawned, so nothing is shared with the
+orchestrator's interpreter or GIL); a service with `workers > 1` is a uvicorn master that
+forks that many worker processes. The supervisor polls every service's /health
+concurrently at startup, restarts children that exit unexpectedly (within a restart
+budget) and health-checks them again, and terminates the whole tree on shutdown. A
+service's post-start hook (e.g. telling the publisher to start its traffic) runs once it
+is healthy, after the first start and after every restart.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from functools import partial
+from multiprocessing.context import BaseContext
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Callable, Iterable
+
+import httpx
+
+from src.advertiser.config import discover_configs, get_config as get_advertiser_config
+from src.advertiser.faults import remove_shared_state
+from src.logging_config import get_logger
+from src.publisher.config import get_config as get_publisher_config
+from src.ssp.config import get_config as get_ssp_config
+
+logger = get_logger("Supervisor")
+
+
+@dataclass(frozen=True)
+class ServiceSpec:
+    """One service the supervisor runs in its own process."""
+    name: str
+    app: str  # uvicorn import string, e.g. "src.ssp.server:app"
+    host: str
+    port: int
+    workers: int = 1
+    log_level: str = "info"
+    env: dict[str, str] = field(default_factory=dict)  # extra environment for the child
+    access_log: bool = True
+    on_exit: Callable[[], None] | None = None  # runs in the service's process once uvicorn has exited
+
+    @property
+    def base_url(self) -> str:
+        host = "127.0.0.1" if self.host == "0.0.0.0" else self.host
+        return f"http://{host}:{self.port}"
+
+
+def build_services(env: str, workers: int | None = None) -> list[ServiceSpec]:
+    """
+    One ServiceSpec per advertiser config found for `env`, plus the SSP and the publisher.
+
+    The SSP is pointed at exactly the discovered advertisers. `workers` overrides every
+    service's configured worker count.
+    """
+    advertisers = []
+    for path in discover_configs(env):
+        config = get_advertiser_config(path)
+        advertisers.append(ServiceSpec(
+            name=f"Advertiser {config.advertiser_id}",
+            app="src.advertiser.server:app",
+            host=config.server.host,
+            port=config.server.port,
+            workers=workers or config.server.workers,
+            log_level=config.server.log_level,
+            env={"RTB_ENV": env, "RTB_CONFIG_PATH": str(path)},
+            # The service process is the workers' uvicorn master: drop the fault settings they shared.
+            on_exit=partial(remove_shared_state, config.advertiser_id),
+        ))
+
+    ssp_config = get_ssp_config(env)
+    ssp = ServiceSpec(
+        name="SSP",
+        app="src.ssp.server:app",
+        host=ssp_config.server.host,
+        port=ssp_config.server.port,
+        workers=workers or ssp_config.server.workers,
+        log_level=ssp_config.server.log_level,
+        env={"RTB_ENV": env, "RTB_ADVERTISER_URLS": ",".join(f"{adv.base_url}/bid" for adv in advertisers)},
+    )
+
+    pub_config = get_publisher_config(env)
+    publisher = ServiceSpec(
+        name="Publisher",
+        app="src.publisher.server:app",
+        host=pub_config.server.host,
+        port=pub_config.server.port,
+        workers=workers or pub_config.server.workers,
+        log_level=pub_config.server.log_level,
+        env={"RTB_ENV": env},
+    )
+    return advertisers + [ssp, publisher]
+
+
+def with_metrics_dirs(services: Iterable[ServiceSpec], root: str | Path) -> list[ServiceSpec]:
+    """
+    Give every multi-worker service without one its own RTB_METRICS_DIR under `root`, so its
+    /metrics sums all workers; separate directories keep advertisers' snapshots apart.
+    """
+    return [
+        replace(spec, env={**spec.env, "RTB_METRICS_DIR": str(Path(root) / spec.name.replace(" ", "_"))})
+        if spec.workers > 1 and "RTB_METRICS_DIR" not in spec.env else spec
+        for spec in services
+    ]
+
+
+def run_service(spec: ServiceSpec) -> None:
+    """
+    Child process entry point: apply the service's environment, then serve it with uvicorn.
+    RTB_WORKERS tells the app how many workers it really runs, whatever its config file says.
+    """
+    os.environ.update(spec.env, RTB_WORKERS=str(spec.workers))
+    import uvicorn
+
+    try:
+        uvicorn.run(
+            spec.app,
+            host=spec.host,
+            port=spec.port,
+            workers=spec.workers,
+            log_level=spec.log_level,
+            access_log=spec.access_log,
+        )
+    finally:
+        if spec.on_exit is not None:
+            spec.on_exit()
+
+
+class Supervisor:
+    """Starts, health-checks, restarts and stops a set of service processes."""
+
+    def __init__(
+        self,
+        services: Iterable[ServiceSpec],
+        max_restarts: int = 5,
+        restart_window_s: float = 60.0,
+        target: Callable[[ServiceSpec], None] = run_service,
+        context: BaseContext | None = None,
+        post_start: dict[str, Callable[[str], bool]] | None = None,
+    ):
+        self.services = list(services)
+        ports: dict[int, str] = {}
+        for spec in self.services:
+            if spec.port in ports:
+                raise ValueError(f"Port {spec.port} is used by both {ports[spec.port]} and {spec.name}")
+            ports[spec.port] = spec.name
+        self.max_restarts = max_restarts
+        self.restart_window_s = restart_window_s
+        self._target = target
+        self._context = context or multiprocessing.get_context("spawn")
+        self._post_start = post_start or {}  # service name -> hook(base_url), True on success
+        self._processes: dict[str, BaseProcess] = {}
+        self._restarts: dict[str, deque[float]] = {spec.name: deque() for spec in self.services}
+
+    def start(self) -> None:
+        """Launch every service process without waiting for any of them."""
+        for spec in self.services:
+            self._spawn(spec)
+        logger.info(f"🚀 Started {len(self.services)} services")
+
+    def _spawn(self, spec: ServiceSpec) -> None:
+        # Not daemonic: a uvicorn master with workers > 1 must be able to start its own children.
+        process = self._context.Process(target=self._target, args=(spec,), name=spec.name)
+        process.start()
+        self._processes[spec.name] = process
+        logger.info(f"▶️ {spec.name} started (pid={process.pid}, workers={spec.workers}, url={spec.base_url})")
+
+    def pid(self, name: str) -> int | None:
+        process = self._processes.get(name)
+        return process.pid if process is not None else None
+
+    def is_alive(self, name: str) -> bool:
+        process = self._processes.get(name)
+        return process is not None and process.is_alive()
+
+    async def wait_healthy(
+        self, timeout: float = 10.0, interval: float = 0.3, names: Iterable[str] | None = None
+    ) -> bool:
+        """
+        Poll the services' /health in parallel (all of them, or just `names`) and run each
+        one's post-start hook once it answers 200; True once every service is up and started.
+        """
+        specs = self.services if names is None else [spec for spec in self.services if spec.name in set(names)]
+        async with httpx.AsyncClient(timeout=1.0) as client:
+            results = await asyncio.gather(*(self._wait_for(client, spec, timeout, interval) for spec in specs))
+        return all(results)
+
+    async def _wait_for(self, client: httpx.AsyncClient, spec: ServiceSpec, timeout: float, interval: float) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            if not self.is_alive(spec.name):
+                logger.error(f"❌ {spec.name} exited during startup")
+                return False
+            try:
+                resp = await client.get(f"{spec.base_url}/health")
+                if resp.status_code == 200:
+                    logger.info(f"✅ {spec.name} ready: {resp.json()}")
+                    hook = self._post_start.get(spec.name)
+                    return hook is None or await asyncio.to_thread(hook, spec.base_url)
+            except httpx.RequestError:
+                pass
+            await asyncio.sleep(interval)
+
+        logger.error(f"❌ {spec.name} failed to start within {timeout}s")
+        return False
+
+    def check_children(self) -> list[str]:
+        """
+        Restart every service whose process has exited; returns the names restarted.
+
+        Raises RuntimeError when a service crashes more than `max_restarts` times within
+        `restart_window_s` — it is crash-looping and restarting it again will not help.
+        """
+        restarted = []
+        now = time.monotonic()
+        for spec in self.services:
+            process = self._processes.get(spec.name)
+            if process is None or process.is_alive():
+                continue
+            process.join()
+            history = self._restarts[spec.name]
+            while history and now - history[0] > self.restart_window_s:
+                history.popleft()
+            if len(history) >= self.max_restarts:
+                raise RuntimeError(
+                    f"{spec.name} crashed {len(history) + 1} times within {self.restart_window_s}s — giving up"
+                )
+            history.append(now)
+            logger.warning(f"💥 {spec.name} exited with code {process.exitcode} — restarting")
+            self._spawn(spec)
+            restarted.append(spec.name)
+        return restarted
+
+    def run_forever(self, interval: float = 1.0, health_timeout: float = 10.0) -> None:
+        """
+        Watch children until interrupted (KeyboardInterrupt/SystemExit) or a service crash-loops.
+        Restarted services are health-checked and their post-start hooks run again.
+        """
+        while True:
+            restarted = self.check_children()
+            if restarted and not asyncio.run(self.wait_healthy(health_timeout, names=restarted)):
+                logger.error(f"❌ Restarted services did not come back up: {', '.join(restarted)}")
+            time.sleep(interval)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """SIGTERM every child, wait up to `timeout` seconds in total, then SIGKILL stragglers."""
+        processes = [p for p in self._processes.values() if p.is_alive()]
+        for process in processes:
+            process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"⚠️ {process.name} did not stop in time — killing")
+                process.kill()
+                process.join()
+        self._processes.clear()
+        logger.info("🛑 All services stopped")
@@ -0,0 +1,193 @@
+"""
+Lightweight per-request tracing shared by the publisher, SSP and advertisers.
+
+A trace ID travels between hops in the `x-trace-id` header. A service traces a request when
+the header is present (the upstream hop already decided to sample it) or when its own
+sample rate says so. Finished spans go to an in-memory ring buffer, queryable through
+each service's /debug/traces endpoint, and optionally to a JSONL file.
+
+Unsampled requests pay for one context-variable lookup per span: `span()` hands back a
+shared no-op object when there is no active trace.
+"""
+import json
+import os
+import random
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+TRACE_HEADER = "x-trace-id"
+_TRACE_HEADER_BYTES = TRACE_HEADER.encode()
+
+
+@dataclass(slots=True)
+class TraceContext:
+    trace_id: str
+    started_at: float  # perf_counter() when the request entered this service
+
+
+_current_trace: ContextVar[TraceContext | None] = ContextVar("rtb_trace", default=None)
+
+
+def current_trace_id() -> str | None:
+    ctx = _current_trace.get()
+    return ctx.trace_id if ctx is not None else None
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def set(self, **_attrs) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("_tracer", "_trace_id", "_name", "_attrs", "_start")
+
+    def __init__(self, tracer: "Tracer", trace_id: str, name: str, attrs: dict):
+        self._tracer = tracer
+        self._trace_id = trace_id
+        self._name = name
+        self._attrs = attrs
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, _exc, _tb):
+        if exc_type is not None:
+            self._attrs["error"] = exc_type.__name__
+        self._tracer.record(self._trace_id, self._name, self._start, time.perf_counter(), **self._attrs)
+        return False
+
+    def set(self, **attrs) -> None:
+        """Attach attributes discovered while the span is running (e.g. the outcome)."""
+        self._attrs.update(attrs)
+
+
+class Tracer:
+    """Records spans for one service into a bounded ring buffer (and optionally a JSONL file)."""
+
+    def __init__(self, service: str, sample_rate: float = 0.0, capacity: int = 10_000, export_path: str | None = None):
+        self.service = service
+        self.sample_rate = sample_rate
+        self._spans: deque[dict] = deque(maxlen=capacity)
+        self._export = open(export_path, "a", buffering=1) if export_path else None
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0.0 and random.random() < self.sample_rate
+
+    def new_trace_id(self) -> str | None:
+        """Start a trace at this hop if sampled; returns None when the request is not traced."""
+        return uuid.uuid4().hex if self.should_sample() else None
+
+    def span(self, name: str, trace_id: str | None = None, **attrs):
+        """Context manager timing a span in the current (or given) trace."""
+        if trace_id is None:
+            trace_id = current_trace_id()
+            if trace_id is None:
+                return _NOOP_SPAN
+        return _Span(self, trace_id, name, attrs)
+
+    def record(self, trace_id: str, name: str, start: float, end: float, **attrs) -> None:
+        """Record a finished span from perf_counter() timestamps."""
+        span = {
+            "trace_id": trace_id,
+            "service": self.service,
+            "name": name,
+            "start_ms": round((time.time() - (time.perf_counter() - start)) * 1000.0, 3),
+            "duration_ms": round((end - start) * 1000.0, 3),
+            "attrs": attrs,
+        }
+        self._spans.append(span)
+        if self._export is not None:
+            self._export.write(json.dumps(span) + "\n")
+
+    def record_since_request_start(self, name: str, **attrs) -> None:
+        """Record a span from the moment the request entered this service until now."""
+        ctx = _current_trace.get()
+        if ctx is not None:
+            self.record(ctx.trace_id, name, ctx.started_at, time.perf_counter(), **attrs)
+
+    def query(self, trace_id: str | None = None, limit: int = 100) -> list[dict]:
+        """Most recent spans first, optionally restricted to one trace."""
+        spans = (s for s in reversed(self._spans) if trace_id is None or s["trace_id"] == trace_id)
+        result = []
+        for span in spans:
+            if len(result) >= limit:
+                break
+            result.append(span)
+        return result
+
+
+def create_tracer(service: str) -> Tracer:
+    """Tracer configured from RTB_TRACE_SAMPLE_RATE, RTB_TRACE_BUFFER and RTB_TRACE_DIR."""
+    trace_dir = os.getenv("RTB_TRACE_DIR")
+    export_path = os.path.join(trace_dir, f"{service}-{os.getpid()}.jsonl") if trace_dir else None
+    if export_path:
+        os.makedirs(trace_dir, exist_ok=True)
+    return Tracer(
+        service,
+        sample_rate=float(os.getenv("RTB_TRACE_SAMPLE_RATE", "0.01")),
+        capacity=int(os.getenv("RTB_TRACE_BUFFER", "10000")),
+        export_path=export_path,
+    )
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware that joins (or samples) a trace for each HTTP request, makes it the
+    current trace for the handler, echoes the trace ID header and records a root "request" span.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = None
+        for key, value in scope["headers"]:
+            if key == _TRACE_HEADER_BYTES:
+                trace_id = value.decode("latin-1")
+                break
+        if trace_id is None:
+            trace_id = self.tracer.new_trace_id()
+            if trace_id is None:
+                await self.app(scope, receive, send)
+                return
+
+        started_at = time.perf_counter()
+        token = _current_trace.set(TraceContext(trace_id, started_at))
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(_TRACE_HEADER_BYTES, trace_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            self.tracer.record(
+                trace_id, "request", started_at, time.perf_counter(), path=scope["path"], status=status
+            )
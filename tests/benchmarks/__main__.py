@@ -0,0 +1,69 @@
+"""
+Run the hot-path micro-benchmarks and compare them with the stored baseline.
+
+    python -m tests.benchmarks                      # run all, compare with baseline.json
+    python -m tests.benchmarks -k auction           # only benchmarks whose name contains "auction"
+    python -m tests.benchmarks --save-baseline      # record the current numbers as the new baseline
+    python -m tests.benchmarks --fail-on-regression 0.2   # exit 1 if any benchmark is >20% slower
+"""
+import argparse
+import logging
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from tests.benchmarks import bench_hot_path
+from tests.benchmarks.harness import BENCHMARKS, compare, format_results, load_baseline, run_benchmark, save_baseline
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Hot-path micro-benchmarks.")
+    parser.add_argument("-k", dest="pattern", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing repeat")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--fail-on-regression", type=float, default=None, metavar="FRACTION",
+                        help="exit with status 1 if ops/sec dropped by more than FRACTION vs baseline")
+    args = parser.parse_args(argv)
+
+    # Per-request log lines would dominate the numbers being measured.
+    logging.disable(logging.WARNING)
+    bench_hot_path.setup()
+
+    baseline = load_baseline(args.baseline)
+    results = []
+    for name, fn in BENCHMARKS.items():
+        if args.pattern in name:
+            results.append(run_benchmark(name, fn, min_time_s=args.min_time))
+            print(format_results(results[-1:], baseline).splitlines()[-1], flush=True)
+
+    print()
+    print(format_results(results, baseline))
+
+    if args.save_baseline:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+        save_baseline(args.baseline, results, {
+            "commit": commit or None,
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        })
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.fail_on_regression is not None:
+        regressions = [
+            r.name for r in results
+            if (change := compare(r, baseline.get(r.name))) is not None and change < -args.fail_on_regression
+        ]
+        if regressions:
+            print(f"\nRegressions beyond {args.fail_on_regression:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
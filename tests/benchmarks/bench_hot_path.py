@@ -0,0 +1,160 @@
+"""
+Micro-benchmarks for the per-request hot path.
+
+Everything runs in-process: HTTP benchmarks go through httpx's ASGITransport, and the SSP's
+outbound client is pointed at the advertiser app through the same transport (with the
+advertiser's artificial response delay set to zero), so no sockets are opened.
+"""
+import itertools
+import json
+import random
+import uuid
+from dataclasses import replace
+
+import httpx
+import numpy as np
+
+from src.advertiser import server as advertiser_server
+from src.advertiser.campaigns import Campaign, CampaignIndex, Creative
+from src.advertiser.models import BidResponse
+from src.publisher import server as publisher_server
+from src.ssp import server as ssp_server
+from src.ssp.auction import FirstPriceAuction, SecondPriceAuction
+from src.ssp.codec import decode_bid, encode_bid_request
+from src.ssp.models import Bid, BidRequestIn
+from tests.benchmarks.harness import bench
+
+BID_REQUEST = {
+    "id": "6f1c3f8e-2a4b-4c7d-9e0f-1a2b3c4d5e6f",
+    "domain": "Example.COM",
+    "category": "iab1",
+    "bid_floor": 1.25,
+}
+BID_REQUEST_JSON = json.dumps(BID_REQUEST).encode()
+INVALID_BID_REQUEST = {"id": "not-a-uuid", "domain": "nodot", "category": "", "bid_floor": -1}
+BID_RESPONSE_JSON = BidResponse(
+    request_id=BID_REQUEST["id"], advertiser_id="adv-001", bid_price=2.5, ad_id=str(uuid.uuid4())
+).model_dump_json().encode()
+
+_rng = random.Random(42)
+BIDS = [Bid(BID_REQUEST["id"], f"adv-{i:03d}", round(_rng.uniform(0.5, 5.0), 2), f"ad-{i}") for i in range(10)]
+BID_MATRIX = np.random.default_rng(42).uniform(0.5, 5.0, size=(1000, 10))
+FLOORS = np.full(1000, 1.0)
+
+_ssp_client: httpx.AsyncClient | None = None
+_advertiser_client: httpx.AsyncClient | None = None
+
+
+def setup() -> None:
+    """Wire the apps together in-process. Called by the runner before any benchmark runs."""
+    global _ssp_client, _advertiser_client
+    advertiser_app = advertiser_server.create_app(replace(advertiser_server.config, response_delay_ms=0))
+    ssp_server.http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=advertiser_app))
+    _ssp_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=ssp_server.app), base_url="http://ssp")
+    _advertiser_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=advertiser_app), base_url="http://advertiser")
+
+
+# ── Models and encoding ──
+
+@bench("bid_request.validate_dict")
+def validate_dict():
+    BidRequestIn(**BID_REQUEST)
+
+
+@bench("bid_request.validate_json")
+def validate_json():
+    BidRequestIn.model_validate_json(BID_REQUEST_JSON)
+
+
+_VALIDATED = BidRequestIn(**BID_REQUEST)
+
+
+@bench("bid_request.model_dump")
+def model_dump():
+    _VALIDATED.model_dump()
+
+
+@bench("bid_request.encode_json")
+def encode_json():
+    encode_bid_request(_VALIDATED)
+
+
+@bench("bid_response.construct")
+def bid_response_construct():
+    BidResponse(request_id=BID_REQUEST["id"], advertiser_id="adv-001", bid_price=2.5, ad_id="ad-1")
+
+
+@bench("bid_response.decode")
+def bid_response_decode():
+    decode_bid(BID_RESPONSE_JSON)
+
+
+# ── Auction clearing ──
+
+_first_price = FirstPriceAuction()
+_second_price = SecondPriceAuction(increment=0.01)
+
+
+@bench("auction.first_price_10_bids")
+def clear_first_price():
+    _first_price.clear(BIDS, 1.0)
+
+
+@bench("auction.second_price_10_bids")
+def clear_second_price():
+    _second_price.clear(BIDS, 1.0)
+
+
+@bench("auction.clear_batch_1000x10")
+def clear_batch():
+    _second_price.clear_batch(BID_MATRIX, FLOORS)
+
+
+# ── HTTP through ASGI ──
+
+@bench("ssp.validation_error_422")
+async def ssp_validation_error():
+    await _ssp_client.post("/bid/request", json=INVALID_BID_REQUEST)
+
+
+@bench("ssp.bid_request_full_auction")
+async def ssp_full_auction():
+    await _ssp_client.post("/bid/request", json={**BID_REQUEST, "id": str(uuid.uuid4())})
+
+
+@bench("advertiser.bid")
+async def advertiser_bid():
+    await _advertiser_client.post("/bid", content=BID_REQUEST_JSON, headers={"content-type": "application/json"})
+
+
+# ── Advertiser campaign matching ──
+
+_categories = [f"IAB{i}" for i in range(1, 27)]
+_domains = [f"site{i}.com" for i in range(500)]
+CAMPAIGN_INDEX_10K = CampaignIndex([
+    Campaign(
+        f"c{i}", round(_rng.uniform(0.5, 20.0), 2), (Creative(f"ad-{i}"),),
+        allowed_categories=tuple(_rng.sample(_categories, 3)),
+        blocked_domains=tuple(_rng.sample(_domains, 5)),
+    )
+    for i in range(10_000)
+])
+MATCH_REQUESTS = [(_rng.choice(_categories), _rng.choice(_domains), _rng.uniform(0.5, 10.0)) for _ in range(1000)]
+_match_requests = itertools.cycle(MATCH_REQUESTS)
+
+
+@bench("advertiser.campaign_match_10k")
+def campaign_match_10k():
+    CAMPAIGN_INDEX_10K.best(*next(_match_requests))
+
+
+# ── Publisher request generation ──
+
+@bench("publisher.generate_bid_request")
+def publisher_generate():
+    json.dumps(publisher_server.generate_bid_request().to_dict()).encode()
+
+
+@bench("publisher.request_ring_next")
+def publisher_ring_next():
+    publisher_server.request_ring.next()
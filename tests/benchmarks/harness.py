@@ -0,0 +1,134 @@
+"""
+Tiny micro-benchmark harness: ops/sec, per-op allocations and baseline comparison.
+
+Each benchmark is a zero-argument callable (sync or async) registered with `@bench`.
+The runner calibrates an iteration count that takes roughly `min_time_s`, repeats the
+timing a few times and keeps the best run (the least disturbed by the rest of the
+machine). Allocations (peak bytes per op, blocks retained per op) are measured in a
+separate tracemalloc pass so the tracing overhead does not leak into the timings.
+"""
+import asyncio
+import gc
+import inspect
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+BenchFn = Callable[[], object] | Callable[[], Awaitable[object]]
+
+BENCHMARKS: dict[str, BenchFn] = {}
+
+
+def bench(name: str):
+    """Register a benchmark under `name`."""
+
+    def register(fn: BenchFn) -> BenchFn:
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark already registered: {name}")
+        BENCHMARKS[name] = fn
+        return fn
+
+    return register
+
+
+@dataclass
+class BenchResult:
+    name: str
+    ops_per_sec: float
+    us_per_op: float
+    retained_blocks_per_op: float  # memory blocks still alive after the op (catches caches and leaks)
+    alloc_bytes_per_op: float  # peak traced memory during one op
+
+
+def _timer(fn: BenchFn, loop: asyncio.AbstractEventLoop) -> Callable[[int], float]:
+    """A function timing `n` back-to-back calls of `fn`, in seconds."""
+    if inspect.iscoroutinefunction(fn):
+        async def run_async(n: int) -> float:
+            start = time.perf_counter()
+            for _ in range(n):
+                await fn()
+            return time.perf_counter() - start
+
+        return lambda n: loop.run_until_complete(run_async(n))
+
+    def run_sync(n: int) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return time.perf_counter() - start
+
+    return run_sync
+
+
+def run_benchmark(name: str, fn: BenchFn, min_time_s: float = 0.2, repeats: int = 5) -> BenchResult:
+    loop = asyncio.new_event_loop()
+    try:
+        timed = _timer(fn, loop)
+        timed(10)  # warm caches, lazy imports and pydantic validators
+
+        iterations = 10
+        while (elapsed := timed(iterations)) < min_time_s:
+            iterations = max(iterations * 2, int(iterations * min_time_s / max(elapsed, 1e-9)))
+
+        gc.collect()
+        best = min(timed(iterations) for _ in range(repeats)) / iterations
+
+        alloc_iterations = max(1, min(iterations, 1000))
+        tracemalloc.start()
+        try:
+            timed(1)
+            tracemalloc.reset_peak()
+            baseline_bytes, _ = tracemalloc.get_traced_memory()
+            timed(1)
+            peak_bytes = tracemalloc.get_traced_memory()[1] - baseline_bytes
+
+            gc.collect()
+            before = tracemalloc.take_snapshot()
+            timed(alloc_iterations)
+            gc.collect()  # only count what is still reachable, not cyclic garbage awaiting collection
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        new_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    finally:
+        loop.close()
+
+    return BenchResult(
+        name=name,
+        ops_per_sec=round(1.0 / best, 1),
+        us_per_op=round(best * 1e6, 3),
+        retained_blocks_per_op=round(new_blocks / alloc_iterations, 2),
+        alloc_bytes_per_op=float(peak_bytes),
+    )
+
+
+def load_baseline(path: Path) -> dict[str, dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())["benchmarks"]
+
+
+def save_baseline(path: Path, results: list[BenchResult], meta: dict) -> None:
+    path.write_text(json.dumps({"meta": meta, "benchmarks": {r.name: asdict(r) for r in results}}, indent=2) + "\n")
+
+
+def compare(result: BenchResult, baseline: dict | None) -> float | None:
+    """Relative throughput change vs the baseline (+0.10 = 10% faster); None without a baseline."""
+    if not baseline or not baseline.get("ops_per_sec"):
+        return None
+    return result.ops_per_sec / baseline["ops_per_sec"] - 1.0
+
+
+def format_results(results: list[BenchResult], baseline: dict[str, dict]) -> str:
+    lines = [f"{'benchmark':<34} {'ops/sec':>12} {'us/op':>10} {'retained/op':>11} {'bytes/op':>10} {'vs baseline':>12}"]
+    for result in results:
+        change = compare(result, baseline.get(result.name))
+        lines.append(
+            f"{result.name:<34} {result.ops_per_sec:>12,.0f} {result.us_per_op:>10.2f} "
+            f"{result.retained_blocks_per_op:>11.1f} {result.alloc_bytes_per_op:>10,.0f} "
+            f"{'-' if change is None else f'{change:+.1%}':>12}"
+        )
+    return "\n".join(lines)
@@ -6,11 +6,15 @@ These tests verify the complete end-to-end flow:
 - SSP server receives and validates them
 - Proper responses are returned
 """
+import json
 import uuid
 
 from httpx import AsyncClient
 
 from src.publisher.config import PublisherConfig
+from src.ssp import server as ssp_server
+from src.ssp.admission import AdmissionController
+from src.ssp.config import AdmissionConfig
 from tests.integration.conftest import generate_bid_request
 
 
@@ -227,6 +231,21 @@ class TestSSPHealthEndpoint:
         assert "env" in data
         assert "seat_id" in data
 
+    async def test_health_includes_connection_counters(self, async_client: AsyncClient):
+        """Health endpoint exposes outbound connection pool reuse counters."""
+        response = await async_client.get("/health")
+
+        connections = response.json()["connections"]
+        assert {"requests", "connections_opened", "connections_reused"} <= connections.keys()
+
+    async def test_health_includes_circuit_breaker_state(self, async_client: AsyncClient):
+        """Health endpoint reports a circuit breaker per configured advertiser."""
+        response = await async_client.get("/health")
+
+        breakers = response.json()["circuit_breakers"]
+        assert breakers
+        assert all(b["state"] in ["closed", "open", "half_open"] for b in breakers.values())
+
 
 class TestRequestIdUniqueness:
     """Test that Publisher generates unique request IDs."""
@@ -330,3 +349,216 @@ class TestEdgeCases:
         response = await async_client.post("/bid/request", json=payload)
         
         assert response.status_code == 200
+
+
+class TestRequestDeduplication:
+    """Test that publisher retries of the same request ID are deduplicated."""
+
+    async def test_retry_returns_same_outcome(
+        self, async_client: AsyncClient, publisher_config: PublisherConfig
+    ):
+        """A retried request ID gets the first auction's outcome without a new auction."""
+        bid_request = generate_bid_request(publisher_config)
+        before = (await async_client.get("/health")).json()["dedup"]
+
+        first = await async_client.post("/bid/request", json=bid_request.to_dict())
+        retry = await async_client.post("/bid/request", json=bid_request.to_dict())
+
+        assert first.json() == retry.json()
+        after = (await async_client.get("/health")).json()["dedup"]
+        assert after["misses"] == before["misses"] + 1
+        assert after["hits"] == before["hits"] + 1
+
+
+class TestAdmissionControl:
+    """Test that the SSP sheds load once it runs out of auction slots."""
+
+    async def test_overloaded_ssp_returns_503(
+        self, async_client: AsyncClient, publisher_config: PublisherConfig, monkeypatch
+    ):
+        """With no free slot and no queue, a request is rejected with 503 and Retry-After."""
+        monkeypatch.setattr(
+            ssp_server, "admission",
+            AdmissionController(AdmissionConfig(max_concurrent_auctions=0, max_queue=0, retry_after_s=2)),
+        )
+        bid_request = generate_bid_request(publisher_config)
+
+        response = await async_client.post("/bid/request", json=bid_request.to_dict())
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "2"
+        assert response.json() == {"status": "rejected", "reason": "overloaded"}
+        assert (await async_client.get("/health")).json()["admission"]["rejected"] == 1
+
+    async def test_overloaded_batch_rejects_items_inline(
+        self, async_client: AsyncClient, publisher_config: PublisherConfig, monkeypatch
+    ):
+        """Batch items that cannot be admitted get an inline "rejected" result."""
+        monkeypatch.setattr(
+            ssp_server, "admission", AdmissionController(AdmissionConfig(max_concurrent_auctions=0, max_queue=0))
+        )
+        batch = [generate_bid_request(publisher_config).to_dict() for _ in range(2)]
+
+        response = await async_client.post("/bid/request/batch", json=batch)
+
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["reason"] for r in results] == ["overloaded", "overloaded"]
+        assert [r["id"] for r in results] == [item["id"] for item in batch]
+
+
+class TestBidderRegistration:
+    """Test registering advertiser targeting with the SSP."""
+
+    async def test_register_bidder_returns_registered(self, async_client: AsyncClient):
+        """Registering a bidder adds it to the SSP's targeting index."""
+        payload = {
+            "url": "http://127.0.0.1:9/bid",
+            "allowed_categories": ["IAB99"],
+            "max_floor": 0.01,
+        }
+
+        response = await async_client.post("/bidders/register", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "registered"
+        assert data["url"] == payload["url"]
+
+    async def test_register_bidder_rejects_negative_max_floor(self, async_client: AsyncClient):
+        """A negative max_floor is a validation error."""
+        payload = {"url": "http://127.0.0.1:9/bid", "max_floor": -1.0}
+
+        response = await async_client.post("/bidders/register", json=payload)
+
+        assert response.status_code == 422
+
+
+class TestBatchEndpoint:
+    """Test the SSP batch bid request endpoint."""
+
+    async def test_batch_results_returned_in_order(
+        self, async_client: AsyncClient, publisher_config: PublisherConfig
+    ):
+        """Each item gets one NDJSON result line, in input order."""
+        requests = [generate_bid_request(publisher_config).to_dict() for _ in range(3)]
+
+        response = await async_client.post("/bid/request/batch", json=requests)
+
+        assert response.status_code == 200
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["index"] for r in results] == [0, 1, 2]
+        assert [r["id"] for r in results] == [r["id"] for r in requests]
+        assert all(r["status"] in ["no_bid", "bid_won"] for r in results)
+
+    async def test_invalid_item_does_not_fail_batch(
+        self, async_client: AsyncClient, publisher_config: PublisherConfig
+    ):
+        """Validation errors are reported inline for the offending item only."""
+        good = generate_bid_request(publisher_config).to_dict()
+        bad = {**good, "id": "not-a-uuid"}
+
+        response = await async_client.post("/bid/request/batch", json=[bad, good])
+
+        assert response.status_code == 200
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert results[0]["status"] == "rejected"
+        assert results[0]["errors"][0]["field"] == "id"
+        assert results[1]["status"] in ["no_bid", "bid_won"]
+
+    async def test_failed_auction_is_reported_inline(
+        self, async_client: AsyncClient, publisher_config: PublisherConfig, monkeypatch
+    ):
+        """An auction that raises fails its own item; the other items are still streamed."""
+        real_auction = ssp_server.run_admitted_auction
+        failing = generate_bid_request(publisher_config).to_dict()
+
+        async def flaky_auction(bid_request, *args):
+            if bid_request.id == failing["id"]:
+                raise RuntimeError("bidder fan-out bug")
+            return await real_auction(bid_request, *args)
+
+        monkeypatch.setattr(ssp_server, "run_admitted_auction", flaky_auction)
+        batch = [generate_bid_request(publisher_config).to_dict() for _ in range(3)]
+        batch[1] = failing
+
+        response = await async_client.post("/bid/request/batch", json=batch)
+
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["index"] for r in results] == [0, 1, 2]
+        assert results[1] == {"index": 1, "status": "error", "reason": "internal_error", "id": failing["id"]}
+        assert results[2]["status"] in ["no_bid", "bid_won"]
+
+    async def test_ndjson_body_accepted(
+        self, async_client: AsyncClient, publisher_config: PublisherConfig
+    ):
+        """An NDJSON stream of bid requests is accepted."""
+        lines = [json.dumps(generate_bid_request(publisher_config).to_dict()) for _ in range(2)]
+
+        response = await async_client.post(
+            "/bid/request/batch",
+            content="\n".join(lines),
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert len(response.text.splitlines()) == 2
+
+    async def test_non_array_body_rejected(self, async_client: AsyncClient):
+        """A JSON body that is not an array is rejected as a whole."""
+        response = await async_client.post("/bid/request/batch", json={"id": "x"})
+
+        assert response.status_code == 422
+        assert response.json()["reason"] == "invalid_batch"
+
+
+class TestSSPMetricsEndpoint:
+    """Test the SSP Prometheus metrics endpoint."""
+
+    async def test_metrics_exposes_auction_and_bidder_series(
+        self, async_client: AsyncClient, publisher_config: PublisherConfig
+    ):
+        """After an auction, /metrics reports auctions, fill rate and request latency."""
+        bid_request = generate_bid_request(publisher_config)
+        await async_client.post("/bid/request", json=bid_request.to_dict())
+
+        response = await async_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert "ssp_auctions_total{" in text
+        assert "# TYPE ssp_fill_rate gauge" in text
+        assert "# TYPE ssp_bidder_response_time_ms histogram" in text
+        assert 'http_requests_total{path="/bid/request",status="200"}' in text
+
+    async def test_admission_gauges_follow_the_controller_without_a_scrape(self, monkeypatch):
+        """Every worker's flush carries its current admission state, not the value from its last scrape."""
+        controller = AdmissionController(AdmissionConfig())
+        controller.active, controller.queued = 3, 7
+        monkeypatch.setattr(ssp_server, "admission", controller)
+
+        snapshot = ssp_server.metrics.registry.snapshot()
+
+        assert snapshot["ssp_admission_active"] == [[[], 3.0]]
+        assert snapshot["ssp_admission_queue_depth"] == [[[], 7.0]]
+
+
+class TestSSPTracing:
+    """Test trace propagation into the SSP."""
+
+    async def test_traced_request_records_auction_spans(
+        self, async_client: AsyncClient, publisher_config: PublisherConfig
+    ):
+        """A request carrying a trace ID gets parse, fan-out and clearing spans."""
+        trace_id = uuid.uuid4().hex
+        bid_request = generate_bid_request(publisher_config)
+
+        response = await async_client.post(
+            "/bid/request", json=bid_request.to_dict(), headers={"x-trace-id": trace_id}
+        )
+        assert response.headers["x-trace-id"] == trace_id
+
+        traces = await async_client.get("/debug/traces", params={"trace_id": trace_id})
+
+        names = {span["name"] for span in traces.json()["spans"]}
+        assert {"request", "parse", "fanout", "clearing"} <= names
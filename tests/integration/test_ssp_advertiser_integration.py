@@ -6,13 +6,37 @@ These tests verify the complete end-to-end flow:
 - Advertiser processes and returns bid responses
 - Proper validation and responses are returned
 """
+import json
+import time
 import uuid
 
-from httpx import AsyncClient
+import httpx
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
 
+from src.advertiser.campaigns import Campaign, Creative
+from src.advertiser.config import AdvertiserConfig, FaultConfig
+from src.advertiser.server import create_app
+from src.inprocess import ASGIRouter
 from tests.integration.conftest import generate_bid_request_payload
 
 
+@pytest_asyncio.fixture
+async def campaign_client():
+    """Async HTTP client for an advertiser app with two campaigns and no response delay."""
+    config = AdvertiserConfig(
+        advertiser_id="adv-campaigns",
+        response_delay_ms=0,
+        campaigns=(
+            Campaign("sports", 6.0, (Creative("ad-sports"),), allowed_categories=("IAB17",)),
+            Campaign("run-of-network", 2.0, (Creative("ad-ron"),), blocked_domains=("blocked.com",)),
+        ),
+    )
+    async with AsyncClient(transport=ASGITransport(app=create_app(config)), base_url="http://test") as client:
+        yield client
+
+
 class TestAdvertiserBidFlow:
     """Test the complete flow from SSP sending requests to Advertiser responding."""
 
@@ -276,3 +300,219 @@ class TestAdvertiserResponseFormat:
         assert response.status_code == 200
         bid_price = response.json()["bid_price"]
         assert isinstance(bid_price, (int, float))
+
+
+class TestAdvertiserMetricsEndpoint:
+    """Test the Advertiser Prometheus metrics endpoint."""
+
+    async def test_metrics_counts_bids(self, advertiser_client: AsyncClient):
+        """/metrics reports bid counts and request latency."""
+        await advertiser_client.post("/bid", json=generate_bid_request_payload())
+
+        response = await advertiser_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert "advertiser_bids_total" in response.text
+        assert 'http_request_duration_ms_count{path="/bid"}' in response.text
+
+
+class TestAdvertiserTracing:
+    """Test trace propagation into the Advertiser."""
+
+    async def test_traced_request_records_advertiser_spans(self, advertiser_client: AsyncClient):
+        """A request carrying a trace ID gets parse, delay and bid_logic spans."""
+        trace_id = uuid.uuid4().hex
+
+        await advertiser_client.post(
+            "/bid", json=generate_bid_request_payload(), headers={"x-trace-id": trace_id}
+        )
+        traces = await advertiser_client.get("/debug/traces", params={"trace_id": trace_id})
+
+        names = {span["name"] for span in traces.json()["spans"]}
+        assert {"request", "parse", "delay", "bid_logic"} <= names
+
+
+class TestAdvertiserCampaigns:
+    """Test campaign-driven bidding."""
+
+    async def test_best_matching_campaign_bids(self, campaign_client: AsyncClient):
+        """The highest-paying eligible campaign bids its max CPM with its creative."""
+        response = await campaign_client.post("/bid", json=generate_bid_request_payload(category="IAB17"))
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["campaign_id"] == "sports"
+        assert data["bid_price"] == 6.0
+        assert data["ad_id"] == "ad-sports"
+
+    async def test_falls_back_to_other_eligible_campaign(self, campaign_client: AsyncClient):
+        """A request outside a campaign's targeting goes to the next eligible campaign."""
+        response = await campaign_client.post("/bid", json=generate_bid_request_payload(category="IAB1"))
+
+        assert response.json()["campaign_id"] == "run-of-network"
+
+    async def test_no_matching_campaign_returns_204(self, campaign_client: AsyncClient):
+        """No eligible campaign means no bid: 204 No Content."""
+        response = await campaign_client.post(
+            "/bid", json=generate_bid_request_payload(domain="blocked.com", category="IAB1")
+        )
+
+        assert response.status_code == 204
+        assert response.content == b""
+
+    async def test_floor_above_every_max_cpm_returns_204(self, campaign_client: AsyncClient):
+        """Campaigns never bid on floors above their max CPM."""
+        response = await campaign_client.post("/bid", json=generate_bid_request_payload(bid_floor=10.0))
+
+        assert response.status_code == 204
+
+    async def test_health_reports_campaign_count(self, campaign_client: AsyncClient):
+        """Health reports how many campaigns are loaded."""
+        response = await campaign_client.get("/health")
+
+        assert response.json()["campaigns"] == 2
+
+    async def test_budget_caps_campaign_across_app_instances(self, tmp_path, monkeypatch):
+        """Two workers of one advertiser share spend: the budget runs out after its bids in total."""
+        monkeypatch.setenv("RTB_SPEND_DIR", str(tmp_path))
+        config = AdvertiserConfig(
+            advertiser_id="adv-budget",
+            response_delay_ms=0,
+            campaigns=(Campaign("capped", 5.0, (Creative("ad-capped"),), daily_budget=0.01),),
+        )
+        statuses = []
+        for _ in range(2):
+            async with AsyncClient(transport=ASGITransport(app=create_app(config)), base_url="http://test") as client:
+                for _ in range(2):
+                    statuses.append((await client.post("/bid", json=generate_bid_request_payload())).status_code)
+                budget = (await client.get("/debug/budget")).json()
+
+        assert statuses == [200, 200, 204, 204]
+        assert budget["campaigns"] == [
+            {"campaign_id": "capped", "daily_budget": 0.01, "spent": 0.01, "bid_probability": 1.0}
+        ]
+
+
+class TestAdvertiserBatch:
+    """Test the advertiser's batch /bid endpoint."""
+
+    async def test_results_in_input_order(self, campaign_client: AsyncClient):
+        """Each item gets a bid or no-bid result at its own position."""
+        batch = [
+            generate_bid_request_payload(category="IAB17"),
+            generate_bid_request_payload(domain="blocked.com"),
+            generate_bid_request_payload(category="IAB1"),
+        ]
+
+        response = await campaign_client.post("/bid/batch", json=batch)
+
+        assert response.status_code == 200
+        results = response.json()
+        assert [r["request_id"] for r in results] == [item["id"] for item in batch]
+        assert [r["status"] for r in results] == ["bid", "no_bid", "bid"]
+        assert [r.get("campaign_id") for r in results] == ["sports", None, "run-of-network"]
+        assert results[0]["bid_price"] == 6.0
+        assert results[0]["advertiser_id"] == "adv-campaigns"
+
+    async def test_invalid_item_rejected_inline(self, campaign_client: AsyncClient):
+        """An invalid item does not fail the rest of the batch."""
+        batch = [generate_bid_request_payload(request_id="not-a-uuid"), generate_bid_request_payload()]
+
+        results = (await campaign_client.post("/bid/batch", json=batch)).json()
+
+        assert results[0]["status"] == "rejected"
+        assert results[0]["errors"][0]["field"] == "id"
+        assert results[1]["status"] == "bid"
+
+    async def test_accepts_ndjson(self, campaign_client: AsyncClient):
+        """NDJSON bodies are split one request per line."""
+        batch = [generate_bid_request_payload() for _ in range(3)]
+
+        response = await campaign_client.post(
+            "/bid/batch",
+            content="\n".join(json.dumps(item) for item in batch),
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+        assert [r["status"] for r in response.json()] == ["bid"] * 3
+
+    async def test_non_array_body_returns_422(self, campaign_client: AsyncClient):
+        """A body that is not a batch at all is rejected as a whole."""
+        response = await campaign_client.post("/bid/batch", json=generate_bid_request_payload())
+
+        assert response.status_code == 422
+        assert response.json()["reason"] == "invalid_batch"
+
+    async def test_one_delay_per_batch(self):
+        """The simulated response delay is paid once for the batch, not once per item."""
+        config = AdvertiserConfig(advertiser_id="adv-batch", response_delay_ms=50)
+        batch = [generate_bid_request_payload() for _ in range(20)]
+
+        async with AsyncClient(transport=ASGITransport(app=create_app(config)), base_url="http://test") as client:
+            start = time.perf_counter()
+            response = await client.post("/bid/batch", json=batch)
+            elapsed = time.perf_counter() - start
+
+        assert [r["status"] for r in response.json()] == ["bid"] * 20
+        assert 0.05 <= elapsed < 0.5
+
+
+def _faulty_app(**faults):
+    return create_app(AdvertiserConfig(advertiser_id="adv-faults", response_delay_ms=0, faults=FaultConfig(**faults)))
+
+
+class TestAdvertiserFaults:
+    """Test the advertiser's latency model, injected faults and /admin/faults."""
+
+    async def test_admin_endpoint_changes_faults_at_runtime(self):
+        """PATCH /admin/faults takes effect on the next bid request."""
+        async with AsyncClient(transport=ASGITransport(app=_faulty_app()), base_url="http://test") as client:
+            assert (await client.post("/bid", json=generate_bid_request_payload())).status_code == 200
+
+            response = await client.patch("/admin/faults", json={"error_rate": 1.0, "error_status": 502})
+            assert response.status_code == 200
+            assert response.json()["error_rate"] == 1.0
+
+            assert (await client.post("/bid", json=generate_bid_request_payload())).status_code == 502
+            assert (await client.post("/bid/batch", json=[generate_bid_request_payload()])).status_code == 502
+            assert (await client.get("/admin/faults")).json()["error_status"] == 502
+
+    @pytest.mark.parametrize("settings", [
+        {"error_rate": 0.7, "drop_rate": 0.7},
+        {"latency": "gamma:3"},
+        {"error_rate": None},
+    ])
+    async def test_admin_endpoint_rejects_invalid_settings(self, settings):
+        """Settings that FaultConfig rejects leave the current ones in place."""
+        async with AsyncClient(transport=ASGITransport(app=_faulty_app()), base_url="http://test") as client:
+            response = await client.patch("/admin/faults", json=settings)
+            assert response.status_code == 422
+            assert response.json()["reason"] == "invalid_faults"
+            assert (await client.get("/admin/faults")).json()["error_rate"] == 0.0
+
+    async def test_malformed_json(self):
+        """A malformed response is a 200 whose body is not valid JSON."""
+        app = _faulty_app(malformed_rate=1.0)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/bid", json=generate_bid_request_payload())
+
+        assert response.status_code == 200
+        with pytest.raises(ValueError):
+            response.json()
+
+    async def test_dropped_connection(self):
+        """A dropped connection reaches the SSP's client as a protocol error."""
+        router = ASGIRouter({"adv:1": _faulty_app(drop_rate=1.0)})
+        async with AsyncClient(transport=router) as client:
+            with pytest.raises(httpx.RemoteProtocolError):
+                await client.post("http://adv:1/bid", json=generate_bid_request_payload())
+
+    async def test_stall_outlasts_client_timeout(self):
+        """A stalled response is held for stall_ms, however short the latency model."""
+        app = _faulty_app(stall_rate=1.0, stall_ms=300)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            start = time.perf_counter()
+            response = await client.post("/bid", json=generate_bid_request_payload())
+
+        assert response.status_code == 200
+        assert time.perf_counter() - start >= 0.3
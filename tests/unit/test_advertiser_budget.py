@@ -0,0 +1,214 @@
+"""Unit tests for src.advertiser.budget"""
+import multiprocessing
+import random
+import time
+
+import numpy as np
+import pytest
+
+from src.advertiser.bidding import Bidder
+from src.advertiser.budget import SECONDS_PER_DAY, BudgetPacer, SpendLedger, spend_segment_name, utc_day
+from src.advertiser.campaigns import Campaign, Creative
+from src.advertiser.config import AdvertiserConfig
+
+DAY = 20_000
+MIDNIGHT = DAY * SECONDS_PER_DAY
+
+
+class FakeClock:
+
+    def __init__(self, now: float = MIDNIGHT):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _campaign(campaign_id: str, max_cpm: float, **fields) -> Campaign:
+    return Campaign(campaign_id, max_cpm, (Creative(f"ad-{campaign_id}"),), **fields)
+
+
+def _spend_in_child(path, n_campaigns, records):
+    ledger = SpendLedger(n_campaigns, path)
+    for _ in range(records):
+        ledger.record(1, 0.001, DAY)
+
+
+def _bid_in_child(spend_dir, bids):
+    bidder = Bidder(AdvertiserConfig(), [_campaign("budgeted", 5.0, daily_budget=1.0)], spend_dir=spend_dir)
+    for _ in range(bids):
+        bidder.bid("IAB1", "x.com", 1.0)
+
+
+class TestSpendLedger:
+
+    def test_sums_rows_for_the_day(self):
+        ledger = SpendLedger(3)
+        ledger.record(0, 0.5, DAY)
+        ledger.record(2, 0.25, DAY)
+        ledger.record(0, 0.5, DAY)
+        assert ledger.spent(DAY).tolist() == [1.0, 0.0, 0.25]
+
+    def test_new_day_starts_from_zero(self):
+        ledger = SpendLedger(2)
+        ledger.record(0, 1.0, DAY)
+        ledger.record(1, 0.5, DAY + 1)
+        assert ledger.spent(DAY + 1).tolist() == [0.0, 0.5]
+        assert ledger.spent(DAY).tolist() == [0.0, 0.0]
+
+    def test_workers_share_one_segment(self, tmp_path):
+        path = tmp_path / "spend.bin"
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=_spend_in_child, args=(path, 2, 2000)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert [worker.exitcode for worker in workers] == [0, 0, 0, 0]
+        # No update is lost: every worker writes only its own row.
+        assert SpendLedger(2, path).spent(DAY).tolist() == pytest.approx([0.0, 8.0])
+
+    def test_dead_worker_slot_is_reclaimed_with_its_spend(self, tmp_path):
+        path = tmp_path / "spend.bin"
+        worker = multiprocessing.get_context("fork").Process(target=_spend_in_child, args=(path, 2, 500))
+        worker.start()
+        worker.join()
+        ledger = SpendLedger(2, path)
+        assert ledger.slot == 0
+        assert ledger.spent(DAY)[1] == pytest.approx(0.5)
+
+    def test_reservations_never_exceed_budget(self):
+        ledger = SpendLedger(1)
+        assert ledger.reserve(0, 0.6, 1.0, DAY) == pytest.approx(0.4)
+        assert ledger.reserve(0, 0.6, 1.0, DAY) == 0.0
+        assert ledger.reserved(DAY)[0] == pytest.approx(1.0)
+        assert ledger.allowance(DAY)[0] == pytest.approx(1.0)
+        assert ledger.allowance(DAY + 1)[0] == 0.0
+
+    def test_rejects_segment_with_another_layout(self, tmp_path):
+        path = tmp_path / "spend.bin"
+        SpendLedger(2, path)
+        with pytest.raises(ValueError, match="spend.bin"):
+            SpendLedger(3, path)
+
+    def test_all_slots_taken(self, tmp_path):
+        path = tmp_path / "spend.bin"
+        SpendLedger(1, path, slots=1)
+        ledger = SpendLedger(1, path, slots=1)
+        ledger._pids[0] = 1  # init: always alive, never this process
+        with pytest.raises(RuntimeError, match="slots"):
+            ledger._claim_slot()
+
+    def test_segment_name_depends_on_campaigns(self):
+        assert spend_segment_name("adv-1", ["a", "b"]) != spend_segment_name("adv-1", ["a", "c"])
+        assert spend_segment_name("adv-1", ["a"]).startswith("rtb-spend-adv-1-")
+
+
+class TestBudgetPacer:
+
+    def test_throttles_toward_even_spend(self):
+        clock = FakeClock(MIDNIGHT + SECONDS_PER_DAY / 2)
+        # 43.2 USD left for half a day = 0.001 USD/s, but the campaign would spend 0.01 USD/s.
+        pacer = BudgetPacer(np.array([86.4, np.inf]), SpendLedger(2), clock)
+        assert pacer.charge(0, 43_200.0)
+        pacer.refresh(clock.now)
+        assert pacer.bid_probability.tolist() == [1.0, 1.0]
+        assert pacer.remaining_budget[0] == pytest.approx(43.2)
+
+        for _ in range(10):
+            clock.now += 1.0
+            assert pacer.charge(0, 10.0 * pacer.bid_probability[0])  # spend follows the bid probability
+            pacer.refresh(clock.now)
+        assert pacer.bid_probability[0] == pytest.approx(0.1, rel=0.05)
+        assert pacer.bid_probability[1] == 1.0
+
+    def test_recovers_when_spend_stops(self):
+        clock = FakeClock()
+        pacer = BudgetPacer(np.array([1.0]), SpendLedger(1), clock)
+        pacer.refresh(clock.now)
+        pacer.bid_probability[0] = 0.01
+        for _ in range(7):
+            clock.now += 1.0
+            pacer.refresh(clock.now)
+        assert pacer.bid_probability[0] == 1.0
+
+    def test_refreshes_only_every_interval(self):
+        clock = FakeClock()
+        pacer = BudgetPacer(np.array([1.0]), SpendLedger(1), clock, interval_s=5.0)
+        pacer.maybe_refresh()
+        pacer.ledger.record(0, 0.4, DAY)
+        clock.now += 1.0
+        pacer.maybe_refresh()
+        assert pacer.remaining_budget[0] == 1.0
+        clock.now += 4.0
+        pacer.maybe_refresh()
+        assert pacer.remaining_budget[0] == pytest.approx(0.6)
+
+    def test_new_day_restores_budget(self):
+        clock = FakeClock()
+        pacer = BudgetPacer(np.array([1.0]), SpendLedger(1), clock)
+        assert pacer.charge(0, 1000.0)
+        assert not pacer.charge(0, 1.0)
+        pacer.refresh(clock.now)
+        assert pacer.remaining_budget[0] == pytest.approx(0.0)
+        clock.now += SECONDS_PER_DAY
+        pacer.refresh(clock.now)
+        assert pacer.remaining_budget[0] == 1.0
+        assert pacer.bid_probability[0] == 1.0
+
+
+class TestBidderBudgets:
+
+    def test_exhausted_campaign_hands_over_to_the_next(self):
+        campaigns = [_campaign("budgeted", 5.0, daily_budget=0.01), _campaign("open", 2.0)]
+        bidder = Bidder(AdvertiserConfig(), campaigns, rng=random.Random(1), clock=FakeClock())
+        winners = [bidder.bid("IAB1", "x.com", 1.0).campaign_id for _ in range(4)]
+        assert winners == ["budgeted", "budgeted", "open", "open"]
+
+    def test_unbudgeted_campaigns_are_not_paced(self):
+        bidder = Bidder(AdvertiserConfig(), [_campaign("open", 2.0)])
+        assert bidder.pacer is None
+
+    def test_workers_together_stay_within_budget(self, tmp_path):
+        # 4 workers x 100 bids at 5.0 CPM would spend 2.0 USD; the budget allows 200 bids.
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=_bid_in_child, args=(tmp_path, 100)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert [worker.exitcode for worker in workers] == [0, 0, 0, 0]
+
+        (path,) = tmp_path.glob("rtb-spend-*.bin")
+        spent = SpendLedger(1, path).spent(utc_day(time.time()))[0]
+        assert 0.95 <= spent <= 1.0 + 1e-9
+
+    def test_shares_spend_through_spend_dir(self, tmp_path):
+        campaigns = [_campaign("budgeted", 5.0, daily_budget=1.0)]
+        clock = FakeClock()
+        first = Bidder(AdvertiserConfig(), campaigns, spend_dir=tmp_path, clock=clock)
+        first.bid("IAB1", "x.com", 1.0)
+        second = Bidder(AdvertiserConfig(), campaigns, spend_dir=tmp_path, clock=clock)
+        second.pacer.maybe_refresh()
+        assert second.pacer.status(["budgeted"]) == [
+            {"campaign_id": "budgeted", "daily_budget": 1.0, "spent": 0.005, "bid_probability": 1.0}
+        ]
+
+    def test_paces_spend_over_the_day(self):
+        clock = FakeClock()
+        # 86.4 USD/day = 0.001 USD/s; unthrottled at 20 rps and 1.0 CPM it would spend 0.02 USD/s.
+        campaigns = [_campaign("paced", 1.0, daily_budget=86.4)]
+        bidder = Bidder(AdvertiserConfig(), campaigns, rng=random.Random(4), clock=clock)
+        for _ in range(600 * 20):
+            clock.now += 0.05
+            bidder.bid("IAB1", "x.com", 0.5)
+        spent = 86.4 - bidder.pacer.remaining_budget[0]
+        assert spent == pytest.approx(0.6, rel=0.25)
+
+    def test_batch_larger_than_budget_stays_within_it(self):
+        campaigns = [_campaign("budgeted", 5.0, daily_budget=0.01), _campaign("open", 2.0)]
+        bidder = Bidder(AdvertiserConfig(), campaigns, rng=random.Random(1), clock=FakeClock())
+        decisions = bidder.bid_batch([("IAB1", "x.com", 1.0)] * 100)
+        assert [d.campaign_id for d in decisions].count("budgeted") == 2
+        assert [d.campaign_id for d in decisions[2:]] == ["open"] * 98
+        assert bidder.pacer.ledger.spent(DAY)[0] == pytest.approx(0.01)
@@ -0,0 +1,156 @@
+"""Unit tests for src.advertiser.campaigns and src.advertiser.bidding"""
+import json
+import random
+
+import pytest
+
+from src.advertiser.bidding import Bidder, create_bidder
+from src.advertiser.campaigns import Campaign, CampaignIndex, Creative, campaign_from_dict, load_campaigns
+from src.advertiser.config import AdvertiserConfig, get_config
+
+
+def _campaign(campaign_id: str, max_cpm: float, **targeting) -> Campaign:
+    return Campaign(campaign_id, max_cpm, (Creative(f"ad-{campaign_id}"),), **targeting)
+
+
+class _NoScan(tuple):
+    """Campaign list that fails the test if a request iterates over it."""
+
+    def __iter__(self):
+        raise AssertionError("campaign list scanned per request")
+
+
+class TestCampaign:
+
+    def test_requires_a_creative(self):
+        with pytest.raises(ValueError, match="creative"):
+            Campaign("c1", 2.0, ())
+
+    def test_requires_positive_max_cpm(self):
+        with pytest.raises(ValueError, match="max_cpm"):
+            _campaign("c1", 0.0)
+
+    def test_from_dict_accepts_ids_or_tables_for_creatives(self):
+        campaign = campaign_from_dict({
+            "campaign_id": "c1", "max_cpm": 3, "creatives": ["a", {"ad_id": "b"}], "allowed_categories": ["IAB1"],
+        })
+        assert campaign.creatives == (Creative("a"), Creative("b"))
+        assert campaign.allowed_categories == ("IAB1",)
+
+    def test_from_dict_reports_missing_field(self):
+        with pytest.raises(ValueError, match="max_cpm"):
+            campaign_from_dict({"campaign_id": "c1", "creatives": ["a"]})
+
+
+class TestLoadCampaigns:
+
+    def test_toml(self, tmp_path):
+        path = tmp_path / "campaigns.toml"
+        path.write_text('[[campaigns]]\ncampaign_id = "c1"\nmax_cpm = 2.5\ncreatives = ["ad-1"]\n')
+        assert load_campaigns(path) == [Campaign("c1", 2.5, (Creative("ad-1"),))]
+
+    def test_jsonl(self, tmp_path):
+        path = tmp_path / "campaigns.jsonl"
+        rows = [{"campaign_id": f"c{i}", "max_cpm": i + 1, "creatives": [f"ad-{i}"]} for i in range(3)]
+        path.write_text("\n".join(json.dumps(row) for row in rows) + "\n")
+        assert [c.campaign_id for c in load_campaigns(path)] == ["c0", "c1", "c2"]
+
+    def test_rejects_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown campaign file format"):
+            load_campaigns(tmp_path / "campaigns.csv")
+
+    def test_inline_campaigns_in_advertiser_config(self, tmp_path):
+        path = tmp_path / "adv.toml"
+        path.write_text(
+            '[advertiser]\nadvertiser_id = "adv-x"\n\n'
+            '[[campaigns]]\ncampaign_id = "c1"\nmax_cpm = 4.0\ncreatives = ["ad-1"]\n'
+        )
+        assert get_config(path).campaigns == (Campaign("c1", 4.0, (Creative("ad-1"),)),)
+
+
+class TestCampaignIndex:
+
+    def test_best_is_highest_max_cpm_among_eligible(self):
+        index = CampaignIndex([
+            _campaign("cheap", 1.0),
+            _campaign("sports", 9.0, allowed_categories=("IAB17",)),
+            _campaign("mid", 4.0),
+        ])
+        assert index.best("IAB1", "news.com", 0.5).campaign_id == "mid"
+        assert index.best("iab17", "news.com", 0.5).campaign_id == "sports"
+
+    def test_floor_excludes_campaigns_that_cannot_afford_it(self):
+        index = CampaignIndex([_campaign("a", 1.0), _campaign("b", 2.0)])
+        assert index.best("IAB1", "x.com", 2.0).campaign_id == "b"
+        assert index.best("IAB1", "x.com", 2.01) is None
+
+    def test_blocks_win_over_allows(self):
+        index = CampaignIndex([
+            _campaign("c1", 5.0, allowed_domains=("news.com",), blocked_categories=("IAB25",)),
+            _campaign("c2", 1.0, blocked_domains=("News.com",)),
+        ])
+        assert index.best("IAB1", "NEWS.com", 0.1).campaign_id == "c1"
+        assert index.best("IAB25", "news.com", 0.1) is None
+        assert index.best("IAB1", "other.com", 0.1).campaign_id == "c2"
+
+    def test_match_returns_every_eligible_position(self):
+        index = CampaignIndex([_campaign("a", 3.0), _campaign("b", 2.0, allowed_categories=("IAB2",)), _campaign("c", 1.0)])
+        mask = index.match("IAB1", "x.com", 0.5)
+        assert [index.campaigns[p].campaign_id for p in range(len(index)) if mask >> p & 1] == ["a", "c"]
+
+    def test_rejects_duplicate_ids(self):
+        with pytest.raises(ValueError, match="Duplicate"):
+            CampaignIndex([_campaign("a", 1.0), _campaign("a", 2.0)])
+
+    def test_matching_at_10k_campaigns_does_not_scan_them(self):
+        # Throughput is tracked by the advertiser.campaign_match_10k benchmark (python -m tests.benchmarks).
+        rng = random.Random(5)
+        categories = [f"IAB{i}" for i in range(1, 27)]
+        domains = [f"site{i}.com" for i in range(500)]
+        campaigns = [
+            _campaign(
+                f"c{i}", round(rng.uniform(0.5, 20.0), 2),
+                allowed_categories=tuple(rng.sample(categories, 3)),
+                blocked_domains=tuple(rng.sample(domains, 5)),
+            )
+            for i in range(10_000)
+        ]
+        index = CampaignIndex(campaigns)
+        requests = [(rng.choice(categories), rng.choice(domains), rng.uniform(0.5, 10.0)) for _ in range(200)]
+        expected = [
+            max(
+                (c for c in campaigns if c.max_cpm >= floor and category in c.allowed_categories
+                 and domain not in c.blocked_domains),
+                key=lambda c: c.max_cpm, default=None,
+            )
+            for category, domain, floor in requests
+        ]
+
+        index.campaigns = _NoScan(index.campaigns)
+        assert [index.best(*request) for request in requests] == expected
+
+
+class TestBidder:
+
+    def test_without_campaigns_bids_random_price_in_range(self):
+        bidder = Bidder(AdvertiserConfig(min_bid=1.0, max_bid=2.0), rng=random.Random(1))
+        decision = bidder.bid("IAB1", "x.com", 0.5)
+        assert 1.0 <= decision.bid_price <= 2.0
+        assert decision.campaign_id is None
+
+    def test_campaign_bids_max_cpm_with_one_of_its_creatives(self):
+        campaign = Campaign("c1", 3.5, (Creative("ad-a"), Creative("ad-b")))
+        bidder = Bidder(AdvertiserConfig(), [campaign], rng=random.Random(2))
+        decisions = {bidder.bid("IAB1", "x.com", 1.0) for _ in range(50)}
+        assert {d.ad_id for d in decisions} == {"ad-a", "ad-b"}
+        assert {(d.bid_price, d.campaign_id) for d in decisions} == {(3.5, "c1")}
+
+    def test_no_matching_campaign_means_no_bid(self):
+        bidder = Bidder(AdvertiserConfig(), [_campaign("c1", 1.0)])
+        assert bidder.bid("IAB1", "x.com", 5.0) is None
+
+    def test_create_bidder_merges_inline_and_file_campaigns(self, tmp_path):
+        path = tmp_path / "more.jsonl"
+        path.write_text(json.dumps({"campaign_id": "file", "max_cpm": 2.0, "creatives": ["f"]}) + "\n")
+        bidder = create_bidder(AdvertiserConfig(campaigns=(_campaign("inline", 1.0),)), str(path))
+        assert {c.campaign_id for c in bidder.index.campaigns} == {"inline", "file"}
@@ -0,0 +1,134 @@
+"""Unit tests for src.advertiser.faults"""
+import json
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.advertiser.config import FaultConfig, get_config
+from src.advertiser.faults import (
+    ConnectionDropped,
+    FaultInjector,
+    remove_shared_state,
+    shared_state_path,
+    silence_dropped_connections,
+)
+
+
+def _injector(config: FaultConfig, state_path=None, delay_ms: float = 30.0) -> FaultInjector:
+    return FaultInjector(config, delay_ms, rng=np.random.default_rng(3), state_path=state_path)
+
+
+def _patch_in_worker(directory):
+    _injector(FaultConfig(), state_path=shared_state_path(directory, "adv-001")).update(error_rate=0.5)
+
+
+class TestFaultConfig:
+
+    @pytest.mark.parametrize("fields, match", [
+        ({"error_rate": 1.5}, "between 0 and 1"),
+        ({"error_rate": 0.6, "drop_rate": 0.6}, "more than 1"),
+        ({"error_status": 404}, "5xx"),
+        ({"stall_ms": -1}, "stall_ms"),
+        ({"latency": "gamma:1"}, "Unknown distribution"),
+    ])
+    def test_rejects_invalid_settings(self, fields, match):
+        with pytest.raises(ValueError, match=match):
+            FaultConfig(**fields)
+
+    def test_faults_table_in_advertiser_config(self, tmp_path):
+        path = tmp_path / "adv.toml"
+        path.write_text('[faults]\nlatency = "lognormal:30,0.5"\nerror_rate = 0.05\n')
+        assert get_config(path).faults == FaultConfig(latency="lognormal:30,0.5", error_rate=0.05)
+
+    def test_config_does_not_load_the_web_stack(self):
+        code = "import sys, src.advertiser.config; print('fastapi' in sys.modules or 'starlette' in sys.modules)"
+        assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout.strip() == "False"
+
+
+class TestFaultInjector:
+
+    def test_without_faults_waits_the_fixed_delay(self):
+        injector = _injector(FaultConfig())
+        assert {injector.draw() for _ in range(100)} == {(None, 30.0)}
+
+    def test_draws_faults_at_configured_rates(self):
+        injector = _injector(FaultConfig(error_rate=0.1, malformed_rate=0.2, drop_rate=0.05, stall_rate=0.15))
+        counts = Counter(injector.draw()[0] for _ in range(40_000))
+        assert counts["error"] / 40_000 == pytest.approx(0.1, abs=0.01)
+        assert counts["malformed"] / 40_000 == pytest.approx(0.2, abs=0.01)
+        assert counts["drop"] / 40_000 == pytest.approx(0.05, abs=0.01)
+        assert counts["stall"] / 40_000 == pytest.approx(0.15, abs=0.01)
+
+    def test_stall_waits_stall_ms(self):
+        injector = _injector(FaultConfig(stall_rate=1.0, stall_ms=750.0))
+        assert injector.draw() == ("stall", 750.0)
+
+    def test_latency_model_replaces_fixed_delay(self):
+        injector = _injector(FaultConfig(latency="uniform:100,200"))
+        delays = [injector.draw()[1] for _ in range(1000)]
+        assert 100 <= min(delays) and max(delays) <= 200
+
+    def test_responses(self):
+        injector = _injector(FaultConfig(error_status=502))
+        assert injector.respond("error").status_code == 502
+        malformed = injector.respond("malformed")
+        assert malformed.status_code == 200
+        with pytest.raises(ValueError):
+            json.loads(malformed.body)
+
+    def test_dropped_connections_are_not_logged_as_app_errors(self, caplog):
+        silence_dropped_connections()
+        server_log = logging.getLogger("uvicorn.error")
+        with caplog.at_level(logging.ERROR, logger="uvicorn.error"):
+            server_log.error("Exception in ASGI application", exc_info=ConnectionDropped())
+            server_log.error("Exception in ASGI application", exc_info=RuntimeError("bug"))
+        assert [record.exc_info[0] for record in caplog.records] == [RuntimeError]
+
+    def test_update_validates(self):
+        injector = _injector(FaultConfig())
+        with pytest.raises(ValueError):
+            injector.update(error_rate=2.0)
+        assert injector.config == FaultConfig()
+
+    def test_update_reaches_other_workers(self, tmp_path):
+        path = tmp_path / "faults.json"
+        worker_a = _injector(FaultConfig(), state_path=path)
+        worker_b = _injector(FaultConfig(), state_path=path)
+        worker_b.draw()
+
+        worker_a.update(error_rate=1.0)
+        worker_b._next_poll = 0.0  # next poll is due
+        assert worker_b.draw()[0] == "error"
+        assert worker_b.config.error_rate == 1.0
+
+    def test_worker_override_shares_fault_state(self, tmp_path):
+        # The config file says 1 worker; run_service reports the 2 that --workers started.
+        code = (
+            "import asyncio, httpx\n"
+            "from src.advertiser.server import app\n"
+            "async def main():\n"
+            "    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://a') as c:\n"
+            "        assert (await c.patch('/admin/faults', json={'error_rate': 0.5})).status_code == 200\n"
+            "asyncio.run(main())\n"
+        )
+        env = {**os.environ, "RTB_WORKERS": "2", "RTB_FAULTS_DIR": str(tmp_path), "RTB_SPEND_DIR": str(tmp_path)}
+        subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True)
+        (state,) = tmp_path.glob("rtb-faults-*.json")
+        assert json.loads(state.read_text())["error_rate"] == 0.5
+
+    def test_master_removes_its_workers_state_files(self, tmp_path):
+        worker = multiprocessing.get_context("fork").Process(target=_patch_in_worker, args=(tmp_path,))
+        worker.start()
+        worker.join()
+        other_master = tmp_path / "rtb-faults-adv-001-1.json"
+        other_master.write_text("{}")
+        assert len(list(tmp_path.glob("rtb-faults-*.json"))) == 2
+
+        remove_shared_state("adv-001", tmp_path)
+        assert list(tmp_path.glob("rtb-faults-*.json")) == [other_master]
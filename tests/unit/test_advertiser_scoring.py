@@ -0,0 +1,113 @@
+"""Unit tests for src.advertiser.scoring"""
+import random
+
+import numpy as np
+
+from src.advertiser.bidding import Bidder
+from src.advertiser.campaigns import Campaign, CampaignIndex, Creative
+from src.advertiser.config import AdvertiserConfig
+from src.advertiser.scoring import CampaignScorer
+
+
+def _campaign(campaign_id: str, max_cpm: float, **fields) -> Campaign:
+    return Campaign(campaign_id, max_cpm, (Creative(f"ad-{campaign_id}"),), **fields)
+
+
+def _scorer(*campaigns: Campaign) -> tuple[CampaignIndex, CampaignScorer]:
+    index = CampaignIndex(campaigns)
+    return index, CampaignScorer(index)
+
+
+def _winner(index: CampaignIndex, scorer: CampaignScorer, floor: float, category: str = "IAB1"):
+    scored = scorer.score(index.match(category, "x.com", floor), floor)
+    return None if scored is None else (index.campaigns[scored[0]].campaign_id, scored[1])
+
+
+class TestCampaignScorer:
+
+    def test_base_bid_defaults_to_max_cpm(self):
+        index, scorer = _scorer(_campaign("a", 3.0))
+        assert _winner(index, scorer, 1.0) == ("a", 3.0)
+
+    def test_base_bid_beats_higher_max_cpm(self):
+        index, scorer = _scorer(_campaign("high-cap", 10.0, base_bid=2.0), _campaign("steady", 4.0))
+        assert _winner(index, scorer, 1.0) == ("steady", 4.0)
+
+    def test_floor_affinity_raises_price_up_to_max_cpm(self):
+        index, scorer = _scorer(_campaign("a", 5.0, base_bid=1.0, floor_affinity=0.5))
+        assert _winner(index, scorer, 2.0) == ("a", 3.0)
+        assert _winner(index, scorer, 4.0) == ("a", 5.0)
+
+    def test_low_base_bid_still_meets_the_floor(self):
+        index, scorer = _scorer(_campaign("a", 5.0, base_bid=1.0))
+        assert _winner(index, scorer, 2.0) == ("a", 2.0)
+
+    def test_paced_price_below_floor_is_not_eligible(self):
+        index, scorer = _scorer(_campaign("a", 5.0, base_bid=1.0))
+        scorer.pacing[0] = 0.5
+        assert _winner(index, scorer, 2.0) is None
+
+    def test_zero_pacing_stops_a_campaign(self):
+        index, scorer = _scorer(_campaign("a", 5.0), _campaign("b", 2.0))
+        scorer.pacing[0] = 0.0
+        assert _winner(index, scorer, 1.0) == ("b", 2.0)
+
+    def test_pacing_scales_price(self):
+        index, scorer = _scorer(_campaign("a", 5.0))
+        scorer.pacing[0] = 0.5
+        assert _winner(index, scorer, 1.0) == ("a", 2.5)
+
+    def test_exhausted_budget_is_not_eligible(self):
+        index, scorer = _scorer(_campaign("a", 5.0), _campaign("b", 2.0))
+        scorer.remaining_budget[0] = 0.004  # one impression at 5.0 CPM costs 0.005
+        assert _winner(index, scorer, 1.0) == ("b", 2.0)
+
+    def test_ties_go_to_higher_max_cpm(self):
+        index, scorer = _scorer(_campaign("low", 3.0), _campaign("high", 6.0, base_bid=3.0))
+        assert _winner(index, scorer, 1.0) == ("high", 3.0)
+
+    def test_nothing_matching_scores_none(self):
+        index, scorer = _scorer(_campaign("a", 3.0, allowed_categories=("IAB2",)))
+        assert _winner(index, scorer, 1.0) is None
+
+    def test_batch_matches_single_requests(self):
+        rng = random.Random(3)
+        categories = [f"IAB{i}" for i in range(1, 27)]
+        campaigns = []
+        for i in range(3000):
+            max_cpm = round(rng.uniform(0.5, 20.0), 2)
+            campaigns.append(_campaign(
+                f"c{i}", max_cpm,
+                base_bid=rng.choice([None, round(rng.uniform(0.3, max_cpm), 2)]),
+                floor_affinity=rng.choice([0.0, rng.uniform(0.0, 0.5)]),
+                allowed_categories=tuple(rng.sample(categories, 4)),
+            ))
+        index, scorer = _scorer(*campaigns)
+        scorer.pacing[:] = np.random.default_rng(3).uniform(0.2, 1.0, len(campaigns))
+        requests = [(rng.choice(categories), rng.uniform(0.5, 25.0)) for _ in range(300)]
+
+        masks = [index.match(category, "x.com", floor) for category, floor in requests]
+        positions, prices = scorer.score_batch(masks, [floor for _, floor in requests])
+        expected = [scorer.score(mask, floor) for mask, (_, floor) in zip(masks, requests)]
+
+        assert any(e is None for e in expected) and any(e is not None for e in expected)
+        assert [None if p < 0 else (p, price) for p, price in zip(positions.tolist(), prices.tolist())] == expected
+
+    def test_batch_of_unmatched_requests(self):
+        _, scorer = _scorer(_campaign("a", 3.0))
+        positions, prices = scorer.score_batch([0, 0], [1.0, 2.0])
+        assert positions.tolist() == [-1, -1]
+        assert np.isnan(prices).all()
+
+
+class TestBidderBatch:
+
+    def test_bid_batch_returns_one_decision_per_request(self):
+        bidder = Bidder(AdvertiserConfig(), [_campaign("news", 4.0, allowed_categories=("IAB12",)), _campaign("any", 2.0)])
+        decisions = bidder.bid_batch([("IAB12", "x.com", 1.0), ("IAB1", "x.com", 1.0), ("IAB1", "x.com", 3.0)])
+        assert [(d.campaign_id, d.bid_price) if d else None for d in decisions] == [("news", 4.0), ("any", 2.0), None]
+
+    def test_bid_batch_without_campaigns_bids_randomly(self):
+        bidder = Bidder(AdvertiserConfig(min_bid=1.0, max_bid=2.0), rng=random.Random(1))
+        decisions = bidder.bid_batch([("IAB1", "x.com", 0.5)] * 3)
+        assert all(1.0 <= d.bid_price <= 2.0 and d.campaign_id is None for d in decisions)
@@ -0,0 +1,45 @@
+"""Unit tests for tests.benchmarks.harness"""
+import asyncio
+
+import pytest
+
+from tests.benchmarks.harness import BenchResult, compare, format_results, load_baseline, run_benchmark, save_baseline
+
+
+def _result(ops: float) -> BenchResult:
+    return BenchResult("x", ops_per_sec=ops, us_per_op=1e6 / ops, retained_blocks_per_op=0, alloc_bytes_per_op=0)
+
+
+class TestRunBenchmark:
+
+    def test_sync_benchmark(self):
+        result = run_benchmark("sum", lambda: sum(range(100)), min_time_s=0.01, repeats=2)
+        assert result.ops_per_sec > 0
+        assert result.us_per_op == pytest.approx(1e6 / result.ops_per_sec, rel=0.01)
+
+    def test_async_benchmark(self):
+        async def noop():
+            await asyncio.sleep(0)
+
+        assert run_benchmark("noop", noop, min_time_s=0.01, repeats=2).ops_per_sec > 0
+
+    def test_counts_retained_allocations(self):
+        kept = []
+        result = run_benchmark("append", lambda: kept.append(object()), min_time_s=0.01, repeats=1)
+        assert result.retained_blocks_per_op >= 0.9
+
+
+class TestBaseline:
+
+    def test_compare(self):
+        assert compare(_result(110), {"ops_per_sec": 100}) == pytest.approx(0.1)
+        assert compare(_result(110), None) is None
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "baseline.json"
+        save_baseline(path, [_result(100)], {"commit": "abc"})
+        assert load_baseline(path)["x"]["ops_per_sec"] == 100
+        assert load_baseline(tmp_path / "missing.json") == {}
+
+    def test_format_shows_change(self):
+        assert "-50.0%" in format_results([_result(50)], {"x": {"ops_per_sec": 100}})
@@ -0,0 +1,129 @@
+"""Unit tests for src.benchmark report computation"""
+import pytest
+
+from src.benchmark import (
+    HOPS,
+    diff_samples,
+    format_report,
+    histogram_quantiles,
+    merge_samples,
+    parse_metrics,
+    summarize_run,
+    tree_usage,
+)
+from src.metrics import MetricsRegistry
+
+
+def _render(observations: list[float], path: str = "/bid/request") -> str:
+    registry = MetricsRegistry("test")
+    latency = registry.histogram("http_request_duration_ms", "latency", (10, 20, 50, 100), ("path",))
+    requests = registry.counter("http_requests_total", "requests", ("path", "status"))
+    for value in observations:
+        latency.observe(value, path)
+        requests.inc(path, "200")
+    return registry.render()
+
+
+class TestParseMetrics:
+
+    def test_parses_labels_and_values(self):
+        samples = parse_metrics(_render([5, 15]))
+        assert samples[("http_requests_total", (("path", "/bid/request"), ("status", "200")))] == 2
+        assert samples[("http_request_duration_ms_bucket", (("le", "+Inf"), ("path", "/bid/request")))] == 2
+        assert samples[("http_request_duration_ms_sum", (("path", "/bid/request"),))] == 20
+
+    def test_ignores_comments_and_blank_lines(self):
+        assert parse_metrics("# HELP x y\n# TYPE x counter\n\nx 3\n") == {("x", ()): 3.0}
+
+    def test_merge_and_diff(self):
+        a = {("x", ()): 2.0}
+        b = {("x", ()): 3.0, ("y", ()): 1.0}
+        assert merge_samples(a, b) == {("x", ()): 5.0, ("y", ()): 1.0}
+        assert diff_samples(b, a) == {("x", ()): 1.0, ("y", ()): 1.0}
+
+
+class TestHistogramQuantiles:
+
+    def test_interpolates_within_bucket(self):
+        samples = parse_metrics(_render([15] * 100))
+        stats = histogram_quantiles(samples, "http_request_duration_ms", {"path": "/bid/request"})
+        assert stats["count"] == 100
+        assert stats["p50"] == pytest.approx(15.0)
+        assert stats["p99"] == pytest.approx(19.9)
+
+    def test_tail_lands_in_slow_bucket(self):
+        samples = parse_metrics(_render([5] * 990 + [80] * 10))
+        stats = histogram_quantiles(samples, "http_request_duration_ms")
+        assert stats["p50"] <= 10
+        assert 50 <= stats["p99.9"] <= 100
+
+    def test_overflow_reports_largest_bound(self):
+        samples = parse_metrics(_render([500]))
+        assert histogram_quantiles(samples, "http_request_duration_ms")["p50"] == 100
+
+    def test_label_filter_excludes_other_series(self):
+        samples = parse_metrics(_render([5], path="/health"))
+        stats = histogram_quantiles(samples, "http_request_duration_ms", {"path": "/bid/request"})
+        assert stats == {"count": 0, "p50": None, "p90": None, "p99": None, "p99.9": None}
+
+
+class TestSummarizeRun:
+
+    def test_computes_rates_from_counter_deltas(self):
+        before = {"publisher": {}, "ssp": {}, "advertiser": {}}
+        after = {
+            "publisher": parse_metrics(
+                'publisher_requests_total{result="bid_won"} 30\n'
+                'publisher_requests_total{result="no_bid"} 65\n'
+                'publisher_requests_total{result="failed"} 5\n'
+            ),
+            "ssp": parse_metrics(
+                'ssp_bidder_requests_total{bidder="a",outcome="bid"} 150\n'
+                'ssp_bidder_requests_total{bidder="a",outcome="timeout"} 50\n'
+                "ssp_admission_rejected_total 2\n"
+            ),
+            "advertiser": {},
+        }
+
+        result = summarize_run(50.0, 2.0, before, after, processes={})
+
+        assert result["achieved_rps"] == 50.0
+        assert result["fill_rate"] == 0.3
+        assert result["error_rate"] == 0.05
+        assert result["timeout_rate"] == 0.25
+        assert result["shed_requests"] == 2
+        assert set(result["latency_ms"]) == set(HOPS)
+
+
+class TestFormatReport:
+
+    def _report(self, commit: str, achieved: float, p99: float) -> dict:
+        latency = {hop: {"count": 1, "p50": 1.0, "p90": 2.0, "p99": p99, "p99.9": p99} for hop in HOPS}
+        return {
+            "meta": {"commit": commit, "timestamp": "t", "env": "dev", "workers": 1, "arrivals": "poisson",
+                     "duration_s": 10},
+            "runs": [{
+                "target_rps": 100.0, "achieved_rps": achieved, "fill_rate": 0.5, "error_rate": 0.0,
+                "timeout_rate": 0.01, "shed_requests": 0, "latency_ms": latency,
+                "processes": {"SSP": {"cpu_percent": 12.5, "peak_rss_mb": 80.0}},
+            }],
+        }
+
+    def test_includes_every_hop_and_process(self):
+        text = format_report(self._report("abc", 99.0, 40.0))
+        assert "commit=abc" in text
+        for hop in HOPS:
+            assert hop in text
+        assert "SSP" in text
+
+    def test_compares_against_baseline(self):
+        text = format_report(self._report("new", 99.0, 44.0), baseline=self._report("old", 99.0, 40.0))
+        assert "vs baseline commit=old" in text
+        assert "+10.0%" in text
+
+
+def test_tree_usage_of_current_process():
+    import os
+    cpu_s, rss = tree_usage(os.getpid())
+    assert cpu_s > 0
+    assert rss > 0
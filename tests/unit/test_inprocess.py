@@ -0,0 +1,74 @@
+"""Unit tests for src.inprocess"""
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.advertiser import server as advertiser_server
+from src.inprocess import ASGIRouter, InProcessStack, advertiser_configs
+from src.ssp import server as ssp_server
+
+
+@pytest.fixture
+def restore_ssp_bidders():
+    targeting_index, circuit_breakers = ssp_server.targeting_index, ssp_server.circuit_breakers
+    yield
+    ssp_server.targeting_index, ssp_server.circuit_breakers = targeting_index, circuit_breakers
+
+
+class TestAdvertiserConfigs:
+
+    def test_extra_advertisers_get_unique_ids_and_ports(self):
+        configs = advertiser_configs("dev", 5)
+        assert len({config.advertiser_id for config in configs}) == 5
+        assert len({config.server.port for config in configs}) == 5
+
+    def test_delay_zeroed_unless_kept(self):
+        assert all(config.response_delay_ms == 0 for config in advertiser_configs("dev", 3))
+        assert advertiser_configs("dev", 1, keep_delay=True)[0].response_delay_ms > 0
+
+
+class TestASGIRouter:
+
+    async def test_routes_by_host_and_port(self):
+        router = ASGIRouter({"adv.test:9000": advertiser_server.create_app(advertiser_server.config)})
+        async with httpx.AsyncClient(transport=router) as client:
+            resp = await client.get("http://adv.test:9000/health")
+        assert resp.json()["advertiser_id"] == advertiser_server.config.advertiser_id
+
+    async def test_unknown_host_is_a_connect_error(self):
+        async with httpx.AsyncClient(transport=ASGIRouter({})) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.get("http://adv.test:9001/bid")
+
+    async def test_app_errors_are_not_mistaken_for_drops(self):
+        app = FastAPI()
+
+        @app.get("/bid")
+        async def broken():
+            assert False, "bug"
+
+        async with httpx.AsyncClient(transport=ASGIRouter({"adv.test:9002": app})) as client:
+            with pytest.raises(AssertionError, match="bug"):
+                await client.get("http://adv.test:9002/bid")
+
+
+class TestInProcessStack:
+
+    async def test_closed_loop_run_reaches_every_advertiser(self, restore_ssp_bidders):
+        configs = advertiser_configs("dev", 3)
+        async with InProcessStack(configs) as stack:
+            result = await stack.run(duration_s=0.2, concurrency=4)
+
+        assert result["mode"] == "closed"
+        assert result["requests"] > 0
+        assert result["error_rate"] == 0.0
+        assert result["cpu_s"] > 0
+        assert result["latency_ms"]["ssp_to_bidder"]["count"] == 3 * result["requests"]
+        assert ssp_server.http_client is None
+
+    async def test_open_loop_run(self, restore_ssp_bidders):
+        async with InProcessStack(advertiser_configs("dev", 1)) as stack:
+            result = await stack.run(duration_s=0.2, concurrency=8, rate_rps=200)
+        assert result["mode"] == "open"
+        assert result["target_rps"] == 200
+        assert result["requests"] > 0
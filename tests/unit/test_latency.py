@@ -0,0 +1,50 @@
+"""Unit tests for src.latency"""
+import numpy as np
+import pytest
+
+from src.latency import Distribution, load_histogram
+
+
+class TestBimodal:
+
+    def test_slow_share_of_samples(self):
+        dist = Distribution("bimodal:20,0.1,400,0.1,0.1", np.random.default_rng(1))
+        samples = dist.sample_block(50_000)
+        assert np.mean(samples > 200) == pytest.approx(0.1, abs=0.01)
+        assert np.median(samples[samples < 200]) == pytest.approx(20, rel=0.05)
+
+    def test_rejects_slow_share_above_one(self):
+        with pytest.raises(ValueError, match="slow share"):
+            Distribution("bimodal:20,0.1,400,0.1,1.5")
+
+
+class TestEmpirical:
+
+    def test_samples_follow_histogram(self, tmp_path):
+        path = tmp_path / "latency.txt"
+        path.write_text("# ms count\n10 75\n\n50, 0\n100 25  # tail\n")
+        samples = Distribution(f"empirical:{path}", np.random.default_rng(2)).sample_block(40_000)
+        assert np.mean(samples <= 10) == pytest.approx(0.75, abs=0.01)
+        assert not np.any((samples > 10) & (samples <= 50))
+        assert samples.min() >= 0 and samples.max() <= 100
+
+    def test_sample_hands_out_one_value(self, tmp_path):
+        path = tmp_path / "latency.txt"
+        path.write_text("5 1\n")
+        assert 0 <= Distribution(f"empirical:{path}").sample() <= 5
+
+    @pytest.mark.parametrize("content, match", [
+        ("", "no samples"),
+        ("10 0\n", "no samples"),
+        ("10 5\n5 5\n", "ascend"),
+        ("10\n", "expected"),
+    ])
+    def test_rejects_bad_files(self, tmp_path, content, match):
+        path = tmp_path / "latency.txt"
+        path.write_text(content)
+        with pytest.raises(ValueError, match=match):
+            load_histogram(path)
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(ValueError, match="not found"):
+            Distribution(f"empirical:{tmp_path / 'missing.txt'}")
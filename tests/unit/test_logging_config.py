@@ -1,8 +1,12 @@
 """Unit tests for src.logging_config (setup_logging, get_logger)."""
 import logging
+import logging.handlers
 from unittest.mock import patch
 
-from src.logging_config import setup_logging, get_logger
+import pytest
+
+import src.logging_config as logging_config
+from src.logging_config import LogSampler, SampledLogger, setup_logging, get_logger, get_request_logger
 
 class TestGetLogger:
 
@@ -49,3 +53,96 @@ class TestSetupLogging:
         _, kwargs = mock_basic_config.call_args
         assert kwargs["format"] == "%(message)s"
 
+
+    @patch("src.logging_config.logging.basicConfig")
+    def test_configures_request_sampler(self, _mock_basic_config):
+        setup_logging(sample_rate=0.25, max_per_second=10)
+        assert logging_config.request_sampler.rate == 0.25
+        assert logging_config.request_sampler.max_per_second == 10
+        setup_logging()
+
+    @patch("src.logging_config.logging.basicConfig")
+    def test_queue_mode_installs_queue_handler(self, mock_basic_config):
+        setup_logging(use_queue=True)
+        try:
+            _, kwargs = mock_basic_config.call_args
+            (handler,) = kwargs["handlers"]
+            assert isinstance(handler, logging.handlers.QueueHandler)
+            record = logging.LogRecord("x", logging.INFO, __file__, 1, "value=%s", ("lazy",), None)
+            handler.emit(record)
+            assert record.msg == "value=%s"  # formatting is left to the listener thread
+        finally:
+            logging_config._stop_queue_listener()
+
+    def test_queue_mode_can_be_set_up_again(self, monkeypatch, capsys):
+        monkeypatch.setattr(logging.root, "handlers", [])
+        monkeypatch.setattr(logging.root, "level", logging.root.level)
+        try:
+            setup_logging(use_queue=True)
+            setup_logging(use_queue=True, format_string="again: %(message)s")
+            assert logging.root.handlers == [logging_config._queue_handler]
+            logging.getLogger("twice").warning("still delivered")
+        finally:
+            logging_config._stop_queue_listener()
+        assert "again: still delivered" in capsys.readouterr().err
+
+    def test_queue_mode_replaces_an_earlier_plain_setup(self, monkeypatch, capsys):
+        monkeypatch.setattr(logging.root, "handlers", [])
+        monkeypatch.setattr(logging.root, "level", logging.root.level)
+        try:
+            setup_logging()
+            setup_logging(use_queue=True, format_string="queued: %(message)s")
+            assert logging.root.handlers == [logging_config._queue_handler]
+            logging.getLogger("plain-then-queue").warning("through the listener")
+        finally:
+            logging_config._stop_queue_listener()
+        assert capsys.readouterr().err.splitlines() == ["queued: through the listener"]
+
+
+class TestLogSampler:
+
+    def test_full_rate_keeps_everything(self):
+        sampler = LogSampler()
+        assert all(sampler.sample() for _ in range(100))
+
+    def test_zero_rate_drops_everything(self):
+        sampler = LogSampler(rate=0.0)
+        assert not any(sampler.sample() for _ in range(100))
+
+    def test_invalid_rate_raises(self):
+        with pytest.raises(ValueError, match="Sample rate"):
+            LogSampler(rate=1.5)
+
+    def test_max_per_second_caps_each_window(self):
+        now = [100.0]
+        sampler = LogSampler(max_per_second=3, clock=lambda: now[0])
+        assert [sampler.sample() for _ in range(5)] == [True, True, True, False, False]
+        now[0] = 101.0
+        assert sampler.sample() is True
+
+
+class TestSampledLogger:
+
+    def test_get_request_logger_wraps_named_logger(self):
+        lg = get_request_logger("requests-unit")
+        assert isinstance(lg, SampledLogger)
+        assert lg.logger is get_logger("requests-unit")
+
+    def test_sampled_out_line_is_never_formatted(self):
+        lg = SampledLogger(get_logger("sampled-unit"), LogSampler(rate=0.0))
+        lg.logger.setLevel(logging.INFO)
+
+        class Exploding:
+            def __str__(self):
+                raise AssertionError("formatted a sampled-out line")
+
+        with patch.object(lg.logger, "_log") as mock_log:
+            lg.info("value=%s", Exploding())
+        mock_log.assert_not_called()
+
+    def test_warnings_bypass_sampling(self):
+        lg = SampledLogger(get_logger("sampled-warn-unit"), LogSampler(rate=0.0))
+        lg.logger.setLevel(logging.INFO)
+        with patch.object(lg.logger, "_log") as mock_log:
+            lg.warning("always kept")
+        mock_log.assert_called_once()
@@ -0,0 +1,168 @@
+"""Unit tests for src.metrics (Counter, Gauge, Histogram, MetricsRegistry, MetricsMiddleware)."""
+import json
+import multiprocessing
+import os
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from src.metrics import MetricsMiddleware, MetricsRegistry, add_http_metrics
+
+
+def _dead_pid() -> int:
+    process = multiprocessing.get_context("fork").Process(target=int)
+    process.start()
+    process.join()
+    return process.pid
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    return MetricsRegistry("unit")
+
+
+class TestCounterAndGauge:
+
+    def test_counter_increments_per_label_set(self, registry: MetricsRegistry):
+        counter = registry.counter("hits_total", "Hits", ("bidder",))
+        counter.inc("a")
+        counter.inc("a", amount=2)
+        counter.inc("b")
+        assert counter.value("a") == 3
+        assert counter.value("b") == 1
+
+    def test_gauge_can_go_down(self, registry: MetricsRegistry):
+        gauge = registry.gauge("depth", "Depth")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        assert gauge.value() == 1
+
+    def test_duplicate_name_raises(self, registry: MetricsRegistry):
+        registry.counter("dup_total", "Dup")
+        with pytest.raises(ValueError, match="already registered"):
+            registry.counter("dup_total", "Dup")
+
+
+class TestHistogram:
+
+    def test_observations_land_in_fixed_buckets(self, registry: MetricsRegistry):
+        histogram = registry.histogram("latency_ms", "Latency", buckets=(10, 100))
+        for value in (5, 10, 50, 500):
+            histogram.observe(value)
+        assert histogram.snapshot() == [[[], {"counts": [2, 1, 1], "sum": 565.0}]]
+        assert histogram.count() == 4
+
+    def test_render_is_cumulative(self, registry: MetricsRegistry):
+        histogram = registry.histogram("latency_ms", "Latency", buckets=(10, 100), labelnames=("path",))
+        histogram.observe(5, "/bid")
+        histogram.observe(50, "/bid")
+        text = registry.render()
+        assert 'latency_ms_bucket{path="/bid",le="10"} 1' in text
+        assert 'latency_ms_bucket{path="/bid",le="100"} 2' in text
+        assert 'latency_ms_bucket{path="/bid",le="+Inf"} 2' in text
+        assert 'latency_ms_count{path="/bid"} 2' in text
+        assert "# TYPE latency_ms histogram" in text
+
+
+class TestRender:
+
+    def test_counter_lines(self, registry: MetricsRegistry):
+        registry.counter("auctions_total", "Auctions", ("result",)).inc("bid_won")
+        text = registry.render()
+        assert "# HELP auctions_total Auctions" in text
+        assert 'auctions_total{result="bid_won"} 1' in text
+
+    def test_label_values_are_escaped(self, registry: MetricsRegistry):
+        registry.counter("odd_total", "Odd", ("v",)).inc('a"b')
+        assert 'odd_total{v="a\\"b"} 1' in registry.render()
+
+    def test_ratio_is_computed_from_counters(self, registry: MetricsRegistry):
+        auctions = registry.counter("auctions_total", "Auctions", ("result",))
+        registry.ratio("fill_rate", "Fill", auctions, auctions, result="bid_won")
+        auctions.inc("bid_won")
+        auctions.inc("no_bid", amount=3)
+        assert "fill_rate 0.25" in registry.render()
+
+    def test_ratio_without_data_is_zero(self, registry: MetricsRegistry):
+        auctions = registry.counter("auctions_total", "Auctions", ("result",))
+        registry.ratio("fill_rate", "Fill", auctions, auctions, result="bid_won")
+        assert "fill_rate 0" in registry.render()
+
+
+class TestMultiWorkerAggregation:
+
+    def test_snapshots_from_all_workers_are_summed(self, tmp_path):
+        registry = MetricsRegistry("svc", str(tmp_path))
+        counter = registry.counter("hits_total", "Hits", ("path",))
+        histogram = registry.histogram("latency_ms", "Latency", buckets=(10,))
+        counter.inc("/bid", amount=2)
+        histogram.observe(5)
+
+        other_worker = {
+            "hits_total": [[["/bid"], 3.0], [["/health"], 1.0]],
+            "latency_ms": [[[], {"counts": [0, 4], "sum": 80.0}]],
+        }
+        (tmp_path / f"svc-{os.getppid()}.json").write_text(json.dumps(other_worker))
+        (tmp_path / f"other-{os.getppid()}.json").write_text(json.dumps({"hits_total": [[["/bid"], 100.0]]}))
+
+        text = registry.render()
+        assert 'hits_total{path="/bid"} 5' in text
+        assert 'hits_total{path="/health"} 1' in text
+        assert 'latency_ms_bucket{le="10"} 1' in text
+        assert 'latency_ms_bucket{le="+Inf"} 5' in text
+        assert "latency_ms_sum 85" in text
+
+    def test_flush_writes_own_snapshot(self, tmp_path):
+        registry = MetricsRegistry("svc", str(tmp_path))
+        registry.counter("hits_total", "Hits").inc()
+        registry.flush()
+        (path,) = tmp_path.glob("svc-*.json")
+        assert json.loads(path.read_text()) == {"hits_total": [[[], 1.0]]}
+
+    def test_function_gauge_is_fresh_in_every_flush(self, tmp_path):
+        registry = MetricsRegistry("svc", str(tmp_path))
+        depth = [3]
+        registry.gauge("queue_depth", "Depth").set_function(lambda: depth[0])
+        registry.flush()
+        depth[0] = 5
+        registry.flush()
+        (path,) = tmp_path.glob("svc-*.json")
+        assert json.loads(path.read_text()) == {"queue_depth": [[[], 5.0]]}
+
+    def test_close_removes_own_snapshot(self, tmp_path):
+        registry = MetricsRegistry("svc", str(tmp_path))
+        registry.counter("hits_total", "Hits").inc()
+        registry.flush()
+        registry.close()
+        assert list(tmp_path.glob("svc-*.json")) == []
+
+    def test_snapshots_of_dead_workers_are_pruned(self, tmp_path):
+        registry = MetricsRegistry("svc", str(tmp_path))
+        registry.counter("hits_total", "Hits").inc()
+        stale = tmp_path / f"svc-{_dead_pid()}.json"
+        stale.write_text(json.dumps({"hits_total": [[[], 41.0]]}))
+
+        assert "hits_total 1" in registry.render()
+        assert not stale.exists()
+
+
+class TestMetricsMiddleware:
+
+    async def test_records_known_paths_and_buckets_unknown_ones(self, registry: MetricsRegistry):
+        requests, latency = add_http_metrics(registry)
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, requests=requests, latency=latency)
+
+        @app.get("/ping")
+        async def ping():
+            return {"ok": True}
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/ping")
+            await client.get("/does-not-exist")
+
+        assert requests.value("/ping", "200") == 1
+        assert requests.value("other", "404") == 1
+        assert latency.count("/ping") == 1
@@ -0,0 +1,74 @@
+"""Unit tests for src.publisher.bulk"""
+import json
+from uuid import UUID
+
+import numpy as np
+import pytest
+
+from src.publisher.bulk import BidRequestRing, bulk_uuid4
+from src.publisher.sites import Site, SiteCatalogue
+from src.ssp.models import BidRequestIn
+
+
+@pytest.fixture
+def catalogue() -> SiteCatalogue:
+    return SiteCatalogue([
+        Site("news.com", "IAB12", 0.5, 2.0, weight=3),
+        Site('quo"te.com', "IAB9", 0.1, 0.2, weight=1),
+    ])
+
+
+class TestBulkUuid4:
+
+    def test_returns_unique_version_4_uuids(self):
+        ids = bulk_uuid4(1000)
+        assert len(set(ids)) == 1000
+        for value in ids[:50]:
+            parsed = UUID(value)
+            assert parsed.version == 4
+            assert str(parsed) == value
+
+
+class TestBidRequestRing:
+
+    def test_payload_is_valid_bid_request_json(self, catalogue: SiteCatalogue):
+        ring = BidRequestRing(catalogue, block_size=64, rng=np.random.default_rng(1))
+        for _ in range(64):
+            request = ring.next()
+            body = json.loads(request.payload)
+            assert body["id"] == request.id
+            assert body["bid_floor"] == request.bid_floor
+            assert body["domain"] == request.domain
+            BidRequestIn(**body)
+
+    def test_floors_stay_within_site_range(self, catalogue: SiteCatalogue):
+        ring = BidRequestRing(catalogue, block_size=500, rng=np.random.default_rng(2))
+        for request in ring.generate_block(500):
+            site = next(s for s in catalogue.sites if s.domain == request.domain)
+            assert site.min_floor <= request.bid_floor <= site.max_floor
+            assert round(request.bid_floor, 2) == request.bid_floor
+
+    def test_draw_returns_sites_and_floors_without_payloads(self, catalogue: SiteCatalogue):
+        ring = BidRequestRing(catalogue, rng=np.random.default_rng(4))
+        site_indices, floors = ring.draw(200)
+        assert len(site_indices) == len(floors) == 200
+        for index, floor in zip(site_indices.tolist(), floors):
+            site = catalogue.sites[index]
+            assert site.min_floor <= floor <= site.max_floor
+        assert ring.blocks_generated == 0
+
+    def test_sites_follow_weights(self, catalogue: SiteCatalogue):
+        ring = BidRequestRing(catalogue, rng=np.random.default_rng(3))
+        block = ring.generate_block(20_000)
+        share = sum(request.domain == "news.com" for request in block) / len(block)
+        assert share == pytest.approx(0.75, abs=0.02)
+
+    def test_refills_one_block_at_a_time(self, catalogue: SiteCatalogue):
+        ring = BidRequestRing(catalogue, block_size=10)
+        ids = [ring.next().id for _ in range(25)]
+        assert ring.blocks_generated == 3
+        assert len(set(ids)) == 25
+
+    def test_rejects_empty_block_size(self, catalogue: SiteCatalogue):
+        with pytest.raises(ValueError):
+            BidRequestRing(catalogue, block_size=0)
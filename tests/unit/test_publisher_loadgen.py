@@ -0,0 +1,105 @@
+"""Unit tests for src.publisher.loadgen.OpenLoopGenerator"""
+import asyncio
+import random
+
+import pytest
+
+from src.publisher.loadgen import OpenLoopGenerator
+
+
+async def _run_for(generator: OpenLoopGenerator, send, seconds: float) -> None:
+    task = asyncio.create_task(generator.run(send))
+    await asyncio.sleep(seconds)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+class TestOpenLoopGenerator:
+
+    async def test_fixed_arrivals_send_at_target_rate(self):
+        generator = OpenLoopGenerator(rate_rps=200, arrivals="fixed")
+
+        async def send():
+            pass
+
+        await _run_for(generator, send, 0.2)
+        assert 30 <= generator.sent <= 41
+
+    def test_fixed_gap_is_inverse_rate(self):
+        assert OpenLoopGenerator(rate_rps=50, arrivals="fixed").next_gap() == pytest.approx(0.02)
+
+    def test_poisson_gaps_average_to_inverse_rate(self):
+        generator = OpenLoopGenerator(rate_rps=100, arrivals="poisson", rng=random.Random(7))
+        gaps = [generator.next_gap() for _ in range(20_000)]
+        assert sum(gaps) / len(gaps) == pytest.approx(0.01, rel=0.05)
+        assert len(set(gaps)) > 1
+
+    async def test_sends_do_not_wait_for_responses(self):
+        generator = OpenLoopGenerator(rate_rps=500, arrivals="fixed", max_in_flight=1000)
+
+        async def slow_send():
+            await asyncio.sleep(1.0)
+
+        await _run_for(generator, slow_send, 0.1)
+        assert generator.sent >= 30
+        assert generator.completed == 0
+
+    async def test_in_flight_is_bounded(self):
+        generator = OpenLoopGenerator(rate_rps=1000, arrivals="fixed", max_in_flight=3)
+        peak = 0
+
+        async def slow_send():
+            nonlocal peak
+            peak = max(peak, generator.in_flight)
+            await asyncio.sleep(0.02)
+
+        await _run_for(generator, slow_send, 0.1)
+        assert peak == 3
+        assert generator.late > 0
+
+    async def test_latency_is_measured_from_scheduled_time(self):
+        """A send delayed by a full in-flight window reports the wait as latency."""
+        latencies = []
+        generator = OpenLoopGenerator(
+            rate_rps=100, arrivals="fixed", max_in_flight=1, on_latency=latencies.append
+        )
+
+        async def slow_send():
+            await asyncio.sleep(0.03)
+
+        await _run_for(generator, slow_send, 0.2)
+        assert latencies[0] == pytest.approx(30, abs=15)
+        assert latencies[-1] > latencies[0] + 30
+
+    async def test_configure_changes_rate_while_running(self):
+        generator = OpenLoopGenerator(rate_rps=10, arrivals="fixed")
+
+        async def send():
+            pass
+
+        task = asyncio.create_task(generator.run(send))
+        await asyncio.sleep(0)
+        generator.configure(rate_rps=500)
+        await asyncio.sleep(0.15)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert generator.rate_rps == 500
+        assert generator.sent > 20
+
+    @pytest.mark.parametrize("kwargs", [{"rate_rps": 0}, {"arrivals": "bursty"}, {"max_in_flight": 0}])
+    def test_configure_rejects_invalid_values(self, kwargs):
+        generator = OpenLoopGenerator(rate_rps=10)
+        with pytest.raises(ValueError):
+            generator.configure(**kwargs)
+
+    def test_to_dict(self):
+        generator = OpenLoopGenerator(rate_rps=10, arrivals="fixed", max_in_flight=5)
+        assert generator.to_dict() == {
+            "rate_rps": 10,
+            "arrivals": "fixed",
+            "max_in_flight": 5,
+            "in_flight": 0,
+            "sent": 0,
+            "completed": 0,
+            "late": 0,
+        }
@@ -1,10 +1,13 @@
 """Unit tests for src.publisher.server"""
+from types import SimpleNamespace
 from unittest.mock import patch, AsyncMock
 
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 
+from src.publisher import metrics as publisher_metrics
+from src.publisher import server as publisher_server
 from src.publisher.server import app, generate_bid_request, is_generating
 
 
@@ -46,6 +49,20 @@ class TestStatusEndpoint:
         assert "is_generating" in data
 
 
+class TestMetricsEndpoint:
+    """Tests for the /metrics endpoint."""
+
+    async def test_metrics_exposes_send_latency_and_win_rate(self, client: AsyncClient):
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert "# TYPE publisher_send_latency_ms histogram" in response.text
+        assert "# TYPE publisher_win_rate gauge" in response.text
+
+    def test_in_flight_follows_the_load_generator_without_a_scrape(self, monkeypatch):
+        monkeypatch.setattr(publisher_server, "load_generator", SimpleNamespace(in_flight=12))
+        assert publisher_metrics.registry.snapshot()["publisher_in_flight"] == [[[], 12.0]]
+
+
 class TestGenerateBidRequest:
     """Tests for the generate_bid_request function."""
 
@@ -64,6 +81,17 @@ class TestGenerateBidRequest:
             request = generate_bid_request()
             assert request.bid_floor >= 0
 
+    def test_uses_site_catalogue_when_loaded(self):
+        from src.publisher.sites import Site, SiteCatalogue
+        catalogue = SiteCatalogue([Site("sports.com", "IAB17", 1.0, 1.5)])
+
+        with patch("src.publisher.server.site_catalogue", catalogue):
+            request = generate_bid_request()
+
+        assert request.domain == "sports.com"
+        assert request.category == "IAB17"
+        assert 1.0 <= request.bid_floor <= 1.5
+
 
 class TestSendEndpoint:
     """Tests for the /send endpoint."""
@@ -100,6 +128,28 @@ class TestStartStopEndpoints:
 
         server_module.is_generating = False
 
+    async def test_start_open_loop_uses_query_params(self, client: AsyncClient):
+        import src.publisher.server as server_module
+        server_module.is_generating = False
+
+        with patch("src.publisher.server.asyncio.create_task"):
+            response = await client.post("/start", params={"mode": "open", "rate_rps": 250, "arrivals": "fixed"})
+            data = response.json()
+            assert data["status"] == "started"
+            assert data["load"]["rate_rps"] == 250
+            assert data["load"]["arrivals"] == "fixed"
+
+            response = await client.post("/start", params={"rate_rps": 500})
+            assert response.json()["status"] == "updated"
+            assert server_module.load_generator.rate_rps == 500
+
+        server_module.is_generating = False
+        server_module.load_generator = None
+
+    async def test_start_rejects_invalid_rate(self, client: AsyncClient):
+        response = await client.post("/start", params={"mode": "open", "rate_rps": 0})
+        assert response.status_code == 422
+
     async def test_stop_when_not_running(self, client: AsyncClient):
         import src.publisher.server as server_module
         server_module.is_generating = False
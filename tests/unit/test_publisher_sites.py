@@ -0,0 +1,116 @@
+"""Unit tests for src.publisher.sites"""
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from src.publisher.sites import AliasSampler, Site, SiteCatalogue, load_catalogue
+
+
+class TestAliasSampler:
+
+    def test_samples_follow_weights(self):
+        sampler = AliasSampler([1, 2, 7], rng=random.Random(1))
+        counts = Counter(sampler.sample() for _ in range(50_000))
+        assert counts[0] / 50_000 == pytest.approx(0.1, abs=0.01)
+        assert counts[1] / 50_000 == pytest.approx(0.2, abs=0.01)
+        assert counts[2] / 50_000 == pytest.approx(0.7, abs=0.01)
+
+    def test_zero_weight_is_never_sampled(self):
+        sampler = AliasSampler([0, 1, 0, 1], rng=random.Random(2))
+        assert {sampler.sample() for _ in range(5_000)} == {1, 3}
+
+    def test_single_entry(self):
+        assert AliasSampler([3.5]).sample() == 0
+
+    def test_large_catalogue(self):
+        weights = [random.Random(3).random() for _ in range(100_000)]
+        sampler = AliasSampler(weights, rng=random.Random(4))
+        assert len(sampler) == 100_000
+        assert all(0 <= sampler.sample() < 100_000 for _ in range(1_000))
+
+    @pytest.mark.parametrize("weights", [[], [0, 0]])
+    def test_rejects_no_positive_weight(self, weights):
+        with pytest.raises(ValueError):
+            AliasSampler(weights)
+
+
+class TestSite:
+
+    def test_rejects_inverted_floor_range(self):
+        with pytest.raises(ValueError):
+            Site(domain="a.com", category="IAB1", min_floor=2.0, max_floor=1.0)
+
+    def test_rejects_negative_weight(self):
+        with pytest.raises(ValueError):
+            Site(domain="a.com", category="IAB1", min_floor=0.5, max_floor=1.0, weight=-1)
+
+
+class TestSiteCatalogue:
+
+    def test_choose_returns_weighted_site(self):
+        catalogue = SiteCatalogue(
+            [Site("a.com", "IAB1", 0.5, 1.0, weight=0), Site("b.com", "IAB2", 0.5, 1.0, weight=1)],
+            rng=random.Random(5),
+        )
+        assert {catalogue.choose().domain for _ in range(100)} == {"b.com"}
+
+
+class TestLoadCatalogue:
+
+    def test_loads_toml(self, tmp_path: Path):
+        path = tmp_path / "sites.toml"
+        path.write_text(
+            '[[sites]]\ndomain = "news.com"\ncategory = "IAB12"\nmin_floor = 0.5\nmax_floor = 2.0\nweight = 3\n'
+            '[[sites]]\ndomain = "games.com"\ncategory = "IAB9"\nmin_floor = 0.1\nmax_floor = 0.5\n'
+        )
+        catalogue = load_catalogue(path)
+        assert catalogue.sites == [
+            Site("news.com", "IAB12", 0.5, 2.0, 3.0),
+            Site("games.com", "IAB9", 0.1, 0.5, 1.0),
+        ]
+
+    def test_loads_csv(self, tmp_path: Path):
+        path = tmp_path / "sites.csv"
+        path.write_text("domain,category,min_floor,max_floor,weight\nnews.com,IAB12,0.5,2.0,3\ngames.com,IAB9,0.1,0.5,\n")
+        catalogue = load_catalogue(path)
+        assert [site.weight for site in catalogue.sites] == [3.0, 1.0]
+
+    def test_loads_jsonl(self, tmp_path: Path):
+        path = tmp_path / "sites.jsonl"
+        path.write_text(
+            '{"domain": "news.com", "category": "IAB12", "min_floor": 0.5, "max_floor": 2.0}\n\n'
+            '{"domain": "games.com", "category": "IAB9", "min_floor": 0.1, "max_floor": 0.5, "weight": 2}\n'
+        )
+        assert len(load_catalogue(path)) == 2
+
+    @pytest.mark.parametrize("name, content", [
+        ("sites.toml", '[[sites]]\ndomain = "a.com"\ncategory = "IAB1"\nmin_floor = 0.1\nmax_floor = 0.5\nweight = 0\n'
+                       '[[sites]]\ndomain = "b.com"\ncategory = "IAB1"\nmin_floor = 0.1\nmax_floor = 0.5\n'),
+        ("sites.csv", "domain,category,min_floor,max_floor,weight\na.com,IAB1,0.1,0.5,0\nb.com,IAB1,0.1,0.5,\n"),
+        ("sites.jsonl", '{"domain": "a.com", "category": "IAB1", "min_floor": 0.1, "max_floor": 0.5, "weight": 0}\n'
+                        '{"domain": "b.com", "category": "IAB1", "min_floor": 0.1, "max_floor": 0.5}\n'),
+    ])
+    def test_keeps_zero_weight(self, tmp_path: Path, name: str, content: str):
+        path = tmp_path / name
+        path.write_text(content)
+        assert [site.weight for site in load_catalogue(path).sites] == [0.0, 1.0]
+
+    def test_rejects_unknown_format(self, tmp_path: Path):
+        path = tmp_path / "sites.yaml"
+        path.write_text("")
+        with pytest.raises(ValueError, match="Unknown site catalogue format"):
+            load_catalogue(path)
+
+    def test_rejects_missing_field(self, tmp_path: Path):
+        path = tmp_path / "sites.jsonl"
+        path.write_text('{"domain": "news.com", "category": "IAB12", "min_floor": 0.5}\n')
+        with pytest.raises(ValueError, match="max_floor"):
+            load_catalogue(path)
+
+    def test_rejects_empty_catalogue(self, tmp_path: Path):
+        path = tmp_path / "sites.csv"
+        path.write_text("domain,category,min_floor,max_floor\n")
+        with pytest.raises(ValueError, match="no sites"):
+            load_catalogue(path)
@@ -0,0 +1,143 @@
+"""Unit tests for src.simulator"""
+import numpy as np
+import pytest
+
+from src.advertiser.campaigns import Campaign, Creative
+from src.advertiser.config import AdvertiserConfig, ServerConfig
+from src.publisher import metrics as publisher_metrics
+from src.publisher.config import PublisherConfig
+from src.latency import Distribution
+from src.simulator import EventLoop, SimulatedBidder, Simulator
+from src.ssp import metrics as ssp_metrics
+from src.ssp.config import CircuitBreakerConfig, SSPConfig
+
+
+def _bidder(
+    advertiser_id: str, port: int, latency: str, error_rate: float = 0.0, campaigns: tuple[Campaign, ...] = ()
+) -> SimulatedBidder:
+    config = AdvertiserConfig(
+        server=ServerConfig(port=port), advertiser_id=advertiser_id, min_bid=1.0, max_bid=5.0, campaigns=campaigns
+    )
+    return SimulatedBidder(f"http://sim:{port}/bid", config, Distribution(latency, np.random.default_rng(0)), error_rate)
+
+
+def _simulator(bidders: list[SimulatedBidder], seed: int = 7, **ssp_overrides) -> Simulator:
+    rng = np.random.default_rng(seed)
+    return Simulator(
+        SSPConfig(max_bid_response_time_ms=100, auction_margin_ms=5, **ssp_overrides),
+        PublisherConfig(domain="sim.example.com", category="IAB1", min_floor=0.5, max_floor=1.0,
+                        request_interval_ms=100),
+        bidders,
+        network=Distribution("constant:1", rng),
+        ssp_latency=Distribution("constant:0.5", rng),
+        seed=seed,
+    )
+
+
+class TestDistribution:
+
+    @pytest.mark.parametrize("spec, mean", [
+        ("constant:5", 5.0),
+        ("uniform:10,30", 20.0),
+        ("exponential:20", 20.0),
+        ("normal:30,2", 30.0),
+    ])
+    def test_sample_mean(self, spec, mean):
+        dist = Distribution(spec, np.random.default_rng(1))
+        samples = [dist.sample() for _ in range(20_000)]
+        assert np.mean(samples) == pytest.approx(mean, rel=0.05)
+
+    def test_lognormal_median(self):
+        dist = Distribution("lognormal:30,0.5", np.random.default_rng(1))
+        assert np.median(dist.sample_block(20_000)) == pytest.approx(30.0, rel=0.05)
+
+    @pytest.mark.parametrize("spec", ["gamma:1", "uniform:1", "constant:x", "normal:-1,2"])
+    def test_rejects_invalid_specs(self, spec):
+        with pytest.raises(ValueError):
+            Distribution(spec)
+
+
+class TestEventLoop:
+
+    def test_runs_events_in_time_then_scheduling_order(self):
+        loop = EventLoop()
+        seen = []
+        loop.schedule(2.0, seen.append, "late")
+        loop.schedule(1.0, seen.append, "first")
+        loop.schedule(1.0, seen.append, "second")
+        loop.run()
+        assert seen == ["first", "second", "late"]
+        assert loop.now == 2.0
+        assert loop.processed == 3
+
+    def test_callbacks_can_schedule_more_events(self):
+        loop = EventLoop()
+        times = []
+
+        def tick(n):
+            times.append(loop.time())
+            if n:
+                loop.schedule(loop.now + 0.5, tick, n - 1)
+
+        loop.schedule(0.0, tick, 3)
+        loop.run()
+        assert times == [0.0, 0.5, 1.0, 1.5]
+
+
+class TestSimulator:
+
+    def test_open_loop_runs_faster_than_real_time(self):
+        before = ssp_metrics.auctions.value("bid_won")
+        sim = _simulator([_bidder("a", 1, "constant:10"), _bidder("b", 2, "constant:20")])
+        sim.run(duration_s=60.0, rate_rps=100.0)
+        assert sim.auctions == pytest.approx(6000, rel=0.1)
+        assert sim.loop.now == pytest.approx(60.0, abs=0.1)
+        # Both bidders meet every floor (bids >= 1.0 >= max floor), so every auction fills.
+        assert ssp_metrics.auctions.value("bid_won") - before == sim.auctions
+
+    def test_same_seed_same_outcome(self):
+        def run(seed):
+            before = ssp_metrics.bidder_wins.value("http://sim:1/bid")
+            sim = _simulator([_bidder("a", 1, "constant:10"), _bidder("b", 2, "constant:10")], seed=seed)
+            sim.run(duration_s=10.0, rate_rps=50.0)
+            return sim.auctions, ssp_metrics.bidder_wins.value("http://sim:1/bid") - before
+
+        assert run(3) == run(3)
+
+    def test_slow_bidder_times_out_and_trips_breaker(self):
+        url = "http://sim:3/bid"
+        before = ssp_metrics.bidder_requests.value(url, "timeout")
+        sim = _simulator(
+            [_bidder("slow", 3, "constant:500")],
+            circuit_breaker=CircuitBreakerConfig(failure_threshold=3, window_s=10.0, open_duration_s=30.0),
+        )
+        sim.run(duration_s=10.0, rate_rps=100.0)
+
+        timeouts = ssp_metrics.bidder_requests.value(url, "timeout") - before
+        assert sim.circuit_breakers[url].times_opened == 1
+        # Failures are learned at the deadline, so a few more calls slip out before the breaker opens.
+        assert 3 <= timeouts < 20
+        assert timeouts < sim.auctions
+
+    def test_closed_loop_waits_for_each_answer(self):
+        before = publisher_metrics.requests_sent.value("bid_won")
+        sim = _simulator([_bidder("a", 4, "constant:10")])
+        sim.run(duration_s=10.0)
+        # Each round trip: 1ms + (1 + 10 + 1)ms + 0.5ms + 1ms, then a 100ms pause.
+        assert sim.auctions == pytest.approx(10.0 / 0.1145, abs=1)
+        assert publisher_metrics.requests_sent.value("bid_won") - before == sim.auctions
+
+    def test_campaigns_decide_bids(self):
+        url = "http://sim:5/bid"
+        before_bids = ssp_metrics.bidder_requests.value(url, "bid")
+        before_no_bids = ssp_metrics.bidder_requests.value(url, "no_bid")
+        # Floors are uniform in [0.5, 1.0]; a 0.75 max CPM affords about half of them.
+        campaign = Campaign("c1", 0.75, (Creative("ad-1"),))
+        sim = _simulator([_bidder("a", 5, "constant:10", campaigns=(campaign,))])
+        sim.run(duration_s=20.0, rate_rps=100.0)
+
+        bids = ssp_metrics.bidder_requests.value(url, "bid") - before_bids
+        no_bids = ssp_metrics.bidder_requests.value(url, "no_bid") - before_no_bids
+        assert bids + no_bids == sim.auctions
+        assert bids / sim.auctions == pytest.approx(0.5, abs=0.05)
+        assert sim.circuit_breakers[url].times_opened == 0
@@ -0,0 +1,103 @@
+"""Unit tests for src.ssp.admission.AdmissionController"""
+import asyncio
+
+import pytest
+
+from src.ssp.admission import AdmissionController, AdmissionRejected
+from src.ssp.config import AdmissionConfig
+
+
+@pytest.fixture
+def controller() -> AdmissionController:
+    return AdmissionController(AdmissionConfig(max_concurrent_auctions=2, max_queue=1, retry_after_s=3))
+
+
+class TestAdmissionController:
+
+    async def test_admits_up_to_capacity_without_waiting(self, controller: AdmissionController):
+        await controller.acquire(timeout=0)
+        await controller.acquire(timeout=0)
+        assert controller.active == 2
+        assert controller.queued == 0
+
+    async def test_rejects_at_capacity_with_no_wait_budget(self, controller: AdmissionController):
+        await controller.acquire(timeout=0)
+        await controller.acquire(timeout=0)
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire(timeout=0)
+        assert exc_info.value.retry_after_s == 3
+        assert controller.rejected == 1
+
+    async def test_queued_request_gets_released_slot(self, controller: AdmissionController):
+        await controller.acquire(timeout=0)
+        await controller.acquire(timeout=0)
+        waiter = asyncio.create_task(controller.acquire(timeout=1.0))
+        await asyncio.sleep(0)
+        assert controller.queued == 1
+
+        controller.release()
+        await waiter
+        assert controller.active == 2
+        assert controller.queued == 0
+
+    async def test_rejects_when_queue_is_full(self, controller: AdmissionController):
+        await controller.acquire(timeout=0)
+        await controller.acquire(timeout=0)
+        waiter = asyncio.create_task(controller.acquire(timeout=1.0))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire(timeout=1.0)
+        waiter.cancel()
+
+    async def test_queue_wait_times_out(self, controller: AdmissionController):
+        await controller.acquire(timeout=0)
+        await controller.acquire(timeout=0)
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire(timeout=0.01)
+        assert controller.queued == 0
+        assert controller.rejected == 1
+
+    async def test_waiters_are_admitted_in_arrival_order(self):
+        controller = AdmissionController(AdmissionConfig(max_concurrent_auctions=1, max_queue=10))
+        await controller.acquire(timeout=0)
+        order = []
+
+        async def wait(name):
+            await controller.acquire(timeout=1.0)
+            order.append(name)
+
+        tasks = [asyncio.create_task(wait(name)) for name in ("a", "b", "c")]
+        await asyncio.sleep(0)
+        for _ in tasks:
+            controller.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b", "c"]
+
+    async def test_cancelled_waiter_does_not_leak_slot(self, controller: AdmissionController):
+        await controller.acquire(timeout=0)
+        await controller.acquire(timeout=0)
+        waiter = asyncio.create_task(controller.acquire(timeout=1.0))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        controller.release()
+        controller.release()
+        assert controller.active == 0
+        assert controller.queued == 0
+
+    async def test_slot_releases_on_exit(self, controller: AdmissionController):
+        async with controller.slot(timeout=0):
+            assert controller.active == 1
+        assert controller.active == 0
+
+    def test_to_dict(self, controller: AdmissionController):
+        assert controller.to_dict() == {
+            "active": 0,
+            "queued": 0,
+            "rejected": 0,
+            "max_concurrent_auctions": 2,
+            "max_queue": 1,
+        }
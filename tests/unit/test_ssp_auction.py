@@ -0,0 +1,145 @@
+"""Unit tests for src.ssp.auction (clearing strategies, scalar and batch)."""
+import numpy as np
+import pytest
+
+from src.ssp.auction import (
+    AuctionStrategy,
+    ClearingResult,
+    FirstPriceAuction,
+    SecondPriceAuction,
+    SoftFloorAuction,
+    create_strategy,
+)
+from src.ssp.config import AuctionConfig
+from src.ssp.models import Bid
+
+
+def _bids(*prices: float) -> list[Bid]:
+    return [Bid(request_id="r", advertiser_id=f"adv-{i}", bid_price=p, ad_id=f"ad-{i}") for i, p in enumerate(prices)]
+
+
+class TestFirstPrice:
+
+    def test_highest_bid_wins_and_pays_own_bid(self):
+        assert FirstPriceAuction().clear(_bids(1.0, 3.0, 2.0), floor=0.5) == ClearingResult(1, 3.0)
+
+    def test_bids_below_floor_are_ignored(self):
+        assert FirstPriceAuction().clear(_bids(1.0, 0.4), floor=1.5) is None
+
+    def test_no_bids_means_no_winner(self):
+        assert FirstPriceAuction().clear([], floor=0.0) is None
+
+    def test_per_bidder_reserve_excludes_bid(self):
+        strategy = FirstPriceAuction(reserve_prices={"adv-1": 5.0})
+        assert strategy.clear(_bids(2.0, 3.0), floor=1.0) == ClearingResult(0, 2.0)
+
+
+class TestSecondPrice:
+
+    def test_winner_pays_runner_up_plus_increment(self):
+        assert SecondPriceAuction(increment=0.01).clear(_bids(2.0, 3.0), floor=1.0) == ClearingResult(1, 2.01)
+
+    def test_single_bidder_pays_floor_plus_increment(self):
+        assert SecondPriceAuction(increment=0.01).clear(_bids(3.0), floor=1.0) == ClearingResult(0, 1.01)
+
+    def test_price_never_exceeds_own_bid(self):
+        assert SecondPriceAuction(increment=0.5).clear(_bids(3.0, 2.9), floor=1.0).price == 3.0
+
+    def test_winner_reserve_acts_as_floor(self):
+        strategy = SecondPriceAuction(increment=0.0, reserve_prices={"adv-1": 2.5})
+        assert strategy.clear(_bids(1.0, 3.0), floor=0.5) == ClearingResult(1, 2.5)
+
+
+class TestSoftFloor:
+
+    def test_between_floors_pays_first_price(self):
+        strategy = SoftFloorAuction(soft_floor_multiplier=2.0, increment=0.0)
+        assert strategy.clear(_bids(1.5, 1.2), floor=1.0) == ClearingResult(0, 1.5)
+
+    def test_above_soft_floor_pays_second_price(self):
+        strategy = SoftFloorAuction(soft_floor_multiplier=2.0, increment=0.0)
+        assert strategy.clear(_bids(5.0, 3.0), floor=1.0) == ClearingResult(0, 3.0)
+
+    def test_soft_floor_is_minimum_second_price(self):
+        strategy = SoftFloorAuction(soft_floor_multiplier=2.0, increment=0.0)
+        assert strategy.clear(_bids(5.0, 1.1), floor=1.0) == ClearingResult(0, 2.0)
+
+
+class TestClearBatch:
+
+    @pytest.mark.parametrize("strategy", [
+        FirstPriceAuction(),
+        SecondPriceAuction(increment=0.01),
+        SoftFloorAuction(soft_floor_multiplier=1.5, increment=0.01),
+        SecondPriceAuction(reserve_prices={"adv-2": 3.0}),
+    ])
+    def test_matches_scalar_clearing(self, strategy):
+        rng = np.random.default_rng(7)
+        bids = rng.uniform(0.0, 5.0, size=(500, 4))
+        bids[rng.random(bids.shape) < 0.3] = np.nan
+        floors = rng.uniform(0.0, 3.0, size=500)
+        reserves = np.array([strategy.reserve_prices.get(f"adv-{i}", 0.0) for i in range(4)])
+
+        winners, prices = strategy.clear_batch(bids, floors, reserves)
+
+        for row in range(500):
+            present = [(i, p) for i, p in enumerate(bids[row]) if not np.isnan(p)]
+            result = strategy.clear(
+                [Bid("r", f"adv-{i}", p, "ad") for i, p in present], float(floors[row])
+            )
+            if result is None:
+                assert winners[row] == -1
+                assert np.isnan(prices[row])
+            else:
+                assert winners[row] == present[result.winner][0]
+                assert prices[row] == pytest.approx(result.price)
+
+    def test_single_bidder_column(self):
+        winners, prices = SecondPriceAuction(increment=0.0).clear_batch(
+            np.array([[2.0], [np.nan]]), np.array([1.0, 1.0])
+        )
+        assert winners.tolist() == [0, -1]
+        assert prices[0] == 1.0
+
+    def test_reserves_from_column_bidders(self):
+        strategy = SecondPriceAuction(increment=0.0, reserve_prices={"adv-1": 3.0})
+        bids = np.array([[2.0, 2.5], [4.0, 1.0]])
+        winners, prices = strategy.clear_batch(bids, np.array([1.0, 1.0]), bidders=["adv-1", "adv-2"])
+        assert winners.tolist() == [1, 0]
+        assert prices.tolist() == [1.0, 3.0]
+
+    def test_reserve_prices_require_reserves_or_bidders(self):
+        with pytest.raises(ValueError, match="reserve_prices"):
+            SecondPriceAuction(reserve_prices={"adv-1": 3.0}).clear_batch(np.array([[2.0]]), np.array([1.0]))
+
+    def test_no_bidder_columns_fills_nothing(self):
+        winners, prices = SecondPriceAuction().clear_batch(np.empty((3, 0)), np.ones(3))
+        assert winners.tolist() == [-1, -1, -1]
+        assert np.isnan(prices).all()
+
+
+class TestCreateStrategy:
+
+    @pytest.mark.parametrize("name, cls", [
+        ("first_price", FirstPriceAuction),
+        ("second_price", SecondPriceAuction),
+        ("soft_floor", SoftFloorAuction),
+    ])
+    def test_builds_configured_strategy(self, name, cls):
+        assert isinstance(create_strategy(AuctionConfig(strategy=name)), cls)
+
+    def test_passes_reserve_prices(self):
+        strategy = create_strategy(AuctionConfig(reserve_prices={"adv-1": 2.0}))
+        assert strategy.reserve_prices == {"adv-1": 2.0}
+
+    def test_passes_strategy_settings(self):
+        strategy = create_strategy(AuctionConfig(strategy="soft_floor", soft_floor_multiplier=2.0, increment=0.05))
+        assert (strategy.soft_floor_multiplier, strategy.increment) == (2.0, 0.05)
+
+    def test_base_class_is_abstract(self):
+        with pytest.raises(TypeError, match="abstract"):
+            AuctionStrategy()
+
+    def test_unknown_strategy_raises(self):
+        with pytest.raises(ValueError, match="Unknown auction strategy"):
+            create_strategy(AuctionConfig(strategy="vickrey-clarke-groves"))
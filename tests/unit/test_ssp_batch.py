@@ -0,0 +1,60 @@
+"""Unit tests for src.ssp.batch.parse_batch"""
+import json
+import uuid
+
+import pytest
+
+from src.ssp.batch import parse_batch
+from src.ssp.models import BidRequestIn
+
+
+def _item(**overrides) -> dict:
+    item = {"id": str(uuid.uuid4()), "domain": "test.com", "category": "IAB1", "bid_floor": 1.0}
+    item.update(overrides)
+    return item
+
+
+class TestJsonArray:
+
+    def test_valid_items_are_validated(self):
+        body = json.dumps([_item(), _item(category="iab2")]).encode()
+        items = parse_batch(body, "application/json", max_items=10)
+        assert all(isinstance(item, BidRequestIn) for item in items)
+        assert items[1].category == "IAB2"
+
+    def test_invalid_item_reported_inline(self):
+        body = json.dumps([_item(), _item(id="not-a-uuid"), _item()]).encode()
+        items = parse_batch(body, "application/json", max_items=10)
+        assert isinstance(items[0], BidRequestIn)
+        assert items[1]["status"] == "rejected"
+        assert items[1]["reason"] == "validation_error"
+        assert items[1]["errors"][0]["field"] == "id"
+        assert isinstance(items[2], BidRequestIn)
+
+    def test_non_array_body_raises(self):
+        with pytest.raises(ValueError, match="JSON array"):
+            parse_batch(json.dumps(_item()).encode(), "application/json", max_items=10)
+
+    def test_malformed_body_raises(self):
+        with pytest.raises(ValueError, match="not valid JSON"):
+            parse_batch(b"[{", "application/json", max_items=10)
+
+    def test_too_many_items_raises(self):
+        body = json.dumps([_item(), _item()]).encode()
+        with pytest.raises(ValueError, match="exceeds limit"):
+            parse_batch(body, "application/json", max_items=1)
+
+
+class TestNdjson:
+
+    def test_lines_are_parsed_in_order(self):
+        first, second = _item(), _item()
+        body = (json.dumps(first) + "\n\n" + json.dumps(second) + "\n").encode()
+        items = parse_batch(body, "application/x-ndjson; charset=utf-8", max_items=10)
+        assert [item.id for item in items] == [first["id"], second["id"]]
+
+    def test_malformed_line_reported_inline(self):
+        body = (json.dumps(_item()) + "\n{oops\n").encode()
+        items = parse_batch(body, "application/x-ndjson", max_items=10)
+        assert isinstance(items[0], BidRequestIn)
+        assert items[1]["reason"] == "invalid_json"
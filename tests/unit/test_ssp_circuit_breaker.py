@@ -0,0 +1,92 @@
+"""Unit tests for src.ssp.circuit_breaker.CircuitBreaker"""
+import pytest
+
+from src.ssp.circuit_breaker import BreakerState, CircuitBreaker
+from src.ssp.config import CircuitBreakerConfig
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock: FakeClock) -> CircuitBreaker:
+    config = CircuitBreakerConfig(failure_threshold=3, window_s=10.0, open_duration_s=5.0, half_open_max_probes=1)
+    return CircuitBreaker("http://adv.test/bid", config, clock=clock)
+
+
+class TestClosedState:
+
+    def test_starts_closed_and_allows_traffic(self, breaker: CircuitBreaker):
+        assert breaker.state is BreakerState.CLOSED
+        assert breaker.allow_request() is True
+
+    def test_trips_after_threshold_failures(self, breaker: CircuitBreaker):
+        for _ in range(3):
+            breaker.record_failure()
+        assert breaker.state is BreakerState.OPEN
+        assert breaker.times_opened == 1
+
+    def test_failures_outside_window_do_not_count(self, breaker: CircuitBreaker, clock: FakeClock):
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now = 11.0
+        breaker.record_failure()
+        assert breaker.state is BreakerState.CLOSED
+        assert breaker.recent_failures() == 1
+
+
+class TestOpenState:
+
+    def test_open_breaker_skips_advertiser(self, breaker: CircuitBreaker):
+        for _ in range(3):
+            breaker.record_failure()
+        assert breaker.allow_request() is False
+
+    def test_moves_to_half_open_after_cooldown(self, breaker: CircuitBreaker, clock: FakeClock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 5.0
+        assert breaker.allow_request() is True
+        assert breaker.state is BreakerState.HALF_OPEN
+
+
+class TestHalfOpenState:
+
+    @pytest.fixture
+    def half_open(self, breaker: CircuitBreaker, clock: FakeClock) -> CircuitBreaker:
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 5.0
+        assert breaker.allow_request() is True
+        return breaker
+
+    def test_only_limited_probes_allowed(self, half_open: CircuitBreaker):
+        assert half_open.allow_request() is False
+
+    def test_successful_probe_closes(self, half_open: CircuitBreaker):
+        half_open.record_success()
+        assert half_open.state is BreakerState.CLOSED
+        assert half_open.allow_request() is True
+
+    def test_failed_probe_reopens(self, half_open: CircuitBreaker):
+        half_open.record_failure()
+        assert half_open.state is BreakerState.OPEN
+        assert half_open.times_opened == 2
+        assert half_open.allow_request() is False
+
+
+class TestToDict:
+
+    def test_reports_state_and_counters(self, breaker: CircuitBreaker):
+        breaker.record_failure()
+        assert breaker.to_dict() == {"state": "closed", "recent_failures": 1, "times_opened": 0}
@@ -0,0 +1,55 @@
+"""Unit tests for src.ssp.codec (encode_bid_request, decode_bid)."""
+import json
+import uuid
+
+import orjson
+
+from src.ssp.codec import decode_bid, encode_bid_request
+from src.ssp.models import Bid, BidRequestIn
+
+
+def _bid_payload(**overrides) -> dict:
+    payload = {
+        "request_id": str(uuid.uuid4()),
+        "advertiser_id": "adv-001",
+        "bid_price": 2.5,
+        "ad_id": str(uuid.uuid4()),
+    }
+    payload.update(overrides)
+    return payload
+
+
+class TestEncodeBidRequest:
+
+    def test_round_trips_normalized_fields(self):
+        bid_request = BidRequestIn(id=str(uuid.uuid4()), domain="Test.COM", category="iab1", bid_floor=1.5)
+        encoded = encode_bid_request(bid_request)
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == bid_request.model_dump()
+
+
+class TestDecodeBid:
+
+    def test_decodes_valid_response(self):
+        payload = _bid_payload()
+        bid = decode_bid(orjson.dumps(payload))
+        assert bid == Bid(**payload)
+
+    def test_integer_price_becomes_float(self):
+        bid = decode_bid(orjson.dumps(_bid_payload(bid_price=3)))
+        assert isinstance(bid.bid_price, float)
+
+    def test_extra_fields_are_ignored(self):
+        bid = decode_bid(orjson.dumps(_bid_payload(creative="<html>")))
+        assert bid is not None
+
+    def test_malformed_json_returns_none(self):
+        assert decode_bid(b"{not json") is None
+
+    def test_missing_field_returns_none(self):
+        payload = _bid_payload()
+        del payload["bid_price"]
+        assert decode_bid(orjson.dumps(payload)) is None
+
+    def test_non_object_returns_none(self):
+        assert decode_bid(b"[1, 2, 3]") is None
@@ -1,7 +1,7 @@
 """Unit tests for src.ssp.config (ServerConfig, SSPConfig, get_config)."""
 import pytest
 
-from src.ssp.config import ServerConfig, SSPConfig, get_config, ENVIRONMENTS
+from src.ssp.config import HttpClientConfig, ServerConfig, SSPConfig, get_config, ENVIRONMENTS
 
 class TestServerConfigDefaults:
 
@@ -40,6 +40,14 @@ class TestSSPConfigDefaults:
         cfg = SSPConfig()
         assert isinstance(cfg.server, ServerConfig)
 
+    def test_http_client_is_http_client_config_instance(self):
+        cfg = SSPConfig()
+        assert isinstance(cfg.http_client, HttpClientConfig)
+
+    def test_keepalive_pool_fits_in_connection_limit(self):
+        cfg = HttpClientConfig()
+        assert cfg.max_keepalive_connections <= cfg.max_connections
+
 
 class TestGetConfig:
 
@@ -0,0 +1,89 @@
+"""Unit tests for src.ssp.deadline (ArrivalTimeMiddleware, auction_deadline, gather_until_deadline)."""
+import asyncio
+from types import SimpleNamespace
+
+from fastapi import FastAPI, Request
+from httpx import AsyncClient, ASGITransport
+
+from src.ssp.deadline import ArrivalTimeMiddleware, auction_deadline, gather_until_deadline
+
+
+async def _answer(value, delay: float):
+    await asyncio.sleep(delay)
+    return value
+
+
+class TestGatherUntilDeadline:
+
+    async def test_empty_input_returns_empty_list(self):
+        assert await gather_until_deadline([], deadline=0.0) == []
+
+    async def test_returns_all_results_in_order(self):
+        loop = asyncio.get_running_loop()
+        results = await gather_until_deadline(
+            [_answer("a", 0.02), _answer("b", 0.0)], deadline=loop.time() + 1.0
+        )
+        assert results == ["a", "b"]
+
+    async def test_returns_early_when_all_answer(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await gather_until_deadline([_answer(1, 0.01)], deadline=start + 5.0)
+        assert loop.time() - start < 1.0
+
+    async def test_late_results_are_dropped_and_cancelled(self):
+        loop = asyncio.get_running_loop()
+        cancelled = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        start = loop.time()
+        results = await gather_until_deadline([_answer("fast", 0.0), slow()], deadline=start + 0.05)
+
+        assert results == ["fast", None]
+        assert loop.time() - start < 1.0
+        await asyncio.wait_for(cancelled.wait(), timeout=1.0)
+
+    async def test_failed_coroutine_reported_as_none(self):
+        async def boom():
+            raise RuntimeError("advertiser exploded")
+
+        loop = asyncio.get_running_loop()
+        results = await gather_until_deadline([boom(), _answer(2, 0.0)], deadline=loop.time() + 1.0)
+        assert results == [None, 2]
+
+
+class TestAuctionDeadline:
+
+    async def test_measured_from_arrival_time(self):
+        request = SimpleNamespace(state=SimpleNamespace(received_at=100.0))
+        assert auction_deadline(request, budget_ms=95) == 100.095
+
+    async def test_falls_back_to_now_without_arrival_stamp(self):
+        loop = asyncio.get_running_loop()
+        before = loop.time()
+        deadline = auction_deadline(SimpleNamespace(state=SimpleNamespace()), budget_ms=100)
+        assert before + 0.1 <= deadline <= loop.time() + 0.1
+
+
+class TestArrivalTimeMiddleware:
+
+    async def test_stamps_request_state(self):
+        app = FastAPI()
+        app.add_middleware(ArrivalTimeMiddleware)
+
+        @app.get("/stamp")
+        async def stamp(request: Request):
+            return {"received_at": request.state.received_at}
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            before = asyncio.get_running_loop().time()
+            response = await client.get("/stamp")
+
+        assert response.json()["received_at"] >= before
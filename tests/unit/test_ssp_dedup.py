@@ -0,0 +1,115 @@
+"""Unit tests for src.ssp.dedup.DedupCache"""
+import asyncio
+
+import pytest
+
+from src.ssp.config import DedupConfig
+from src.ssp.dedup import DedupCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock: FakeClock) -> DedupCache:
+    return DedupCache(DedupConfig(ttl_s=10.0, max_entries=3), clock=clock)
+
+
+def _counting_auction(result: dict, calls: list, delay: float = 0.0):
+    async def run():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+    return run
+
+
+class TestDedupCache:
+
+    async def test_first_request_runs_auction(self, cache: DedupCache):
+        calls = []
+        result = await cache.get_or_run("a", _counting_auction({"status": "no_bid"}, calls))
+        assert result == {"status": "no_bid"}
+        assert calls == [1]
+        assert cache.misses == 1
+
+    async def test_completed_duplicate_gets_cached_outcome(self, cache: DedupCache):
+        calls = []
+        await cache.get_or_run("a", _counting_auction({"status": "bid_won"}, calls))
+        result = await cache.get_or_run("a", _counting_auction({"status": "other"}, calls))
+        assert result == {"status": "bid_won"}
+        assert calls == [1]
+        assert cache.hits == 1
+
+    async def test_in_flight_duplicate_awaits_first_auction(self, cache: DedupCache):
+        calls = []
+        first = asyncio.create_task(cache.get_or_run("a", _counting_auction({"n": 1}, calls, delay=0.05)))
+        await asyncio.sleep(0)
+        second = await cache.get_or_run("a", _counting_auction({"n": 2}, calls))
+        assert second == {"n": 1}
+        assert await first == {"n": 1}
+        assert calls == [1]
+        assert cache.in_flight_hits == 1
+
+    async def test_entries_expire_after_ttl(self, cache: DedupCache, clock: FakeClock):
+        calls = []
+        await cache.get_or_run("a", _counting_auction({}, calls))
+        clock.now = 10.0
+        await cache.get_or_run("a", _counting_auction({}, calls))
+        assert calls == [1, 1]
+
+    async def test_size_cap_evicts_oldest(self, cache: DedupCache):
+        calls = []
+        for request_id in ["a", "b", "c", "d"]:
+            await cache.get_or_run(request_id, _counting_auction({}, calls))
+        assert len(cache) == 3
+        await cache.get_or_run("a", _counting_auction({}, calls))
+        assert cache.misses == 5
+
+    async def test_failed_auction_is_not_cached(self, cache: DedupCache):
+        async def boom():
+            raise RuntimeError("fan-out failed")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_run("a", boom)
+        calls = []
+        await cache.get_or_run("a", _counting_auction({}, calls))
+        assert calls == [1]
+
+    async def test_duplicate_reruns_when_first_caller_is_cancelled(self, cache: DedupCache):
+        calls = []
+        first = asyncio.create_task(cache.get_or_run("a", _counting_auction({"n": 1}, calls, delay=1.0)))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_run("a", _counting_auction({"n": 2}, calls)))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == {"n": 2}
+        assert first.cancelled()
+        assert calls == [1, 1]
+
+    async def test_cancelled_duplicate_leaves_first_auction_running(self, cache: DedupCache):
+        calls = []
+        first = asyncio.create_task(cache.get_or_run("a", _counting_auction({"n": 1}, calls, delay=0.05)))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_run("a", _counting_auction({"n": 2}, calls)))
+        await asyncio.sleep(0)
+        second.cancel()
+        assert await first == {"n": 1}
+        assert second.cancelled()
+        assert calls == [1]
+
+    async def test_to_dict_reports_counters(self, cache: DedupCache):
+        await cache.get_or_run("a", _counting_auction({}, []))
+        await cache.get_or_run("a", _counting_auction({}, []))
+        assert cache.to_dict() == {
+            "entries": 1, "max_entries": 3, "hits": 1, "in_flight_hits": 0, "misses": 1,
+        }
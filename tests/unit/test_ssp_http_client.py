@@ -0,0 +1,40 @@
+"""Unit tests for src.ssp.http_client (ConnectionStats, create_client)."""
+import httpx
+
+from src.ssp.config import HttpClientConfig
+from src.ssp.http_client import ConnectionStats, create_client
+
+
+class TestConnectionStats:
+
+    def test_starts_at_zero(self):
+        stats = ConnectionStats()
+        assert stats.to_dict() == {"requests": 0, "connections_opened": 0, "connections_reused": 0}
+
+    async def test_trace_counts_completed_tcp_connects(self):
+        stats = ConnectionStats()
+        await stats.trace("connection.connect_tcp.started", {})
+        await stats.trace("connection.connect_tcp.complete", {})
+        await stats.trace("http11.send_request_headers.complete", {})
+        assert stats.connections_opened == 1
+
+    def test_reused_is_requests_minus_opened(self):
+        stats = ConnectionStats(requests=10, connections_opened=3)
+        assert stats.connections_reused == 7
+
+    def test_reused_never_negative(self):
+        stats = ConnectionStats(requests=1, connections_opened=2)
+        assert stats.connections_reused == 0
+
+
+class TestCreateClient:
+
+    async def test_timeout_taken_from_ms(self):
+        async with create_client(HttpClientConfig(), timeout_ms=250) as client:
+            assert client.timeout.read == 0.25
+
+    async def test_uses_injected_transport(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+        async with create_client(HttpClientConfig(), timeout_ms=100, transport=transport) as client:
+            response = await client.post("http://adv.test/bid", json={})
+            assert response.json() == {"ok": True}
@@ -0,0 +1,76 @@
+"""Unit tests for src.ssp.targeting (TargetingIndex, build_index)."""
+import pytest
+
+from src.ssp.config import BidderTargeting
+from src.ssp.targeting import TargetingIndex, build_index
+
+SPORTS = "http://sports.test/bid"
+NEWS = "http://news.test/bid"
+CHEAP = "http://cheap.test/bid"
+OPEN = "http://open.test/bid"
+
+
+@pytest.fixture
+def index() -> TargetingIndex:
+    return TargetingIndex([
+        BidderTargeting(url=SPORTS, allowed_categories=("IAB17",)),
+        BidderTargeting(url=NEWS, allowed_categories=("IAB12",), blocked_domains=("tabloid.com",)),
+        BidderTargeting(url=CHEAP, max_floor=1.0),
+        BidderTargeting(url=OPEN),
+    ])
+
+
+class TestEligible:
+
+    def test_allowed_category_matches(self, index: TargetingIndex):
+        assert index.eligible("IAB17", "espn.com", 0.5) == (SPORTS, CHEAP, OPEN)
+
+    def test_category_match_is_case_insensitive(self, index: TargetingIndex):
+        assert SPORTS in index.eligible("iab17", "espn.com", 0.5)
+
+    def test_blocked_domain_excludes_bidder(self, index: TargetingIndex):
+        assert index.eligible("IAB12", "tabloid.com", 0.5) == (CHEAP, OPEN)
+        assert index.eligible("IAB12", "times.com", 0.5) == (NEWS, CHEAP, OPEN)
+
+    def test_floor_above_max_floor_excludes_bidder(self, index: TargetingIndex):
+        assert CHEAP in index.eligible("IAB1", "a.com", 1.0)
+        assert CHEAP not in index.eligible("IAB1", "a.com", 1.01)
+
+    def test_allowed_domains_restrict_bidder(self):
+        index = TargetingIndex([BidderTargeting(url=OPEN, allowed_domains=("Premium.com",))])
+        assert index.eligible("IAB1", "premium.com", 0.0) == (OPEN,)
+        assert index.eligible("IAB1", "other.com", 0.0) == ()
+
+    def test_block_wins_over_allow(self):
+        index = TargetingIndex([
+            BidderTargeting(url=OPEN, allowed_categories=("IAB1",), blocked_categories=("IAB1",)),
+        ])
+        assert index.eligible("IAB1", "a.com", 0.0) == ()
+
+    def test_empty_index_has_no_bidders(self):
+        assert TargetingIndex().eligible("IAB1", "a.com", 0.0) == ()
+
+
+class TestRegister:
+
+    def test_register_adds_bidder(self, index: TargetingIndex):
+        index.register(BidderTargeting(url="http://new.test/bid", allowed_categories=("IAB3",)))
+        assert "http://new.test/bid" in index.eligible("IAB3", "a.com", 0.0)
+
+    def test_register_replaces_existing_rules(self, index: TargetingIndex):
+        index.register(BidderTargeting(url=SPORTS, allowed_categories=("IAB3",)))
+        assert SPORTS not in index.eligible("IAB17", "espn.com", 0.0)
+        assert SPORTS in index.eligible("IAB3", "espn.com", 0.0)
+        assert len(index.urls) == 4
+
+
+class TestBuildIndex:
+
+    def test_urls_without_rules_get_all_traffic(self):
+        index = build_index([OPEN, SPORTS], [BidderTargeting(url=SPORTS, allowed_categories=("IAB17",))])
+        assert index.urls == (OPEN, SPORTS)
+        assert index.eligible("IAB1", "a.com", 100.0) == (OPEN,)
+
+    def test_targeting_for_unlisted_url_is_registered(self):
+        index = build_index([], [BidderTargeting(url=NEWS)])
+        assert index.urls == (NEWS,)
@@ -0,0 +1,195 @@
+"""Unit tests for src.supervisor"""
+import multiprocessing
+import os
+import socket
+import time
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+
+from src.advertiser.config import discover_configs
+from src.supervisor import ServiceSpec, Supervisor, build_services, run_service, with_metrics_dirs
+
+fork = multiprocessing.get_context("fork")
+
+
+def _exit_immediately(_spec: ServiceSpec) -> None:
+    pass
+
+
+def _sleep_forever(_spec: ServiceSpec) -> None:
+    time.sleep(60)
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve_health(spec: ServiceSpec) -> None:
+    HTTPServer((spec.host, spec.port), _HealthHandler).serve_forever()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _spec(name: str, port: int) -> ServiceSpec:
+    return ServiceSpec(name=name, app="src.ssp.server:app", host="127.0.0.1", port=port)
+
+
+def _wait_until_dead(supervisor: Supervisor, name: str) -> None:
+    deadline = time.monotonic() + 5
+    while supervisor.is_alive(name) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestServiceSpec:
+
+    def test_base_url(self):
+        assert _spec("SSP", 8000).base_url == "http://127.0.0.1:8000"
+
+    def test_base_url_for_wildcard_host_uses_loopback(self):
+        spec = ServiceSpec(name="SSP", app="src.ssp.server:app", host="0.0.0.0", port=8000)
+        assert spec.base_url == "http://127.0.0.1:8000"
+
+
+class TestWithMetricsDirs:
+
+    def test_multi_worker_services_get_their_own_directory(self, tmp_path):
+        single = _spec("SSP", 8000)
+        pooled = replace(_spec("Advertiser adv-001", 8001), workers=4)
+        preset = replace(_spec("Publisher", 8002), workers=2, env={"RTB_METRICS_DIR": "/elsewhere"})
+        assert with_metrics_dirs([single, pooled, preset], tmp_path) == [
+            single,
+            replace(pooled, env={"RTB_METRICS_DIR": str(tmp_path / "Advertiser_adv-001")}),
+            preset,
+        ]
+
+
+class TestRunService:
+
+    def test_tells_the_app_its_real_worker_count(self, monkeypatch):
+        import uvicorn
+
+        seen = {}
+        monkeypatch.setattr(os, "environ", dict(os.environ))
+        monkeypatch.setattr(uvicorn, "run", lambda app, **kwargs: seen.update(os.environ))
+        run_service(ServiceSpec(name="adv", app="src.advertiser.server:app", host="127.0.0.1", port=1, workers=3))
+        assert seen["RTB_WORKERS"] == "3"
+
+    def test_runs_the_exit_hook_after_uvicorn(self, monkeypatch):
+        import uvicorn
+
+        calls = []
+        monkeypatch.setattr(os, "environ", dict(os.environ))
+        monkeypatch.setattr(uvicorn, "run", lambda app, **kwargs: calls.append("run"))
+        run_service(replace(_spec("adv", 1), on_exit=lambda: calls.append("exit")))
+        assert calls == ["run", "exit"]
+
+    def test_advertisers_clean_up_their_fault_state(self):
+        services = {spec.name: spec for spec in build_services("dev")}
+        assert services["Advertiser adv-001"].on_exit.args == ("adv-001",)
+        assert services["SSP"].on_exit is None and services["Publisher"].on_exit is None
+
+
+class TestSupervisor:
+
+    def test_rejects_port_clash(self):
+        with pytest.raises(ValueError, match="Port 8002"):
+            Supervisor([_spec("adv-002", 8002), _spec("Publisher", 8002)])
+
+    def test_restarts_crashed_child(self):
+        supervisor = Supervisor([_spec("SSP", 8000)], target=_exit_immediately, context=fork)
+        supervisor.start()
+        _wait_until_dead(supervisor, "SSP")
+
+        assert supervisor.check_children() == ["SSP"]
+        supervisor.shutdown()
+
+    def test_gives_up_on_crash_loop(self):
+        supervisor = Supervisor([_spec("SSP", 8000)], max_restarts=2, target=_exit_immediately, context=fork)
+        supervisor.start()
+        with pytest.raises(RuntimeError, match="giving up"):
+            for _ in range(3):
+                _wait_until_dead(supervisor, "SSP")
+                supervisor.check_children()
+        supervisor.shutdown()
+
+    def test_healthy_children_are_left_alone(self):
+        supervisor = Supervisor([_spec("SSP", 8000)], target=_sleep_forever, context=fork)
+        supervisor.start()
+        try:
+            assert supervisor.check_children() == []
+            assert supervisor.is_alive("SSP")
+        finally:
+            supervisor.shutdown(timeout=2)
+        assert not supervisor.is_alive("SSP")
+
+    async def test_wait_healthy_fails_fast_when_child_exits(self):
+        supervisor = Supervisor([_spec("SSP", 1)], target=_exit_immediately, context=fork)
+        supervisor.start()
+        _wait_until_dead(supervisor, "SSP")
+
+        started = time.monotonic()
+        assert await supervisor.wait_healthy(timeout=5, interval=0.01) is False
+        assert time.monotonic() - started < 1
+        supervisor.shutdown()
+
+    async def test_post_start_hook_runs_again_after_restart(self):
+        started = []
+        supervisor = Supervisor(
+            [_spec("Publisher", _free_port())],
+            target=_serve_health,
+            context=fork,
+            post_start={"Publisher": lambda url: started.append(url) or True},
+        )
+        supervisor.start()
+        try:
+            assert await supervisor.wait_healthy(timeout=5, interval=0.05)
+            supervisor._processes["Publisher"].kill()
+            _wait_until_dead(supervisor, "Publisher")
+
+            restarted = supervisor.check_children()
+            assert await supervisor.wait_healthy(timeout=5, interval=0.05, names=restarted)
+        finally:
+            supervisor.shutdown(timeout=2)
+        assert started == [supervisor.services[0].base_url] * 2
+
+    async def test_failed_post_start_hook_fails_wait_healthy(self):
+        supervisor = Supervisor(
+            [_spec("Publisher", _free_port())],
+            target=_serve_health,
+            context=fork,
+            post_start={"Publisher": lambda url: False},
+        )
+        supervisor.start()
+        try:
+            assert await supervisor.wait_healthy(timeout=5, interval=0.05) is False
+        finally:
+            supervisor.shutdown(timeout=2)
+
+
+class TestDiscoverConfigs:
+
+    def test_finds_every_advertiser_for_env(self, tmp_path: Path):
+        for name in ("adv002_dev.toml", "adv001_dev.toml", "adv001_prod.toml"):
+            (tmp_path / name).write_text("")
+        assert [p.name for p in discover_configs("dev", tmp_path)] == ["adv001_dev.toml", "adv002_dev.toml"]
+
+    def test_shipped_configs_have_unique_ports(self):
+        from src.advertiser.config import get_config
+        ports = [get_config(path).server.port for path in discover_configs("dev")]
+        assert len(ports) == len(set(ports))
+        assert 8002 not in ports  # the publisher's port
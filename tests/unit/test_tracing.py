@@ -0,0 +1,94 @@
+"""Unit tests for src.tracing (Tracer, TracingMiddleware)."""
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from src.tracing import TRACE_HEADER, Tracer, TracingMiddleware, current_trace_id
+
+
+@pytest.fixture
+def tracer() -> Tracer:
+    return Tracer("unit", sample_rate=0.0, capacity=5)
+
+
+class TestTracer:
+
+    def test_span_without_trace_is_noop(self, tracer: Tracer):
+        with tracer.span("work") as span:
+            span.set(outcome="ignored")
+        assert tracer.query() == []
+
+    def test_span_with_explicit_trace_is_recorded(self, tracer: Tracer):
+        with tracer.span("work", trace_id="t1", bidder="a") as span:
+            span.set(outcome="bid")
+        (recorded,) = tracer.query()
+        assert recorded["trace_id"] == "t1"
+        assert recorded["service"] == "unit"
+        assert recorded["name"] == "work"
+        assert recorded["attrs"] == {"bidder": "a", "outcome": "bid"}
+        assert recorded["duration_ms"] >= 0
+
+    def test_exception_is_noted_on_span(self, tracer: Tracer):
+        with pytest.raises(RuntimeError):
+            with tracer.span("work", trace_id="t1"):
+                raise RuntimeError("boom")
+        assert tracer.query()[0]["attrs"]["error"] == "RuntimeError"
+
+    def test_ring_buffer_keeps_newest(self, tracer: Tracer):
+        for i in range(8):
+            tracer.record("t", f"span-{i}", 0.0, 0.001)
+        names = [s["name"] for s in tracer.query()]
+        assert names == ["span-7", "span-6", "span-5", "span-4", "span-3"]
+
+    def test_query_filters_by_trace_and_limit(self, tracer: Tracer):
+        tracer.record("a", "one", 0.0, 0.001)
+        tracer.record("b", "two", 0.0, 0.001)
+        tracer.record("a", "three", 0.0, 0.001)
+        assert [s["name"] for s in tracer.query("a")] == ["three", "one"]
+        assert len(tracer.query(limit=1)) == 1
+
+    def test_sample_rate_zero_never_starts_trace(self, tracer: Tracer):
+        assert tracer.new_trace_id() is None
+
+    def test_sample_rate_one_always_starts_trace(self):
+        assert Tracer("unit", sample_rate=1.0).new_trace_id() is not None
+
+    def test_spans_exported_to_file(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        tracer = Tracer("unit", export_path=str(path))
+        tracer.record("t1", "work", 0.0, 0.002)
+        assert json.loads(path.read_text())["name"] == "work"
+
+
+class TestTracingMiddleware:
+
+    @pytest.fixture
+    def app(self, tracer: Tracer) -> FastAPI:
+        app = FastAPI()
+        app.add_middleware(TracingMiddleware, tracer=tracer)
+
+        @app.get("/work")
+        async def work():
+            with tracer.span("inner"):
+                pass
+            return {"trace_id": current_trace_id()}
+
+        return app
+
+    async def test_incoming_trace_id_is_joined(self, app: FastAPI, tracer: Tracer):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/work", headers={TRACE_HEADER: "abc123"})
+
+        assert response.json()["trace_id"] == "abc123"
+        assert response.headers[TRACE_HEADER] == "abc123"
+        assert {s["name"] for s in tracer.query("abc123")} == {"inner", "request"}
+
+    async def test_unsampled_request_is_not_traced(self, app: FastAPI, tracer: Tracer):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/work")
+
+        assert response.json()["trace_id"] is None
+        assert TRACE_HEADER not in response.headers
+        assert tracer.query() == []